@@ -6,12 +6,11 @@ from database import get_db
 from models import User, UserRole
 from schemas import CurrentUser
 from services.auth_service import AuthService
+from services.tracing_service import tracer
+from services.revocation_service import revoked_tokens
 
 security = HTTPBearer()
 
-# In-memory token blacklist (same as in auth router)
-from routers.auth import blacklisted_tokens
-
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -19,14 +18,15 @@ async def get_current_user(
     """Get current user from JWT token"""
     token = credentials.credentials
     
-    # Check if token is blacklisted
-    if token in blacklisted_tokens:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been revoked"
-        )
-    
-    return AuthService.get_current_user_from_token(db, token)
+    with tracer.span("get_current_user"):
+        # Check if token is revoked
+        if revoked_tokens.is_revoked(token):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+        
+        return AuthService.get_current_user_from_token(db, token)
 
 def require_role(required_roles: list[UserRole]):
     def role_checker(current_user: CurrentUser = Depends(get_current_user)):
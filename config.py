@@ -18,6 +18,69 @@ class Settings:
     PROJECT_NAME: str = "Tours Management API"
     VERSION: str = "1.0.0"
     
+    # Server-sent events
+    SSE_QUEUE_SIZE: int = config("SSE_QUEUE_SIZE", default=100, cast=int)
+    SSE_HEARTBEAT_SECONDS: float = config("SSE_HEARTBEAT_SECONDS", default=15.0, cast=float)
+    
+    # Background jobs
+    JOB_WORKERS: int = config("JOB_WORKERS", default=4, cast=int)
+    JOB_BATCH_SIZE: int = config("JOB_BATCH_SIZE", default=1000, cast=int)
+    JOB_LEASE_SECONDS: int = config("JOB_LEASE_SECONDS", default=60, cast=int)
+    EXPORT_DIR: str = config("EXPORT_DIR", default="./exports")
+    
+    # Similar tours recommendations
+    SIMILAR_TOURS_TOP_K: int = config("SIMILAR_TOURS_TOP_K", default=10, cast=int)
+    SIMILAR_TOURS_REFRESH_SECONDS: int = config("SIMILAR_TOURS_REFRESH_SECONDS", default=3600, cast=int)
+    
+    # Idempotency keys
+    IDEMPOTENCY_TTL_SECONDS: int = config("IDEMPOTENCY_TTL_SECONDS", default=86400, cast=int)
+    IDEMPOTENCY_LOCK_SECONDS: int = config("IDEMPOTENCY_LOCK_SECONDS", default=60, cast=int)
+    IDEMPOTENCY_CACHE_SIZE: int = config("IDEMPOTENCY_CACHE_SIZE", default=10000, cast=int)
+    
+    # Soft delete of tours and users
+    SOFT_DELETE: bool = config("SOFT_DELETE", default=False, cast=bool)
+    SOFT_DELETE_GRACE_SECONDS: int = config("SOFT_DELETE_GRACE_SECONDS", default=7 * 24 * 3600, cast=int)
+    SOFT_DELETE_PURGE_INTERVAL_SECONDS: int = config("SOFT_DELETE_PURGE_INTERVAL_SECONDS", default=3600, cast=int)
+    
+    # Change feed tombstones of deleted requests
+    CHANGE_FEED_RETENTION_SECONDS: int = config("CHANGE_FEED_RETENTION_SECONDS", default=30 * 24 * 3600, cast=int)
+    CHANGE_FEED_PRUNE_INTERVAL_SECONDS: int = config("CHANGE_FEED_PRUNE_INTERVAL_SECONDS", default=3600, cast=int)
+    
+    # Per-user dashboard cache
+    DASHBOARD_CACHE_SECONDS: float = config("DASHBOARD_CACHE_SECONDS", default=30.0, cast=float)
+    DASHBOARD_CACHE_SIZE: int = config("DASHBOARD_CACHE_SIZE", default=1000, cast=int)
+    
+    # Metrics
+    METRICS_ENABLED: bool = config("METRICS_ENABLED", default=True, cast=bool)
+    
+    # Slow query log
+    SLOW_QUERY_LOG_ENABLED: bool = config("SLOW_QUERY_LOG_ENABLED", default=True, cast=bool)
+    SLOW_QUERY_THRESHOLD_MS: float = config("SLOW_QUERY_THRESHOLD_MS", default=100.0, cast=float)
+    SLOW_QUERY_LOG_SIZE: int = config("SLOW_QUERY_LOG_SIZE", default=500, cast=int)
+    
+    # Request tracing
+    TRACING_ENABLED: bool = config("TRACING_ENABLED", default=True, cast=bool)
+    TRACE_SAMPLE_RATE: float = config("TRACE_SAMPLE_RATE", default=0.01, cast=float)
+    TRACE_BUFFER_SIZE: int = config("TRACE_BUFFER_SIZE", default=1000, cast=int)
+    TRACE_EXPORT_PATH: str = config("TRACE_EXPORT_PATH", default="")
+    
+    # Load monitor and shedding of low-priority routes
+    LOAD_SHEDDING_ENABLED: bool = config("LOAD_SHEDDING_ENABLED", default=True, cast=bool)
+    LOAD_MONITOR_INTERVAL_SECONDS: float = config("LOAD_MONITOR_INTERVAL_SECONDS", default=0.5, cast=float)
+    LOOP_LAG_THRESHOLD_MS: float = config("LOOP_LAG_THRESHOLD_MS", default=100.0, cast=float)
+    POOL_WAIT_THRESHOLD_MS: float = config("POOL_WAIT_THRESHOLD_MS", default=200.0, cast=float)
+    SHED_RETRY_AFTER_SECONDS: int = config("SHED_RETRY_AFTER_SECONDS", default=5, cast=int)
+    SHED_PATHS: list = config(
+        "SHED_PATHS",
+        default="/tour/stats/detailed,/jobs,/feedback/bulk,/request/bulk-status",
+        cast=lambda v: [i.strip() for i in v.split(",")]
+    )
+    
+    # Worker processes and the cross-worker cache invalidation bus
+    WORKERS: int = config("WORKERS", default=1, cast=int)
+    INVALIDATION_POLL_SECONDS: float = config("INVALIDATION_POLL_SECONDS", default=0.25, cast=float)
+    INVALIDATION_RETENTION_SECONDS: int = config("INVALIDATION_RETENTION_SECONDS", default=300, cast=int)
+    
     # CORS
     BACKEND_CORS_ORIGINS: list = config(
         "BACKEND_CORS_ORIGINS", 
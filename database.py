@@ -1,6 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from models import Base
+from schema_upgrade import upgrade_schema
 
 # SQLite database URL
 SQLALCHEMY_DATABASE_URL = "sqlite:///./tours_management.db"
@@ -10,11 +11,26 @@ engine = create_engine(
     connect_args={"check_same_thread": False}
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@event.listens_for(engine, "connect")
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ignores foreign keys (and ON DELETE CASCADE) unless enabled per connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
 
-# Create tables
+# Objects stay readable after commit, so responses need no refresh SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Bring tables of an older database up to the models, then create missing tables
+upgrade_schema(engine, Base.metadata)
 Base.metadata.create_all(bind=engine)
 
+# Imported after SessionLocal: the services package imports it back from here
+from services.load_monitor_service import load_monitor
+
+# Reports how long the pool made each request wait, once a query needs a connection
+load_monitor.instrument_sessions(SessionLocal)
+
 def get_db():
     db = SessionLocal()
     try:
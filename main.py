@@ -1,20 +1,143 @@
 from fastapi import FastAPI
-from routers import users, requests, tours, feedbacks, auth
+from fastapi.responses import JSONResponse, PlainTextResponse
+from routers import users, requests, tours, feedbacks, auth, jobs, admin
+from services.job_service import job_runner
+from config import settings
+from database import engine
+from middleware import (
+    IdempotencyMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    TracingMiddleware,
+    LoadSheddingMiddleware,
+    SlowQueryLogMiddleware
+)
+from services.metrics_service import metrics
+from services.query_log_service import slow_query_log
+from services.tracing_service import tracer
+from services.load_monitor_service import load_monitor
+from services.invalidation_service import invalidation_bus
+from services.revocation_service import revoked_tokens
 
 app = FastAPI(title="Tours Management API", version="1.0.0")
 
+# Replay stored responses for retried writes carrying an Idempotency-Key header
+app.add_middleware(IdempotencyMiddleware, paths=["/request", "/feedback", "/auth/signup"])
+
+# Sampled cProfile of live requests, idle until an admin opens a window
+app.add_middleware(ProfilingMiddleware)
+
+# Root span per sampled request; nested spans for request stages and SQL
+if settings.TRACING_ENABLED:
+    tracer.instrument_engine(engine)
+    app.add_middleware(TracingMiddleware)
+
+# Shed low-priority routes with 503 while the event loop or DB pool is saturated
+if settings.LOAD_SHEDDING_ENABLED:
+    app.add_middleware(LoadSheddingMiddleware, paths=settings.SHED_PATHS)
+load_monitor.bind(engine)
+
+# Label slow query log entries with the route that ran them
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.instrument_engine(engine)
+    app.add_middleware(SlowQueryLogMiddleware)
+
+# Added last, so it is outermost and recorded latency covers the whole middleware stack
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware)
+
+# Other worker processes' writes invalidate this one's in-process caches
+if settings.WORKERS > 1:
+    invalidation_bus.bind(engine)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["authentication"])
 app.include_router(users.router, prefix="/user", tags=["users"])
 app.include_router(requests.router, prefix="/request", tags=["requests"])
 app.include_router(tours.router, prefix="/tour", tags=["tours"])
 app.include_router(feedbacks.router, prefix="/feedback", tags=["feedbacks"])
+app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
+
+@app.on_event("startup")
+async def resume_jobs():
+    """Pick up jobs that were queued before the last shutdown"""
+    job_runner.resume_pending()
+    if settings.SIMILAR_TOURS_REFRESH_SECONDS > 0:
+        job_runner.schedule_periodic(
+            "similar_tours",
+            settings.SIMILAR_TOURS_REFRESH_SECONDS,
+            {"top_k": settings.SIMILAR_TOURS_TOP_K}
+        )
+    if settings.SOFT_DELETE:
+        job_runner.schedule_periodic(
+            "purge_deleted",
+            settings.SOFT_DELETE_PURGE_INTERVAL_SECONDS,
+            {"grace_seconds": settings.SOFT_DELETE_GRACE_SECONDS}
+        )
+    if settings.CHANGE_FEED_RETENTION_SECONDS > 0:
+        job_runner.schedule_periodic(
+            "prune_tombstones",
+            settings.CHANGE_FEED_PRUNE_INTERVAL_SECONDS,
+            {"retention_seconds": settings.CHANGE_FEED_RETENTION_SECONDS}
+        )
+
+@app.on_event("startup")
+async def start_load_monitor():
+    load_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_load_monitor():
+    await load_monitor.stop()
+
+@app.on_event("startup")
+async def start_invalidation_bus():
+    invalidation_bus.start()
+    # After the bus took its starting point, so no logout falls between the two
+    revoked_tokens.load()
+
+@app.on_event("shutdown")
+async def stop_invalidation_bus():
+    await invalidation_bus.stop()
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "Tours Management API is running"}
+    return {
+        "status": "overloaded" if load_monitor.overloaded else "healthy",
+        "message": "Tours Management API is running",
+        "load": load_monitor.readings(),
+        "invalidation": invalidation_bus.readings()
+    }
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 503 while overloaded, so the balancer sends traffic elsewhere"""
+    readings = load_monitor.readings()
+    if load_monitor.overloaded:
+        return JSONResponse(status_code=503, content={"status": "overloaded", "load": readings})
+    return {"status": "ready", "load": readings}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
+    import argparse
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    parser = argparse.ArgumentParser(description=settings.PROJECT_NAME)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="Worker processes sharing the port")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # Each worker imports the app itself; WORKERS tells it to join the invalidation bus
+        os.environ["WORKERS"] = str(args.workers)
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,9 @@
+# ASGI middleware package initialization
+from .idempotency import IdempotencyMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .tracing import TracingMiddleware
+from .load_shedding import LoadSheddingMiddleware
+from .query_log import SlowQueryLogMiddleware
+
+__all__ = ["IdempotencyMiddleware", "MetricsMiddleware", "ProfilingMiddleware", "TracingMiddleware", "LoadSheddingMiddleware", "SlowQueryLogMiddleware"]
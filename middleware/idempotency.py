@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Dict, Iterable, List
+
+from fastapi import HTTPException
+
+from config import settings
+from services.auth_service import AuthService
+from services.idempotency_service import idempotency_store, StoredResponse
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+class IdempotencyMiddleware:
+    """Replay the stored first response for retried POSTs carrying an Idempotency-Key.
+
+    Keys are scoped by method, path and the user id in the caller's bearer
+    token, so a retry after a token refresh still finds its key. A retry with
+    the same key but a different body is rejected with 422. Duplicates
+    arriving while the first request is still running wait for it in this
+    process, or get 409 if another worker holds the key. Responses with 5xx
+    status and 401s are not stored so the client can retry them.
+    """
+
+    def __init__(self, app, paths: Iterable[str]):
+        self.app = app
+        self.paths = frozenset(paths)
+        self._inflight: Dict[str, asyncio.Event] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        client_key = headers.get(b"idempotency-key")
+        if client_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not client_key or len(client_key) > MAX_KEY_LENGTH:
+            await self._send_error(send, 400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+            return
+
+        body = await self._read_body(receive)
+        key = hashlib.sha256(b"\n".join([
+            scope["method"].encode(),
+            scope["path"].encode(),
+            self._caller(headers),
+            client_key
+        ])).hexdigest()
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        while True:
+            event = self._inflight.get(key)
+            if event is not None:
+                await event.wait()
+                continue
+
+            stored = await asyncio.to_thread(idempotency_store.get, key)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    await self._send_error(send, 422, "Idempotency-Key was already used with a different request")
+                elif stored.status_code is None:
+                    await self._send_error(send, 409, "A request with this Idempotency-Key is in progress")
+                else:
+                    await self._replay(send, stored)
+                return
+
+            if await asyncio.to_thread(idempotency_store.reserve, key, fingerprint):
+                break
+            # Lost a race with another worker; re-read what it stored
+
+        event = self._inflight[key] = asyncio.Event()
+        try:
+            await self._run_and_store(scope, receive, send, body, key)
+        finally:
+            del self._inflight[key]
+            event.set()
+
+    async def _run_and_store(self, scope, receive, send, body: bytes, key: str) -> None:
+        response = {"status": 500, "headers": [], "body": []}
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Body already consumed; pass through disconnect notifications
+            return await receive()
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        keeper = asyncio.create_task(self._keep_reserved(key))
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await asyncio.to_thread(idempotency_store.release, key)
+            raise
+        finally:
+            keeper.cancel()
+
+        if response["status"] >= 500 or response["status"] == 401:
+            await asyncio.to_thread(idempotency_store.release, key)
+            return
+        await asyncio.to_thread(
+            idempotency_store.complete,
+            key,
+            response["status"],
+            [[name.decode("latin-1"), value.decode("latin-1")] for name, value in response["headers"]],
+            b"".join(response["body"])
+        )
+
+    @staticmethod
+    def _caller(headers: Dict[bytes, bytes]) -> bytes:
+        """Scope of the caller's keys: the verified user of the bearer token"""
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return b"anonymous"
+        try:
+            payload = AuthService.verify_token(token)
+        except HTTPException:
+            return b"anonymous"
+        # Tokens issued before the uid claim only name the user
+        if "uid" in payload:
+            return f"user:{payload['uid']}".encode()
+        return f"username:{payload.get('sub')}".encode()
+
+    @staticmethod
+    async def _keep_reserved(key: str) -> None:
+        """Extend the reservation of a running request before it can lapse"""
+        while True:
+            await asyncio.sleep(settings.IDEMPOTENCY_LOCK_SECONDS / 3)
+            try:
+                await asyncio.to_thread(idempotency_store.extend, key)
+            except Exception:
+                logger.exception("Extending an idempotency reservation failed")
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks: List[bytes] = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _replay(send, stored: StoredResponse) -> None:
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": stored.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": stored.body})
+
+    @staticmethod
+    async def _send_error(send, status_code: int, detail: str) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,36 @@
+import json
+from typing import Iterable
+
+from services.load_monitor_service import load_monitor
+
+class LoadSheddingMiddleware:
+    """Reject low-priority requests with 503 + Retry-After while the server is overloaded.
+
+    Only the configured paths (and paths below them) are ever shed, so
+    bookings, logins and everything else keep the capacity that is left.
+    """
+
+    def __init__(self, app, paths: Iterable[str]):
+        self.app = app
+        self.paths = tuple(path.rstrip("/") for path in paths if path)
+
+    def _is_low_priority(self, path: str) -> bool:
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in self.paths)
+
+    async def __call__(self, scope, receive, send):
+        if not load_monitor.overloaded or scope["type"] != "http" or not self._is_low_priority(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        load_monitor.shed_requests += 1
+        body = json.dumps({"detail": "Server is overloaded, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(load_monitor.retry_after()).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
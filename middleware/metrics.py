@@ -0,0 +1,37 @@
+import time
+
+from services.metrics_service import metrics, route_path, RequestStats, current_request_stats
+
+class MetricsMiddleware:
+    """Record latency, status code, in-flight count and SQL activity per route.
+
+    Requests are labelled with the route template (`/tour/{tour_id}`), not the
+    raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats(scope)
+        token = current_request_stats.set(stats)
+        status_code = 500
+        metrics.request_started(method)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_stats.reset(token)
+            metrics.request_finished(method, route_path(scope), status_code, time.perf_counter() - started, stats)
@@ -0,0 +1,21 @@
+from services.metrics_service import route_path
+from services.profiling_service import request_profiler
+
+class ProfilingMiddleware:
+    """Run a sampled fraction of requests under cProfile while a profiling window is open"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # Off by default: a single attribute check per request
+        if not request_profiler.active or scope["type"] != "http" or not request_profiler.should_profile():
+            await self.app(scope, receive, send)
+            return
+
+        profile = request_profiler.begin()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.disable()
+            request_profiler.end(profile, f"{scope['method']} {route_path(scope)}")
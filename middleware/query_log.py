@@ -0,0 +1,18 @@
+from services.query_log_service import current_request_scope
+
+class SlowQueryLogMiddleware:
+    """Expose the request to the slow query log, which labels entries with its route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = current_request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request_scope.reset(token)
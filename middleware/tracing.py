@@ -0,0 +1,53 @@
+import time
+
+from services.metrics_service import route_path
+from services.tracing_service import tracer
+
+class TracingMiddleware:
+    """Open the root span of each sampled request and return its `traceparent` header.
+
+    Besides the root, it records two stages: `handler`, up to the start of
+    the response (dependencies, endpoint and serialization), and `response`,
+    sending the body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1").strip().lower()
+                break
+        root = tracer.start_trace(f"{scope['method']} {scope['path']}", traceparent)
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        header = tracer.traceparent(root).encode()
+        response_started = None
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"traceparent", header)]
+                response_started = time.perf_counter()
+                tracer.record_span(root, "handler", root.started, response_started)
+            await send(message)
+
+        try:
+            with root:
+                await self.app(scope, receive, send_wrapper)
+                if response_started is not None:
+                    tracer.record_span(root, "response", response_started, time.perf_counter())
+        finally:
+            route = f"{scope['method']} {route_path(scope)}"
+            root.name = route
+            tracer.finish_trace(root, route, status_code)
@@ -1,17 +1,30 @@
 from .base import Base
-from .enums import UserRole, RequestStatus
+from .enums import UserRole, RequestStatus, JobStatus
 from .user import User
 from .tour import Tour
 from .tour_request import TourRequest
+from .tour_request_tombstone import TourRequestTombstone
 from .feedback import Feedback
+from .job import Job
+from .tour_similarity import TourSimilarity
+from .idempotency_key import IdempotencyKey
+from .cache_invalidation import CacheInvalidation
+from .revoked_token import RevokedToken
 
 # Export all models and enums for easy importing
 __all__ = [
     "Base",
     "UserRole", 
     "RequestStatus",
+    "JobStatus",
     "User",
     "Tour", 
     "TourRequest",
-    "Feedback"
+    "TourRequestTombstone",
+    "Feedback",
+    "Job",
+    "TourSimilarity",
+    "IdempotencyKey",
+    "CacheInvalidation",
+    "RevokedToken"
 ]
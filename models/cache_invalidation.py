@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+from .base import Base
+
+class CacheInvalidation(Base):
+    """Cache invalidation published by one worker process for the others to apply"""
+    __tablename__ = "cache_invalidations"
+    # Ids must never be reused after pruning: workers read everything past the last id they saw
+    __table_args__ = {"sqlite_autoincrement": True}
+    
+    id = Column(Integer, primary_key=True)
+    origin = Column(String(64), nullable=False)  # Publishing worker, which skips its own rows
+    topic = Column(String(50), nullable=False)
+    keys = Column(JSON)  # NULL invalidates the whole cache
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
@@ -7,8 +7,8 @@ class Feedback(Base):
     __tablename__ = "feedbacks"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    tour_id = Column(Integer, ForeignKey("tours.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    tour_id = Column(Integer, ForeignKey("tours.id", ondelete="CASCADE"), nullable=False)
     rating = Column(Integer, nullable=False)  # 1-5 stars
     comment = Column(Text)
     is_published = Column(Boolean, default=False)
@@ -18,3 +18,11 @@ class Feedback(Base):
     # Relationships
     user = relationship("User", back_populates="feedbacks")
     tour = relationship("Tour", back_populates="feedbacks")
+
+# Partial index holding only the moderation backlog, so queue scans never touch published rows
+Index(
+    "ix_feedbacks_unpublished_id",
+    Feedback.id,
+    sqlite_where=Feedback.is_published == False,
+    postgresql_where=Feedback.is_published == False
+)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, LargeBinary
+from datetime import datetime
+from .base import Base
+
+class IdempotencyKey(Base):
+    """Stored response of a write request, replayed for retries with the same key"""
+    __tablename__ = "idempotency_keys"
+    
+    key = Column(String(64), primary_key=True)  # Hash of method, path, caller and client key
+    fingerprint = Column(String(64), nullable=False)  # Hash of the request body
+    status_code = Column(Integer)  # NULL while the first request is still in flight
+    headers = Column(JSON)
+    body = Column(LargeBinary)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
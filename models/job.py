@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, JSON, Index
+from datetime import datetime
+from .base import Base
+from .enums import JobStatus
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_id", "status", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String(50), nullable=False)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    params = Column(JSON, nullable=False, default=dict)
+    progress = Column(Integer, nullable=False, default=0)  # Percent complete
+    result = Column(JSON)
+    error = Column(Text)
+    created_by = Column(Integer)  # User id; kept without FK so jobs outlive deleted users
+    owner = Column(String(64))  # Runner (worker process) that claimed the job
+    lease_expires_at = Column(DateTime)  # Extended by the owner while running; past it the job counts as orphaned
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
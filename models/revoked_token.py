@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, DateTime
+from .base import Base
+
+class RevokedToken(Base):
+    """Logged-out access token, kept until the token would have expired anyway"""
+    __tablename__ = "revoked_tokens"
+    
+    token_hash = Column(String(64), primary_key=True)  # SHA-256 of the token, never the token itself
+    expires_at = Column(DateTime, nullable=False, index=True)
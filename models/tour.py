@@ -15,7 +15,8 @@ class Tour(Base):
     price = Column(Integer, nullable=False)  # Price in cents
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    deleted_at = Column(DateTime, index=True)  # Set by soft delete, purged later
     
-    # Relationships
-    tour_requests = relationship("TourRequest", back_populates="tour", cascade="all, delete-orphan")
-    feedbacks = relationship("Feedback", back_populates="tour", cascade="all, delete-orphan")
+    # Relationships; children are removed by ON DELETE CASCADE, never loaded for deletion
+    tour_requests = relationship("TourRequest", back_populates="tour", cascade="all, delete-orphan", passive_deletes=True)
+    feedbacks = relationship("Feedback", back_populates="tour", cascade="all, delete-orphan", passive_deletes=True)
@@ -1,21 +1,45 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
 from .enums import RequestStatus
 
+# Evaluated inside the INSERT or UPDATE statement, which holds SQLite's write
+# lock, so sequence numbers grow in commit order and a reader never sees a
+# smaller number commit after a larger one. A multi-row statement gives all its
+# rows the same number.
+NEXT_CHANGE_SEQ = text("(SELECT COALESCE(MAX(change_seq), 0) + 1 FROM tour_requests)")
+
 class TourRequest(Base):
     __tablename__ = "tour_requests"
+    __table_args__ = (
+        # Keyset scans for the change feed: per user, and across all users for admins
+        Index("ix_tour_requests_user_id_change_seq", "user_id", "change_seq", "id"),
+        Index("ix_tour_requests_change_seq", "change_seq", "id"),
+        # Ids are never reused, so a tombstone's request_id can't name a newer request.
+        # Upgraded databases start the sequence past the ids their tombstones hold.
+        {
+            "sqlite_autoincrement": True,
+            "info": {"autoincrement_floor": ("tour_request_tombstones", "request_id")}
+        }
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    tour_id = Column(Integer, ForeignKey("tours.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    tour_id = Column(Integer, ForeignKey("tours.id", ondelete="CASCADE"), nullable=False)
     participants_count = Column(Integer, nullable=False, default=1)
     preferred_date = Column(DateTime, nullable=False)
     status = Column(Enum(RequestStatus), default=RequestStatus.PENDING)
     notes = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Change feed position, renumbered by every insert and update
+    change_seq = Column(
+        Integer,
+        default=NEXT_CHANGE_SEQ,
+        onupdate=NEXT_CHANGE_SEQ,
+        info={"backfill": "id"}
+    )
     
     # Relationships
     user = relationship("User", back_populates="tour_requests")
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, DateTime, Index, event
+from datetime import datetime
+from .base import Base
+from .tour_request import TourRequest
+
+class TourRequestTombstone(Base):
+    """Marker left behind by a deleted tour request for the change feed"""
+    __tablename__ = "tour_request_tombstones"
+    __table_args__ = (
+        Index("ix_tour_request_tombstones_user_id_id", "user_id", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    request_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+@event.listens_for(TourRequest, "after_delete")
+def record_tour_request_tombstone(mapper, connection, target):
+    """Record a tombstone for every request deleted through the ORM, cascades included"""
+    connection.execute(
+        TourRequestTombstone.__table__.insert().values(
+            request_id=target.id,
+            user_id=target.user_id,
+            deleted_at=datetime.utcnow()
+        )
+    )
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer
+from .base import Base
+
+class TourSimilarity(Base):
+    """Precomputed top-k co-requested neighbours of a tour"""
+    __tablename__ = "tour_similarities"
+    
+    tour_id = Column(Integer, primary_key=True)
+    rank = Column(Integer, primary_key=True)  # 1 = most similar
+    similar_tour_id = Column(Integer, nullable=False)
+    co_requests = Column(Integer, nullable=False)  # Users who requested both tours
@@ -19,10 +19,11 @@ class User(Base):
     role = Column(Enum(UserRole), nullable=False, default=UserRole.REQUESTOR)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    deleted_at = Column(DateTime, index=True)  # Set by soft delete, purged later
     
-    # Relationships
-    tour_requests = relationship("TourRequest", back_populates="user", cascade="all, delete-orphan")
-    feedbacks = relationship("Feedback", back_populates="user", cascade="all, delete-orphan")
+    # Relationships; children are removed by ON DELETE CASCADE, never loaded for deletion
+    tour_requests = relationship("TourRequest", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    feedbacks = relationship("Feedback", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
     
     def verify_password(self, password: str) -> bool:
         """Verify a password against the hash"""
@@ -0,0 +1,117 @@
+import asyncio
+from fastapi import APIRouter, Depends, Query, Response
+from typing import Literal, Optional
+
+from schemas import (
+    SlowQueryLogPage,
+    SlowQueryLogConfig,
+    ProfilingStart,
+    ProfilingStatus,
+    Trace,
+    TracePage,
+    MessageResponse,
+    CurrentUser
+)
+from auth import require_admin
+from services.query_log_service import slow_query_log
+from services.profiling_service import request_profiler
+from services.tracing_service import tracer
+
+router = APIRouter()
+
+@router.get("/slow-queries", response_model=SlowQueryLogPage)
+async def get_slow_queries(
+    limit: int = Query(100, ge=1, le=1000),
+    route: Optional[str] = Query(None, description="Only statements from this route, e.g. 'GET /request'"),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Get the most recent slow SQL statements with their plans - Admin only"""
+    return slow_query_log.get_page(limit, route=route)
+
+@router.put("/slow-queries/config", response_model=SlowQueryLogConfig)
+async def update_slow_query_config(
+    config_data: SlowQueryLogConfig,
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Change the slow query threshold until the next restart - Admin only"""
+    slow_query_log.threshold_ms = config_data.threshold_ms
+    return config_data
+
+@router.delete("/slow-queries", response_model=MessageResponse)
+async def clear_slow_queries(
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Clear the slow query log and its cached plans - Admin only"""
+    slow_query_log.clear()
+    return MessageResponse(message="Slow query log cleared")
+
+@router.post("/profiling", response_model=ProfilingStatus)
+async def start_profiling(
+    profiling_data: ProfilingStart,
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Profile a sampled fraction of requests for a bounded window - Admin only"""
+    request_profiler.start(profiling_data.duration_seconds, profiling_data.sample_rate)
+    return request_profiler.get_status(top=0)
+
+@router.get("/profiling", response_model=ProfilingStatus)
+async def get_profiling_status(
+    top: int = Query(20, ge=0, le=200, description="Functions to list per route"),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Get the profiling window state and per-route hot spots - Admin only"""
+    return request_profiler.get_status(top=top)
+
+@router.delete("/profiling", response_model=ProfilingStatus)
+async def stop_profiling(
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Close the profiling window early, keeping its results - Admin only"""
+    request_profiler.stop()
+    return request_profiler.get_status(top=0)
+
+@router.get("/profiling/download")
+async def download_profile(
+    route: str = Query(..., description="Profiled route, e.g. 'GET /request'"),
+    format: Literal["pstats", "collapsed"] = Query("pstats"),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Download a route's profile as pstats or collapsed stacks - Admin only"""
+    # Serializing a large profile takes a while; keep the event loop serving
+    if format == "pstats":
+        return Response(
+            await asyncio.to_thread(request_profiler.export_pstats, route),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": 'attachment; filename="profile.pstats"'}
+        )
+    return Response(
+        await asyncio.to_thread(request_profiler.export_collapsed, route),
+        media_type="text/plain",
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'}
+    )
+
+@router.get("/traces", response_model=TracePage)
+async def get_traces(
+    limit: int = Query(100, ge=1, le=1000),
+    route: Optional[str] = Query(None, description="Only traces of this route, e.g. 'GET /request'"),
+    min_duration_ms: float = Query(0, ge=0, description="Only traces at least this slow"),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Get the most recent request traces - Admin only"""
+    return tracer.get_page(limit, route=route, min_duration_ms=min_duration_ms)
+
+@router.get("/traces/{trace_id}", response_model=Trace)
+async def get_trace(
+    trace_id: str,
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Get all spans of a request trace - Admin only"""
+    return tracer.get_trace(trace_id)
+
+@router.delete("/traces", response_model=MessageResponse)
+async def clear_traces(
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Clear the trace buffer - Admin only"""
+    tracer.clear()
+    return MessageResponse(message="Traces cleared")
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from database import get_db
 from schemas import (
@@ -12,13 +12,11 @@ from schemas import (
     CurrentUser
 )
 from services.auth_service import AuthService
+from services.revocation_service import revoked_tokens
 
 router = APIRouter()
 security = HTTPBearer()
 
-# In-memory token blacklist (in production, use Redis or database)
-blacklisted_tokens = set()
-
 @router.post("/signup", response_model=AuthResponse)
 async def signup(
     user_data: SignupRequest,
@@ -32,7 +30,7 @@ async def signup(
         # Create access token
         access_token_expires = timedelta(minutes=30)
         access_token = AuthService.create_access_token(
-            data={"sub": user.username}, 
+            data={"sub": user.username, "uid": user.id}, 
             expires_delta=access_token_expires
         )
         
@@ -83,7 +81,7 @@ async def login(
     # Create access token
     access_token_expires = timedelta(minutes=30)
     access_token = AuthService.create_access_token(
-        data={"sub": user.username}, 
+        data={"sub": user.username, "uid": user.id}, 
         expires_delta=access_token_expires
     )
     
@@ -105,15 +103,16 @@ async def login(
 
 @router.post("/logout", response_model=MessageResponse)
 async def logout(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
 ):
-    """Logout user by blacklisting the token"""
+    """Logout user by revoking the token until it expires"""
     token = credentials.credentials
     
-    # Verify token is valid before blacklisting
+    # Verify token is valid before revoking it
     try:
-        AuthService.verify_token(token)
-        blacklisted_tokens.add(token)
+        payload = AuthService.verify_token(token)
+        revoked_tokens.revoke(db, token, datetime.utcfromtimestamp(payload["exp"]))
         return MessageResponse(message="Successfully logged out")
     except HTTPException:
         raise HTTPException(
@@ -129,8 +128,8 @@ async def get_current_user_info(
     """Get current user information"""
     token = credentials.credentials
     
-    # Check if token is blacklisted
-    if token in blacklisted_tokens:
+    # Check if token is revoked
+    if revoked_tokens.is_revoked(token):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token has been revoked"
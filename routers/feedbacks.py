@@ -1,46 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select
+from typing import FrozenSet, List, Optional
 from datetime import datetime
 
 from database import get_db
 from models import Feedback, Tour, UserRole
 from schemas import (
     Feedback as FeedbackSchema, 
+    FeedbackExpanded,
     FeedbackCreate, 
     FeedbackUpdate, 
+    FeedbackBulkCreate,
+    FeedbackBulkResponse,
+    FeedbackModerationPage,
+    FeedbackPublishRequest,
+    FeedbackPublishResponse,
     CurrentUser
 )
-from auth import get_current_user
+from auth import get_current_user, require_admin
+from services.feedback_service import FeedbackService
+from services.write_service import WriteService
+from services.expand_service import ExpandService
+from services.dashboard_service import dashboard_cache
 
 router = APIRouter()
 
-@router.get("", response_model=List[FeedbackSchema])
+@router.get("", response_model=List[FeedbackExpanded])
 async def get_feedbacks(
+    expand: FrozenSet[str] = Depends(ExpandService.parse),
     db: Session = Depends(get_db),
     current_user: Optional[CurrentUser] = Depends(get_current_user)
 ):
     """Get feedbacks - Published for anyone, unpublished only for admin"""
-    if current_user and current_user.role == UserRole.ADMIN:
-        return db.query(Feedback).all()
-    else:
-        return db.query(Feedback).filter(Feedback.is_published == True).all()
+    query = db.query(Feedback).options(*ExpandService.options(Feedback, expand))
+    if not current_user or current_user.role != UserRole.ADMIN:
+        query = query.filter(Feedback.is_published == True)
+    adapter = FeedbackExpanded.adapter(expand, many=True)
+    return Response(adapter.dump_json(adapter.validate_python(query.all(), from_attributes=True)), media_type="application/json")
 
-@router.get("/{feedback_id}", response_model=FeedbackSchema)
+@router.get("/moderation", response_model=FeedbackModerationPage)
+async def get_moderation_queue(
+    after: Optional[int] = Query(None, ge=0, description="Cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Get unpublished feedback awaiting moderation, oldest first - Admin only"""
+    return FeedbackService.get_moderation_queue(db, after=after, limit=limit)
+
+@router.get("/{feedback_id}", response_model=FeedbackExpanded)
 async def get_feedback(
     feedback_id: int,
+    expand: FrozenSet[str] = Depends(ExpandService.parse),
     db: Session = Depends(get_db),
     current_user: Optional[CurrentUser] = Depends(get_current_user)
 ):
     """Get feedback by ID - Published for anyone, unpublished only for admin"""
-    feedback = db.query(Feedback).filter(Feedback.id == feedback_id).first()
+    feedback = db.query(Feedback).options(
+        *ExpandService.options(Feedback, expand, many=False)
+    ).filter(Feedback.id == feedback_id).first()
     if not feedback:
         raise HTTPException(status_code=404, detail="Feedback not found")
     
     if not feedback.is_published and (not current_user or current_user.role != UserRole.ADMIN):
         raise HTTPException(status_code=404, detail="Feedback not found")
     
-    return feedback
+    adapter = FeedbackExpanded.adapter(expand)
+    return Response(adapter.dump_json(adapter.validate_python(feedback, from_attributes=True)), media_type="application/json")
 
 @router.post("", response_model=FeedbackSchema)
 async def create_feedback(
@@ -49,17 +76,37 @@ async def create_feedback(
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Create feedback - Anyone can create, tour association mandatory"""
-    # Verify tour exists
-    tour = db.query(Tour).filter(Tour.id == feedback_data.tour_id, Tour.is_active == True).first()
-    if not tour:
+    # Tour existence is checked by the INSERT ... SELECT itself
+    feedback = WriteService.insert_if(
+        db,
+        Feedback,
+        {**feedback_data.model_dump(), "user_id": current_user.id},
+        select(Tour.id).where(Tour.id == feedback_data.tour_id, Tour.is_active == True).exists()
+    )
+    if not feedback:
         raise HTTPException(status_code=404, detail="Tour not found or inactive")
-    
-    feedback = Feedback(**feedback_data.dict(), user_id=current_user.id)
-    db.add(feedback)
     db.commit()
-    db.refresh(feedback)
+    dashboard_cache.invalidate([feedback.user_id])
     return feedback
 
+@router.post("/bulk", response_model=FeedbackBulkResponse)
+async def create_feedbacks_bulk(
+    bulk_data: FeedbackBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Import many feedbacks with their authors - Invalid items are reported, not fatal - Admin only"""
+    return FeedbackService.bulk_create(db, bulk_data.items)
+
+@router.post("/publish", response_model=FeedbackPublishResponse)
+async def publish_feedbacks(
+    publish_data: FeedbackPublishRequest,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Publish or unpublish many feedbacks at once - Admin only"""
+    return FeedbackService.set_published(db, publish_data.ids, publish_data.is_published)
+
 @router.put("/{feedback_id}", response_model=FeedbackSchema)
 async def update_feedback(
     feedback_id: int,
@@ -68,21 +115,17 @@ async def update_feedback(
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Update feedback - Admin updates any, others only their own"""
-    feedback = db.query(Feedback).filter(Feedback.id == feedback_id).first()
-    if not feedback:
-        raise HTTPException(status_code=404, detail="Feedback not found")
+    conditions = [Feedback.id == feedback_id]
+    if current_user.role != UserRole.ADMIN:
+        conditions.append(Feedback.user_id == current_user.id)
     
-    if current_user.role != UserRole.ADMIN and feedback.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    update_data = feedback_data.dict(exclude_unset=True)
-    
-    for field, value in update_data.items():
-        setattr(feedback, field, value)
-    
-    feedback.updated_at = datetime.utcnow()
+    update_data = feedback_data.model_dump(exclude_unset=True)
+    update_data["updated_at"] = datetime.utcnow()
+    feedback = WriteService.update_returning(db, Feedback, update_data, *conditions)
+    if not feedback:
+        WriteService.raise_not_found_or_forbidden(db, Feedback, feedback_id, "Feedback not found")
     db.commit()
-    db.refresh(feedback)
+    dashboard_cache.invalidate([feedback.user_id])
     return feedback
 
 @router.delete("/{feedback_id}")
@@ -99,6 +142,8 @@ async def delete_feedback(
     if current_user.role != UserRole.ADMIN and feedback.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
+    owner_id = feedback.user_id
     db.delete(feedback)
     db.commit()
+    dashboard_cache.invalidate([owner_id])
     return {"message": "Feedback deleted successfully"}
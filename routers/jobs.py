@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.orm import Session
+from typing import List
+
+from database import get_db
+from models import Job
+from schemas import Job as JobSchema, JobCreate, CurrentUser
+from auth import require_admin
+from services.job_service import job_runner
+
+router = APIRouter()
+
+@router.post("", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    job_data: JobCreate,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Enqueue a background job - Admin only"""
+    return job_runner.enqueue(db, job_data.type, job_data.params, current_user.id)
+
+@router.get("", response_model=List[JobSchema])
+async def get_jobs(
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Get the most recent jobs - Admin only"""
+    return db.query(Job).order_by(Job.id.desc()).limit(limit).all()
+
+@router.get("/{job_id}", response_model=JobSchema)
+async def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Get job status and progress - Admin only"""
+    return job_runner.get_job(db, job_id)
@@ -1,46 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select, delete
+from typing import FrozenSet, List, Optional
 from datetime import datetime
 
 from database import get_db
 from models import TourRequest, Tour, UserRole
 from schemas import (
     TourRequest as TourRequestSchema, 
+    TourRequestExpanded,
     TourRequestCreate, 
     TourRequestUpdate, 
+    TourRequestBulkStatusUpdate,
+    TourRequestBulkStatusResponse,
+    TourRequestChanges,
     CurrentUser
 )
-from auth import get_current_user
+from auth import get_current_user, require_admin
+from services.request_service import RequestService
+from services.write_service import WriteService
+from services.expand_service import ExpandService
+from services.notification_service import request_events
+from services.popularity_service import tour_popularity
+from services.dashboard_service import dashboard_cache
 
 router = APIRouter()
 
-@router.get("", response_model=List[TourRequestSchema])
+@router.get("", response_model=List[TourRequestExpanded])
 async def get_requests(
+    expand: FrozenSet[str] = Depends(ExpandService.parse),
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Get tour requests - Admin gets all, others get only their own"""
-    if current_user.role == UserRole.ADMIN:
-        return db.query(TourRequest).all()
-    else:
-        return db.query(TourRequest).filter(TourRequest.user_id == current_user.id).all()
+    query = db.query(TourRequest).options(*ExpandService.options(TourRequest, expand))
+    if current_user.role != UserRole.ADMIN:
+        query = query.filter(TourRequest.user_id == current_user.id)
+    adapter = TourRequestExpanded.adapter(expand, many=True)
+    requests = adapter.validate_python(query.all(), from_attributes=True)
+    return Response(adapter.dump_json(requests), media_type="application/json")
 
-@router.get("/{request_id}", response_model=TourRequestSchema)
+@router.get("/events")
+async def stream_request_events(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Stream tour request changes as server-sent events - Own requests, admins also get new requests"""
+    # Release the DB connection now; the stream may stay open for hours
+    db.close()
+    return StreamingResponse(
+        request_events.stream(current_user),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/changes", response_model=TourRequestChanges)
+async def get_request_changes(
+    since: Optional[str] = Query(None, description="Cursor returned by the previous poll; 410 once older than the tombstone retention"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get tour requests changed since a cursor - Admin gets all, others get only their own"""
+    return RequestService.get_changes(db, current_user, since=since, limit=limit)
+
+@router.post("/bulk-status", response_model=TourRequestBulkStatusResponse)
+async def bulk_update_request_status(
+    bulk_data: TourRequestBulkStatusUpdate,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """Move many tour requests to a new status in one transaction - Admin only"""
+    return RequestService.bulk_update_status(
+        db,
+        bulk_data.status,
+        ids=bulk_data.ids,
+        filters=bulk_data.filter
+    )
+
+@router.get("/{request_id}", response_model=TourRequestExpanded)
 async def get_request(
     request_id: int,
+    expand: FrozenSet[str] = Depends(ExpandService.parse),
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Get tour request by ID - Admin gets any, others only their own"""
-    request = db.query(TourRequest).filter(TourRequest.id == request_id).first()
+    request = db.query(TourRequest).options(
+        *ExpandService.options(TourRequest, expand, many=False)
+    ).filter(TourRequest.id == request_id).first()
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
     
     if current_user.role != UserRole.ADMIN and request.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    return request
+    adapter = TourRequestExpanded.adapter(expand)
+    return Response(adapter.dump_json(adapter.validate_python(request, from_attributes=True)), media_type="application/json")
 
 @router.post("", response_model=TourRequestSchema)
 async def create_request(
@@ -49,15 +106,24 @@ async def create_request(
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Create a new tour request - Available to anyone"""
-    # Verify tour exists
-    tour = db.query(Tour).filter(Tour.id == request_data.tour_id, Tour.is_active == True).first()
-    if not tour:
+    # Tour existence is checked by the INSERT ... SELECT itself
+    request = WriteService.insert_if(
+        db,
+        TourRequest,
+        {**request_data.model_dump(), "user_id": current_user.id},
+        select(Tour.id).where(Tour.id == request_data.tour_id, Tour.is_active == True).exists()
+    )
+    if not request:
         raise HTTPException(status_code=404, detail="Tour not found or inactive")
-    
-    request = TourRequest(**request_data.dict(), user_id=current_user.id)
-    db.add(request)
     db.commit()
-    db.refresh(request)
+    dashboard_cache.invalidate([request.user_id])
+    tour_popularity.request_created(request.tour_id, request.created_at, request.status, request.change_seq)
+    request_events.publish(
+        "created",
+        request.user_id,
+        TourRequestSchema.model_validate(request).model_dump(mode="json"),
+        notify_admins=True
+    )
     return request
 
 @router.put("/{request_id}", response_model=TourRequestSchema)
@@ -68,20 +134,31 @@ async def update_request(
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Update tour request - Admin updates any, others only their own"""
-    request = db.query(TourRequest).filter(TourRequest.id == request_id).first()
-    if not request:
-        raise HTTPException(status_code=404, detail="Request not found")
+    conditions = [TourRequest.id == request_id]
+    if current_user.role != UserRole.ADMIN:
+        conditions.append(TourRequest.user_id == current_user.id)
     
-    if current_user.role != UserRole.ADMIN and request.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    update_data = request_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(request, field, value)
+    update_data = request_data.model_dump(exclude_unset=True)
+    previous_status = None
+    if "status" in update_data:
+        # Popularity counters need the old status, which RETURNING can't give
+        previous_status = db.scalar(select(TourRequest.status).where(*conditions))
     
-    request.updated_at = datetime.utcnow()
+    update_data["updated_at"] = datetime.utcnow()
+    request = WriteService.update_returning(db, TourRequest, update_data, *conditions)
+    if not request:
+        WriteService.raise_not_found_or_forbidden(db, TourRequest, request_id, "Request not found")
     db.commit()
-    db.refresh(request)
+    dashboard_cache.invalidate([request.user_id])
+    if previous_status is not None:
+        tour_popularity.status_changed(
+            request.tour_id, request.created_at, previous_status, request.status, request.change_seq
+        )
+    request_events.publish(
+        "updated",
+        request.user_id,
+        TourRequestSchema.model_validate(request).model_dump(mode="json")
+    )
     return request
 
 @router.delete("/{request_id}")
@@ -98,6 +175,19 @@ async def delete_request(
     if current_user.role != UserRole.ADMIN and request.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    db.delete(request)
+    owner_id = request.user_id
+    # Deleted set-wise to learn the tombstone id, which orders the popularity delta
+    tombstone_ids = RequestService.record_tombstones(db, TourRequest.id == request_id)
+    deleted = db.execute(
+        delete(TourRequest)
+        .where(TourRequest.id == request_id)
+        .returning(TourRequest.tour_id, TourRequest.created_at, TourRequest.status)
+    ).first()
+    if deleted is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Request not found")
     db.commit()
+    dashboard_cache.invalidate([owner_id])
+    tour_popularity.request_deleted(deleted.tour_id, deleted.created_at, deleted.status, tombstone_ids[0])
+    request_events.publish("deleted", owner_id, {"id": request_id})
     return {"message": "Request cancelled successfully"}
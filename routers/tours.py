@@ -1,19 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from typing import List, Optional, Union
 
 from database import get_db
 from models import Tour
-from schemas import Tour as TourSchema, TourCreate, TourUpdate, TourStats, CurrentUser
+from schemas import (
+    Tour as TourSchema,
+    TourCreate,
+    TourUpdate,
+    TourStats,
+    PopularTour,
+    SimilarTour,
+    TourCatalog,
+    TourList,
+    LocationSuggestion,
+    CurrentUser
+)
 from auth import require_admin
 from services.tour_service import TourService
+from services.similarity_service import SimilarityService
+from services.catalog_service import CatalogService, catalog_facets, location_index
+from services.deletion_service import DeletionService
+from services.write_service import WriteService
+from services.dashboard_service import dashboard_cache
 
 router = APIRouter()
 
-@router.get("", response_model=List[TourSchema])
-async def get_tours(db: Session = Depends(get_db)):
-    """Get all active tours - Available to anyone"""
-    return db.query(Tour).filter(Tour.is_active == True).all()
+@router.get("", response_model=Union[TourCatalog, List[TourSchema]])
+async def get_tours(
+    location: Optional[str] = Query(None, max_length=200, description="Whole location or the start of any word in it"),
+    price_min: Optional[int] = Query(None, ge=0, description="Minimum price in cents"),
+    price_max: Optional[int] = Query(None, ge=0, description="Maximum price in cents"),
+    duration_min: Optional[int] = Query(None, ge=1),
+    duration_max: Optional[int] = Query(None, ge=1),
+    facets: bool = Query(False, description="Wrap results with location/price/duration facet counts"),
+    db: Session = Depends(get_db)
+):
+    """Get active tours, optionally filtered and with facet counts - Available to anyone"""
+    filters = dict(
+        location=location,
+        price_min=price_min,
+        price_max=price_max,
+        duration_min=duration_min,
+        duration_max=duration_max
+    )
+    if facets:
+        return Response(CatalogService.search_with_facets(db, **filters), media_type="application/json")
+    # Serialized straight to JSON bytes by the cached adapter, skipping the
+    # union match against the response model and the json.dumps pass
+    tours = TourList.validate_python(CatalogService.search(db, **filters), from_attributes=True)
+    return Response(TourList.dump_json(tours), media_type="application/json")
+
+@router.get("/locations/suggest", response_model=List[LocationSuggestion])
+async def suggest_locations(
+    prefix: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Autocomplete tour locations by prefix - Available to anyone"""
+    return location_index.suggest(db, prefix, limit)
+
+@router.get("/popular", response_model=List[PopularTour])
+async def get_popular_tours(
+    n: int = Query(10, ge=1, le=100),
+    days: Optional[int] = Query(None, description="Only count requests from the last 7 or 30 days"),
+    db: Session = Depends(get_db)
+):
+    """Get the most requested active tours - Available to anyone"""
+    return TourService.get_popular_tours(db, n, days=days)
 
 @router.get("/{tour_id}", response_model=TourSchema)
 async def get_tour(tour_id: int, db: Session = Depends(get_db)):
@@ -23,6 +78,15 @@ async def get_tour(tour_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Tour not found")
     return tour
 
+@router.get("/{tour_id}/similar", response_model=List[SimilarTour])
+async def get_similar_tours(
+    tour_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Get tours that requestors of this tour also requested - Available to anyone"""
+    return SimilarityService.get_similar_tours(db, tour_id, limit)
+
 @router.post("", response_model=TourSchema)
 async def create_tour(
     tour_data: TourCreate,
@@ -30,10 +94,10 @@ async def create_tour(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Create a new tour - Admin only"""
-    tour = Tour(**tour_data.dict())
-    db.add(tour)
+    tour = WriteService.insert_returning(db, Tour, tour_data.model_dump())
     db.commit()
-    db.refresh(tour)
+    catalog_facets.invalidate()
+    location_index.tour_changed(None, (tour.location, tour.is_active))
     return tour
 
 @router.put("/{tour_id}", response_model=TourSchema)
@@ -44,16 +108,22 @@ async def update_tour(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Update tour - Admin only"""
-    tour = db.query(Tour).filter(Tour.id == tour_id).first()
+    conditions = [Tour.id == tour_id, Tour.deleted_at.is_(None)]
+    update_data = tour_data.model_dump(exclude_unset=True)
+    previous = None
+    if "location" in update_data or "is_active" in update_data:
+        # The location index needs the old values, which RETURNING can't give
+        previous = db.execute(select(Tour.location, Tour.is_active).where(*conditions)).first()
+    
+    tour = WriteService.update_returning(db, Tour, update_data, *conditions)
     if not tour:
         raise HTTPException(status_code=404, detail="Tour not found")
-    
-    update_data = tour_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(tour, field, value)
-    
     db.commit()
-    db.refresh(tour)
+    catalog_facets.invalidate()
+    # Any dashboard may embed this tour
+    dashboard_cache.clear()
+    if previous is not None:
+        location_index.tour_changed(tuple(previous), (tour.location, tour.is_active))
     return tour
 
 @router.delete("/{tour_id}")
@@ -63,12 +133,11 @@ async def delete_tour(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Delete tour - Admin only. Also deletes associated requests"""
-    tour = db.query(Tour).filter(Tour.id == tour_id).first()
+    tour = db.query(Tour).filter(Tour.id == tour_id, Tour.deleted_at.is_(None)).first()
     if not tour:
         raise HTTPException(status_code=404, detail="Tour not found")
     
-    db.delete(tour)  # Cascade will handle tour requests
-    db.commit()
+    DeletionService.delete_tour(db, tour)  # ON DELETE CASCADE handles tour requests
     return {"message": "Tour deleted successfully"}
 
 @router.get("/stats", response_model=TourStats)
@@ -78,5 +147,5 @@ async def get_tour_stats(db: Session = Depends(get_db)):
 
 @router.get("/stats/detailed")
 async def get_detailed_tour_stats(db: Session = Depends(get_db)):
-    """Get detailed tour statistics with additional metrics - Available to anyone"""
+    """Get detailed tour statistics with additional metrics - The most popular tour is ranked by live (pending or approved) requests - Available to anyone"""
     return TourService.get_detailed_tour_statistics(db)
@@ -1,12 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from typing import List
 
 from database import get_db
 from models import User
-from schemas import User as UserSchema, UserCreate, UserUpdate, CurrentUser
-from auth import require_admin
+from schemas import User as UserSchema, UserCreate, UserUpdate, UserDashboard, CurrentUser
+from auth import get_current_user, require_admin
 from services.auth_service import AuthService
+from services.deletion_service import DeletionService
+from services.write_service import WriteService
+from services.dashboard_service import DashboardService
 
 router = APIRouter()
 
@@ -16,7 +21,15 @@ async def get_users(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Get all users - Admin only"""
-    return db.query(User).all()
+    return db.query(User).filter(User.deleted_at.is_(None)).all()
+
+@router.get("/me/dashboard", response_model=UserDashboard)
+async def get_my_dashboard(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get own requests, status counts, feedback and referenced tours in one payload - Any user"""
+    return DashboardService.get_dashboard(db, current_user.id)
 
 @router.get("/{user_id}", response_model=UserSchema)
 async def get_user(
@@ -25,7 +38,7 @@ async def get_user(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Get user by ID - Admin only"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User).filter(User.id == user_id, User.deleted_at.is_(None)).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -37,22 +50,25 @@ async def create_user(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Create a new user - Admin only"""
-    # Check if username or email already exists
-    existing_user = db.query(User).filter(
+    # Cheap id-only check first so duplicates don't pay for bcrypt
+    existing_user = db.scalar(select(User.id).where(
         (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
+    ))
     if existing_user:
         raise HTTPException(status_code=400, detail="Username or email already exists")
     
     # Hash password and create user
     hashed_password = AuthService.hash_password(user_data.password)
-    user_dict = user_data.dict()
+    user_dict = user_data.model_dump()
     del user_dict['password']  # Remove plain password
     
-    user = User(**user_dict, hashed_password=hashed_password)
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        user = WriteService.insert_returning(db, User, {**user_dict, "hashed_password": hashed_password})
+        db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent create of the same username or email
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Username or email already exists")
     return user
 
 @router.put("/{user_id}", response_model=UserSchema)
@@ -63,16 +79,17 @@ async def update_user(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Update user - Admin only"""
-    user = db.query(User).filter(User.id == user_id).first()
+    update_data = user_data.model_dump(exclude_unset=True)
+    try:
+        user = WriteService.update_returning(
+            db, User, update_data, User.id == user_id, User.deleted_at.is_(None)
+        )
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Username or email already exists")
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    update_data = user_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(user, field, value)
-    
-    db.commit()
-    db.refresh(user)
     return user
 
 @router.delete("/{user_id}")
@@ -82,10 +99,9 @@ async def delete_user(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Delete user - Admin only. Also deletes their tour requests"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User).filter(User.id == user_id, User.deleted_at.is_(None)).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    db.delete(user)  # Cascade will handle tour requests
-    db.commit()
+    DeletionService.delete_user(db, user)  # ON DELETE CASCADE handles tour requests
     return {"message": "User deleted successfully"}
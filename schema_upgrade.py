@@ -0,0 +1,156 @@
+"""In-place upgrade of databases created by earlier versions of the models.
+
+`Base.metadata.create_all` only creates missing tables; it never alters
+existing ones. Before it runs, `upgrade_schema` brings existing SQLite
+tables up to the models:
+
+- adds missing nullable columns (`ALTER TABLE ... ADD COLUMN`) and fills
+  existing rows from the SQL expression in the column's `info["backfill"]`,
+- rebuilds tables whose foreign keys or AUTOINCREMENT differ from the
+  models, e.g. the `ON DELETE CASCADE` of `tour_requests` and `feedbacks`,
+  by copying them into a new table as SQLite's ALTER TABLE documentation
+  prescribes; a table's `info["autoincrement_floor"]`, a (table, column)
+  pair, names ids handed out before that must not be reused,
+- creates missing indexes and drops `ix_` indexes the models no longer define.
+
+Everything runs in one `BEGIN IMMEDIATE` transaction, so worker processes
+starting together upgrade once and the others find nothing left to do. It
+runs on every start; on an up-to-date database it only reads the schema.
+Back up the database file before the first start of a new version.
+
+Other databases are not upgraded: the app refuses to start while a table
+lacks a column, and the schema has to be migrated by hand.
+"""
+import logging
+from typing import List
+
+from sqlalchemy import MetaData, Table, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
+
+logger = logging.getLogger(__name__)
+
+def upgrade_schema(engine: Engine, metadata: MetaData) -> None:
+    if engine.dialect.name != "sqlite":
+        _check_columns(engine, metadata)
+        return
+
+    connection = engine.raw_connection()
+    try:
+        # Explicit transaction control: the sqlite3 module would otherwise
+        # open and commit transactions around the DDL on its own
+        dbapi_connection = connection.driver_connection
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        # Must be off while tables are rebuilt, and can't change inside a transaction
+        cursor.execute("PRAGMA foreign_keys=OFF")
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            changes: List[str] = []
+            for table in metadata.sorted_tables:
+                changes += _upgrade_sqlite_table(cursor, table, engine)
+            if changes:
+                orphans = cursor.execute("PRAGMA foreign_key_check").fetchall()
+                if orphans:
+                    logger.warning(f"{len(orphans)} rows reference missing parents; they predate foreign key enforcement")
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+    finally:
+        connection.close()
+    for change in changes:
+        logger.info(f"Schema upgrade: {change}")
+
+def _upgrade_sqlite_table(cursor, table: Table, engine: Engine) -> List[str]:
+    name = table.name
+    existing_columns = {row[1] for row in cursor.execute(f'PRAGMA table_info("{name}")')}
+    if not existing_columns:
+        return []  # New table, left to create_all
+
+    changes = []
+    for column in table.columns:
+        if column.name in existing_columns:
+            continue
+        if not column.nullable or column.primary_key:
+            raise RuntimeError(f"Can't add required column {name}.{column.name} to an existing table; migrate it by hand")
+        cursor.execute(f'ALTER TABLE "{name}" ADD COLUMN {CreateColumn(column).compile(engine)}')
+        changes.append(f"added column {name}.{column.name}")
+        if "backfill" in column.info:
+            cursor.execute(f'UPDATE "{name}" SET "{column.name}" = {column.info["backfill"]}')
+
+    # PRAGMA foreign_key_list rows: id, seq, table, from, to, on_update, on_delete, match
+    existing_keys = {
+        (row[3], row[2], row[4], row[6].upper())
+        for row in cursor.execute(f'PRAGMA foreign_key_list("{name}")')
+    }
+    model_keys = {
+        (key.parent.name, key.column.table.name, key.column.name, (key.ondelete or "NO ACTION").upper())
+        for key in table.foreign_keys
+    }
+    table_sql = cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()[0]
+    autoincrement = bool(table.dialect_options["sqlite"]["autoincrement"])
+    if existing_keys != model_keys or autoincrement != ("AUTOINCREMENT" in table_sql.upper()):
+        _rebuild_sqlite_table(cursor, table, engine)
+        changes.append(f"rebuilt {name} with the current foreign keys and AUTOINCREMENT")
+        if autoincrement and "autoincrement_floor" in table.info:
+            _raise_sequence(cursor, name, *table.info["autoincrement_floor"])
+
+    existing_indexes = {
+        row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (name,))
+    }
+    for index in table.indexes:
+        if index.name not in existing_indexes:
+            cursor.execute(str(CreateIndex(index).compile(engine)))
+            changes.append(f"created index {index.name}")
+    model_indexes = {index.name for index in table.indexes}
+    for index_name in sorted(existing_indexes - model_indexes):
+        if index_name.startswith("ix_"):
+            cursor.execute(f'DROP INDEX "{index_name}"')
+            changes.append(f"dropped index {index_name}")
+    return changes
+
+def _rebuild_sqlite_table(cursor, table: Table, engine: Engine) -> None:
+    """Copy `table` into a new table with the model's definition, then swap them.
+
+    The old table is dropped rather than renamed away: renaming would make
+    SQLite rewrite other tables' references to point at the old name.
+    Indexes go with the old table; the caller recreates them.
+    """
+    name = table.name
+    # Referenced tables come along so the copy's foreign keys resolve
+    copy = MetaData()
+    for key in table.foreign_keys:
+        if key.column.table.name not in copy.tables:
+            key.column.table.to_metadata(copy)
+    new_table = table.to_metadata(copy, name=f"_{name}_new")
+    columns = ", ".join(f'"{column.name}"' for column in table.columns)
+    cursor.execute(str(CreateTable(new_table).compile(engine)))
+    cursor.execute(f'INSERT INTO "_{name}_new" ({columns}) SELECT {columns} FROM "{name}"')
+    cursor.execute(f'DROP TABLE "{name}"')
+    cursor.execute(f'ALTER TABLE "_{name}_new" RENAME TO "{name}"')
+
+def _raise_sequence(cursor, name: str, floor_table: str, floor_column: str) -> None:
+    """Start the AUTOINCREMENT sequence of `name` past every id in `floor_table`.`floor_column`"""
+    if not cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (floor_table,)).fetchone():
+        return
+    floor = cursor.execute(f'SELECT MAX("{floor_column}") FROM "{floor_table}"').fetchone()[0]
+    if floor is None:
+        return
+    cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (floor, name))
+    if cursor.rowcount == 0:
+        cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (name, floor))
+
+def _check_columns(engine: Engine, metadata: MetaData) -> None:
+    inspector = inspect(engine)
+    missing = []
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing += [f"{table.name}.{column.name}" for column in table.columns if column.name not in existing]
+    if missing:
+        raise RuntimeError(f"Database schema is older than the models; add the missing columns first: {', '.join(missing)}")
@@ -1,8 +1,71 @@
-from .base import BaseSchema, TimestampMixin
-from .user import User, UserBase, UserCreate, UserUpdate
-from .tour import Tour, TourBase, TourCreate, TourUpdate, TourStats
-from .tour_request import TourRequest, TourRequestBase, TourRequestCreate, TourRequestUpdate
-from .feedback import Feedback, FeedbackBase, FeedbackCreate, FeedbackUpdate
+from .base import BaseSchema, TimestampMixin, ExpandableMixin
+from .user import User, UserBase, UserCreate, UserUpdate, UserSummary
+from .tour import (
+    Tour,
+    TourBase,
+    TourCreate,
+    TourUpdate,
+    TourStats,
+    PopularTour,
+    SimilarTour,
+    FacetBucket,
+    TourFacets,
+    TourCatalog,
+    LocationSuggestion
+)
+from .tour_request import (
+    TourRequest,
+    TourRequestBase,
+    TourRequestExpanded,
+    TourRequestCreate,
+    TourRequestUpdate,
+    TourRequestBulkStatusFilter,
+    TourRequestBulkStatusUpdate,
+    TourRequestBulkStatusResult,
+    TourRequestBulkStatusResponse,
+    TourRequestTombstone,
+    TourRequestChanges
+)
+from .feedback import (
+    Feedback,
+    FeedbackBase,
+    FeedbackExpanded,
+    FeedbackCreate,
+    FeedbackImport,
+    FeedbackUpdate,
+    FeedbackBulkCreate,
+    FeedbackBulkItemResult,
+    FeedbackBulkResponse,
+    FeedbackModerationPage,
+    FeedbackPublishRequest,
+    FeedbackPublishResponse
+)
+from .job import (
+    Job,
+    JobCreate,
+    DeleteTourJobParams,
+    DeleteUserJobParams,
+    ExportRequestsJobParams,
+    TourStatsJobParams,
+    SimilarToursJobParams,
+    PurgeDeletedJobParams,
+    PruneTombstonesJobParams
+)
+from .dashboard import UserDashboard
+from .adapters import TourList, FeedbackImportList
+from .admin import (
+    SlowQuery,
+    SlowQueryLogPage,
+    SlowQueryLogConfig,
+    ProfilingStart,
+    ProfiledFunction,
+    ProfiledRoute,
+    ProfilingStatus,
+    TraceSpan,
+    TraceSummary,
+    Trace,
+    TracePage
+)
 from .auth import AuthResponse, CurrentUser, LoginRequest, MessageResponse, SignupRequest
 
 # Export all schemas for easy importing
@@ -10,12 +73,14 @@ __all__ = [
     # Base schemas
     "BaseSchema",
     "TimestampMixin",
+    "ExpandableMixin",
     
     # User schemas
     "User",
     "UserBase", 
     "UserCreate",
     "UserUpdate",
+    "UserSummary",
     
     # Tour schemas
     "Tour",
@@ -23,18 +88,70 @@ __all__ = [
     "TourCreate", 
     "TourUpdate",
     "TourStats",
+    "PopularTour",
+    "SimilarTour",
+    "FacetBucket",
+    "TourFacets",
+    "TourCatalog",
+    "LocationSuggestion",
     
     # Tour Request schemas
     "TourRequest",
     "TourRequestBase",
+    "TourRequestExpanded",
     "TourRequestCreate",
     "TourRequestUpdate",
+    "TourRequestBulkStatusFilter",
+    "TourRequestBulkStatusUpdate",
+    "TourRequestBulkStatusResult",
+    "TourRequestBulkStatusResponse",
+    "TourRequestTombstone",
+    "TourRequestChanges",
     
     # Feedback schemas
     "Feedback",
     "FeedbackBase",
+    "FeedbackExpanded",
     "FeedbackCreate",
+    "FeedbackImport",
     "FeedbackUpdate",
+    "FeedbackBulkCreate",
+    "FeedbackBulkItemResult",
+    "FeedbackBulkResponse",
+    "FeedbackModerationPage",
+    "FeedbackPublishRequest",
+    "FeedbackPublishResponse",
+    
+    # Job schemas
+    "Job",
+    "JobCreate",
+    "DeleteTourJobParams",
+    "DeleteUserJobParams",
+    "ExportRequestsJobParams",
+    "TourStatsJobParams",
+    "SimilarToursJobParams",
+    "PurgeDeletedJobParams",
+    "PruneTombstonesJobParams",
+    
+    # Dashboard schemas
+    "UserDashboard",
+    
+    # Admin schemas
+    "SlowQuery",
+    "SlowQueryLogPage",
+    "SlowQueryLogConfig",
+    "ProfilingStart",
+    "ProfiledFunction",
+    "ProfiledRoute",
+    "ProfilingStatus",
+    "TraceSpan",
+    "TraceSummary",
+    "Trace",
+    "TracePage",
+    
+    # Cached list adapters
+    "TourList",
+    "FeedbackImportList",
     
     # Auth schemas
     "AuthResponse",
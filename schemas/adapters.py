@@ -0,0 +1,10 @@
+from typing import List
+from pydantic import TypeAdapter
+from .tour import Tour
+from .feedback import FeedbackImport
+
+# Building an adapter compiles a validator and serializer, which costs far more
+# than using it, so each list type gets one adapter shared by every request.
+# Expandable responses get theirs from `ExpandableMixin.adapter`.
+TourList = TypeAdapter(List[Tour])
+FeedbackImportList = TypeAdapter(List[FeedbackImport])
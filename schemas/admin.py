@@ -0,0 +1,65 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+
+class SlowQuery(BaseModel):
+    sql: str = Field(..., description="Statement with literals replaced by ?")
+    parameters: Dict[str, Any] = Field(..., description="Parameter count and types, never values")
+    duration_ms: float
+    route: Optional[str] = Field(None, description="Originating route, None outside HTTP requests")
+    recorded_at: datetime
+    plan: Optional[List[str]] = Field(None, description="Query plan, captured once per distinct statement")
+
+class SlowQueryLogPage(BaseModel):
+    threshold_ms: float
+    capacity: int
+    items: List[SlowQuery]
+
+class SlowQueryLogConfig(BaseModel):
+    threshold_ms: float = Field(..., ge=0, description="Log statements at least this slow")
+
+class ProfilingStart(BaseModel):
+    duration_seconds: int = Field(60, gt=0, le=3600, description="Length of the profiling window")
+    sample_rate: float = Field(0.1, gt=0, le=1, description="Fraction of requests to profile")
+
+class ProfiledFunction(BaseModel):
+    function: str
+    calls: int
+    self_seconds: float
+    cumulative_seconds: float
+
+class ProfiledRoute(BaseModel):
+    route: str
+    requests: int = Field(..., description="Number of profiled requests")
+    total_seconds: float
+    top_functions: List[ProfiledFunction] = Field(..., description="Functions by cumulative time")
+
+class ProfilingStatus(BaseModel):
+    active: bool
+    sample_rate: float
+    started_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    routes: List[ProfiledRoute]
+
+class TraceSpan(BaseModel):
+    span_id: str
+    parent_id: Optional[str] = None
+    name: str
+    start_ms: float = Field(..., description="Offset from the start of the trace")
+    duration_ms: float
+    attributes: Dict[str, Any] = {}
+
+class TraceSummary(BaseModel):
+    trace_id: str
+    route: str
+    status_code: int
+    duration_ms: float
+    span_count: int
+    recorded_at: datetime
+
+class Trace(TraceSummary):
+    spans: List[TraceSpan] = Field(..., description="Spans in start order")
+
+class TracePage(BaseModel):
+    capacity: int
+    items: List[TraceSummary]
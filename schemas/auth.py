@@ -1,28 +1,17 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from models import UserRole
+from .base import TitleCaseStr, Username
 
 class LoginRequest(BaseModel):
     username: str = Field(..., min_length=3, max_length=50)
     password: str = Field(..., min_length=6, max_length=100)
 
 class SignupRequest(BaseModel):
-    username: str = Field(..., min_length=3, max_length=50)
+    username: Username
     email: EmailStr
-    full_name: str = Field(..., min_length=2, max_length=100)
+    full_name: TitleCaseStr(2, 100)
     password: str = Field(..., min_length=6, max_length=100)
     role: UserRole = UserRole.REQUESTOR
-    
-    @validator('username')
-    def validate_username(cls, v):
-        if not v.replace('_', '').replace('-', '').isalnum():
-            raise ValueError('Username can only contain letters, numbers, hyphens, and underscores')
-        return v.lower()
-    
-    @validator('full_name')
-    def validate_full_name(cls, v):
-        if not v.strip():
-            raise ValueError('Full name cannot be empty')
-        return v.strip().title()
 
 class CurrentUser(BaseModel):
     id: int
@@ -32,8 +21,7 @@ class CurrentUser(BaseModel):
     role: UserRole
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class AuthResponse(BaseModel):
     access_token: str
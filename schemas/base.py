@@ -1,17 +1,70 @@
-from pydantic import BaseModel
+from pydantic import AfterValidator, BaseModel, ConfigDict, StringConstraints, TypeAdapter, create_model
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Annotated, ClassVar, FrozenSet, List, Optional, Tuple
+
+def _empty_to_none(value: str) -> Optional[str]:
+    return value or None
+
+def TitleCaseStr(min_length: int, max_length: int):
+    """Stripped, length-checked string in title case.
+
+    Stripping and length checks run in pydantic-core; only `str.title` calls
+    back into Python.
+    """
+    return Annotated[
+        str,
+        StringConstraints(strip_whitespace=True, min_length=min_length, max_length=max_length),
+        AfterValidator(str.title)
+    ]
+
+def OptionalText(max_length: int):
+    """Stripped free text where blank input means no text"""
+    return Annotated[
+        str,
+        StringConstraints(strip_whitespace=True, max_length=max_length),
+        AfterValidator(_empty_to_none)
+    ]
+
+# Letters, digits, hyphens and underscores, stored lower case
+Username = Annotated[str, StringConstraints(min_length=3, max_length=50, pattern=r"^[\w-]+$", to_lower=True)]
 
 class BaseSchema(BaseModel):
     """Base schema with common configuration"""
     
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    # Pydantic v2 serializes datetimes to ISO 8601 natively
+    model_config = ConfigDict(from_attributes=True)
 
 class TimestampMixin(BaseModel):
     """Mixin for models with timestamp fields"""
     created_at: datetime
     updated_at: Optional[datetime] = None
+
+class ExpandableMixin(BaseModel):
+    """Mixin for responses with embeddable relations, omitted unless expanded.
+
+    The class documents every relation. Responses are serialized with
+    `adapter(expand)` instead, whose model adds only the expanded relations
+    to the plain schema: unexpanded ones are not fields at all, so nothing
+    has to strip them from each object at dump time.
+    """
+    expandable: ClassVar[Tuple[str, ...]] = ()
+
+    @classmethod
+    def adapter(cls, expand: FrozenSet[str], many: bool = False) -> TypeAdapter:
+        """Cached adapter for one object, or a list with `many`, carrying the `expand` relations"""
+        return _expanded_adapter(cls, expand & frozenset(cls.expandable), many)
+
+@lru_cache(maxsize=None)
+def _expanded_adapter(model, expand: FrozenSet[str], many: bool) -> TypeAdapter:
+    plain = next(
+        base for base in model.__mro__[1:]
+        if issubclass(base, BaseModel) and not issubclass(base, ExpandableMixin)
+    )
+    names = sorted(expand)
+    expanded = create_model(
+        f"{plain.__name__}With{''.join(name.title() for name in names)}",
+        __base__=plain,
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in names}
+    ) if names else plain
+    return TypeAdapter(List[expanded] if many else expanded)
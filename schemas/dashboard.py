@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List
+from datetime import datetime
+from models import RequestStatus
+from .tour import Tour
+from .tour_request import TourRequest
+from .feedback import Feedback
+
+class UserDashboard(BaseModel):
+    status_counts: Dict[RequestStatus, int] = Field(..., description="Number of the user's requests per status")
+    requests: List[TourRequest] = Field(..., description="The user's requests, newest first")
+    feedbacks: List[Feedback] = Field(..., description="The user's feedback, newest first")
+    tours: List[Tour] = Field(..., description="Every tour referenced by the requests and feedback above")
+    generated_at: datetime
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
 from datetime import datetime
-from .base import BaseSchema, TimestampMixin
+from .base import BaseSchema, TimestampMixin, ExpandableMixin, OptionalText
+from .tour import Tour
+from .user import UserSummary
 
 class FeedbackBase(BaseSchema):
     tour_id: int = Field(..., gt=0)
@@ -10,37 +12,49 @@ class FeedbackBase(BaseSchema):
     is_published: bool = False
 
 class FeedbackCreate(FeedbackBase):
-    @validator('rating')
-    def validate_rating(cls, v):
-        if not 1 <= v <= 5:
-            raise ValueError('Rating must be between 1 and 5')
-        return v
-    
-    @validator('comment')
-    def validate_comment(cls, v):
-        if v and not v.strip():
-            return None
-        return v.strip() if v else v
+    comment: Optional[OptionalText(2000)] = None
+
+class FeedbackImport(FeedbackCreate):
+    user_id: int = Field(..., gt=0, description="Author of the review")
 
 class FeedbackUpdate(BaseModel):
     rating: Optional[int] = Field(None, ge=1, le=5)
-    comment: Optional[str] = Field(None, max_length=2000)
+    comment: Optional[OptionalText(2000)] = None
     is_published: Optional[bool] = None
-    
-    @validator('rating')
-    def validate_rating(cls, v):
-        if v is not None and not 1 <= v <= 5:
-            raise ValueError('Rating must be between 1 and 5')
-        return v
-    
-    @validator('comment')
-    def validate_comment(cls, v):
-        if v and not v.strip():
-            return None
-        return v.strip() if v else v
 
 class Feedback(FeedbackBase, TimestampMixin):
     id: int
     user_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+
+class FeedbackExpanded(Feedback, ExpandableMixin):
+    expandable = ("tour", "user")
+    tour: Optional[Tour] = Field(None, description="Present with expand=tour")
+    user: Optional[UserSummary] = Field(None, description="Present with expand=user")
+
+class FeedbackBulkCreate(BaseModel):
+    # Items are FeedbackImport dicts, validated one by one so a bad row doesn't reject the whole batch
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=5000)
+
+class FeedbackBulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class FeedbackBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[FeedbackBulkItemResult]
+
+class FeedbackModerationPage(BaseModel):
+    items: List[Feedback]
+    next_cursor: Optional[int] = Field(None, description="Pass as `after` to get the next page")
+
+class FeedbackPublishRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=5000)
+    is_published: bool = True
+
+class FeedbackPublishResponse(BaseModel):
+    updated: int
+    not_found: List[int]
@@ -0,0 +1,44 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+from models import JobStatus, RequestStatus
+from .base import BaseSchema
+
+class JobCreate(BaseModel):
+    type: str = Field(..., min_length=1, max_length=50, description="Registered job type")
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+class Job(BaseSchema):
+    id: int
+    type: str
+    status: JobStatus
+    params: Dict[str, Any]
+    progress: int = Field(..., description="Percent complete")
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_by: Optional[int] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class DeleteTourJobParams(BaseModel):
+    tour_id: int = Field(..., gt=0)
+
+class DeleteUserJobParams(BaseModel):
+    user_id: int = Field(..., gt=0)
+
+class ExportRequestsJobParams(BaseModel):
+    status: Optional[RequestStatus] = None
+    tour_id: Optional[int] = Field(None, gt=0)
+
+class TourStatsJobParams(BaseModel):
+    pass
+
+class SimilarToursJobParams(BaseModel):
+    top_k: int = Field(10, ge=1, le=100)
+
+class PurgeDeletedJobParams(BaseModel):
+    grace_seconds: int = Field(0, ge=0, description="Only purge rows soft deleted longer ago than this")
+
+class PruneTombstonesJobParams(BaseModel):
+    retention_seconds: int = Field(0, ge=0, description="Keep tombstones younger than this")
@@ -1,7 +1,7 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List
 from datetime import datetime
-from .base import BaseSchema, TimestampMixin
+from .base import BaseSchema, TimestampMixin, TitleCaseStr
 
 class TourBase(BaseSchema):
     title: str = Field(..., min_length=3, max_length=200)
@@ -13,38 +13,17 @@ class TourBase(BaseSchema):
     is_active: bool = True
 
 class TourCreate(TourBase):
-    @validator('title')
-    def validate_title(cls, v):
-        if not v.strip():
-            raise ValueError('Title cannot be empty')
-        return v.strip().title()
-    
-    @validator('location')
-    def validate_location(cls, v):
-        if not v.strip():
-            raise ValueError('Location cannot be empty')
-        return v.strip().title()
+    title: TitleCaseStr(3, 200)
+    location: TitleCaseStr(2, 200)
 
 class TourUpdate(BaseModel):
-    title: Optional[str] = Field(None, min_length=3, max_length=200)
+    title: Optional[TitleCaseStr(3, 200)] = None
     description: Optional[str] = None
-    location: Optional[str] = Field(None, min_length=2, max_length=200)
+    location: Optional[TitleCaseStr(2, 200)] = None
     duration_days: Optional[int] = Field(None, gt=0, le=365)
     max_participants: Optional[int] = Field(None, gt=0, le=1000)
     price: Optional[int] = Field(None, gt=0)
     is_active: Optional[bool] = None
-    
-    @validator('title')
-    def validate_title(cls, v):
-        if v and not v.strip():
-            raise ValueError('Title cannot be empty')
-        return v.strip().title() if v else v
-    
-    @validator('location')
-    def validate_location(cls, v):
-        if v and not v.strip():
-            raise ValueError('Location cannot be empty')
-        return v.strip().title() if v else v
 
 class Tour(TourBase, TimestampMixin):
     id: int
@@ -56,12 +35,37 @@ class TourStats(BaseModel):
     inactive: int = Field(..., description="Number of inactive tours")
     participants: int = Field(..., description="Total participants in active tours")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "total": 15,
-                "active": 12,
-                "inactive": 3,
-                "participants": 245
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "total": 15,
+            "active": 12,
+            "inactive": 3,
+            "participants": 245
         }
+    })
+
+class PopularTour(BaseModel):
+    tour: Tour
+    request_count: int = Field(..., description="Pending and approved requests in the window")
+
+class SimilarTour(BaseModel):
+    tour: Tour
+    co_requests: int = Field(..., description="Users who requested both tours")
+
+class FacetBucket(BaseModel):
+    value: str
+    count: int
+
+class TourFacets(BaseModel):
+    location: List[FacetBucket]
+    price: List[FacetBucket]
+    duration: List[FacetBucket]
+
+class TourCatalog(BaseModel):
+    items: List[Tour]
+    total: int
+    facets: TourFacets
+
+class LocationSuggestion(BaseModel):
+    location: str
+    tour_count: int = Field(..., description="Active tours at this location")
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional
+from pydantic import BaseModel, Field, FutureDatetime, model_validator
+from typing import Optional, List
 from datetime import datetime
 from models import RequestStatus
-from .base import BaseSchema, TimestampMixin
+from .base import BaseSchema, TimestampMixin, ExpandableMixin, OptionalText
+from .tour import Tour
+from .user import UserSummary
 
 class TourRequestBase(BaseSchema):
     tour_id: int = Field(..., gt=0)
@@ -11,35 +13,15 @@ class TourRequestBase(BaseSchema):
     notes: Optional[str] = Field(None, max_length=1000)
 
 class TourRequestCreate(TourRequestBase):
-    @validator('preferred_date')
-    def validate_preferred_date(cls, v):
-        if v <= datetime.now():
-            raise ValueError('Preferred date must be in the future')
-        return v
-    
-    @validator('notes')
-    def validate_notes(cls, v):
-        if v and not v.strip():
-            return None
-        return v.strip() if v else v
+    # Naive datetimes are compared with local time, like datetime.now()
+    preferred_date: FutureDatetime
+    notes: Optional[OptionalText(1000)] = None
 
 class TourRequestUpdate(BaseModel):
     participants_count: Optional[int] = Field(None, gt=0, le=50)
-    preferred_date: Optional[datetime] = None
+    preferred_date: Optional[FutureDatetime] = None
     status: Optional[RequestStatus] = None
-    notes: Optional[str] = Field(None, max_length=1000)
-    
-    @validator('preferred_date')
-    def validate_preferred_date(cls, v):
-        if v and v <= datetime.now():
-            raise ValueError('Preferred date must be in the future')
-        return v
-    
-    @validator('notes')
-    def validate_notes(cls, v):
-        if v and not v.strip():
-            return None
-        return v.strip() if v else v
+    notes: Optional[OptionalText(1000)] = None
 
 class TourRequest(TourRequestBase, TimestampMixin):
     id: int
@@ -47,3 +29,52 @@ class TourRequest(TourRequestBase, TimestampMixin):
     status: RequestStatus
     created_at: datetime
     updated_at: Optional[datetime] = None
+
+class TourRequestExpanded(TourRequest, ExpandableMixin):
+    expandable = ("tour", "user")
+    tour: Optional[Tour] = Field(None, description="Present with expand=tour")
+    user: Optional[UserSummary] = Field(None, description="Present with expand=user")
+
+class TourRequestBulkStatusFilter(BaseModel):
+    status: Optional[RequestStatus] = None
+    tour_id: Optional[int] = Field(None, gt=0)
+    user_id: Optional[int] = Field(None, gt=0)
+    created_before: Optional[datetime] = None
+    
+    @model_validator(mode="after")
+    def validate_not_empty(self):
+        # An empty filter would select every request in the table
+        if all(value is None for value in (self.status, self.tour_id, self.user_id, self.created_before)):
+            raise ValueError('Filter must set at least one of status, tour_id, user_id or created_before')
+        return self
+
+class TourRequestBulkStatusUpdate(BaseModel):
+    status: RequestStatus = Field(..., description="Target status")
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    filter: Optional[TourRequestBulkStatusFilter] = None
+    
+    @model_validator(mode="after")
+    def validate_selection(self):
+        if (self.filter is None) == (self.ids is None):
+            raise ValueError('Exactly one of ids or filter must be provided')
+        return self
+
+class TourRequestBulkStatusResult(BaseModel):
+    id: int
+    outcome: str = Field(..., description="updated, unchanged, not_found or invalid_transition")
+    previous_status: Optional[RequestStatus] = None
+
+class TourRequestBulkStatusResponse(BaseModel):
+    status: RequestStatus
+    updated: int
+    results: List[TourRequestBulkStatusResult]
+
+class TourRequestTombstone(BaseSchema):
+    request_id: int
+    deleted_at: datetime
+
+class TourRequestChanges(BaseModel):
+    changes: List[TourRequest] = Field(..., description="Requests created or updated since the cursor")
+    deleted: List[TourRequestTombstone] = Field(..., description="Requests deleted since the cursor")
+    cursor: str = Field(..., description="Opaque cursor to pass as `since` on the next poll")
+    has_more: bool = Field(..., description="More changes are available right away")
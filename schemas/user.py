@@ -1,8 +1,8 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 from models import UserRole
-from .base import BaseSchema, TimestampMixin
+from .base import BaseSchema, TimestampMixin, TitleCaseStr, Username
 
 class UserBase(BaseSchema):
     username: str = Field(..., min_length=3, max_length=50)
@@ -12,39 +12,23 @@ class UserBase(BaseSchema):
     is_active: bool = True
 
 class UserCreate(UserBase):
+    username: Username
+    full_name: TitleCaseStr(2, 100)
     password: str = Field(..., min_length=6, max_length=100)
-    
-    @validator('username')
-    def validate_username(cls, v):
-        if not v.replace('_', '').replace('-', '').isalnum():
-            raise ValueError('Username can only contain letters, numbers, hyphens, and underscores')
-        return v.lower()
-    
-    @validator('full_name')
-    def validate_full_name(cls, v):
-        if not v.strip():
-            raise ValueError('Full name cannot be empty')
-        return v.strip().title()
 
 class UserUpdate(BaseModel):
-    username: Optional[str] = Field(None, min_length=3, max_length=50)
+    username: Optional[Username] = None
     email: Optional[EmailStr] = None
-    full_name: Optional[str] = Field(None, min_length=2, max_length=100)
+    full_name: Optional[TitleCaseStr(2, 100)] = None
     role: Optional[UserRole] = None
     is_active: Optional[bool] = None
-    
-    @validator('username')
-    def validate_username(cls, v):
-        if v and not v.replace('_', '').replace('-', '').isalnum():
-            raise ValueError('Username can only contain letters, numbers, hyphens, and underscores')
-        return v.lower() if v else v
-    
-    @validator('full_name')
-    def validate_full_name(cls, v):
-        if v and not v.strip():
-            raise ValueError('Full name cannot be empty')
-        return v.strip().title() if v else v
 
 class User(UserBase, TimestampMixin):
     id: int
     created_at: datetime
+
+class UserSummary(BaseSchema):
+    """Public view of a user, embedded in other resources"""
+    id: int
+    username: str
+    full_name: str
@@ -0,0 +1,101 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+from datetime import datetime, timedelta
+import logging
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Base, User, Tour, TourRequest, Feedback, UserRole
+from schemas import CurrentUser
+from routers.requests import get_requests
+from routers.feedbacks import get_feedbacks
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EXPANSIONS = [frozenset(), frozenset({"tour"}), frozenset({"user"}), frozenset({"tour", "user"})]
+
+def populate(session_factory, rows: int) -> CurrentUser:
+    """Fill a fresh database with `rows` requests and feedbacks over many users and tours"""
+    db = session_factory()
+    try:
+        users = [
+            User(
+                username=f"user{index}",
+                email=f"user{index}@example.com",
+                full_name=f"User {index}",
+                hashed_password="x",
+                role=UserRole.ADMIN if index == 0 else UserRole.REQUESTOR
+            )
+            for index in range(max(rows // 2, 1))
+        ]
+        tours = [
+            Tour(title=f"Tour {index}", location="Somewhere", duration_days=1, max_participants=10, price=100)
+            for index in range(max(rows // 3, 1))
+        ]
+        db.add_all(users + tours)
+        db.flush()
+        preferred_date = datetime.utcnow() + timedelta(days=30)
+        for index in range(rows):
+            user, tour = users[index % len(users)], tours[index % len(tours)]
+            db.add(TourRequest(user_id=user.id, tour_id=tour.id, preferred_date=preferred_date))
+            db.add(Feedback(user_id=user.id, tour_id=tour.id, rating=5, is_published=True))
+        db.commit()
+        return CurrentUser.model_validate(users[0])
+    finally:
+        db.close()
+
+def count_queries(rows: int) -> dict:
+    """Statements issued to list and serialize `rows` requests/feedbacks, per expansion"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    admin = populate(session_factory, rows)
+
+    statements = [0]
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.__setitem__(0, statements[0] + 1))
+
+    endpoints = [
+        ("requests", get_requests),
+        ("feedbacks", get_feedbacks)
+    ]
+    counts = {}
+    for name, endpoint in endpoints:
+        for expand in EXPANSIONS:
+            db = session_factory()
+            try:
+                statements[0] = 0
+                # The endpoints serialize, which is where lazy loads would show up
+                response = asyncio.run(endpoint(expand=expand, db=db, current_user=admin))
+                payload = json.loads(response.body)
+                assert len(payload) == rows
+                assert all(set(item) >= expand for item in payload)
+                counts[(name, ",".join(sorted(expand)) or "-")] = statements[0]
+            finally:
+                db.close()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that expand=tour,user costs a constant number of queries")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated result sizes")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    results = {size: count_queries(size) for size in sizes}
+    failures = 0
+    for key in results[sizes[0]]:
+        counts = [results[size][key] for size in sizes]
+        constant = len(set(counts)) == 1
+        failures += not constant
+        logger.info(f"{key[0]:<10} expand={key[1]:<10} queries={counts} {'ok' if constant else 'GROWS WITH RESULT SIZE'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
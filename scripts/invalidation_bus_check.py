@@ -0,0 +1,222 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import subprocess
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+import logging
+
+from load_test import LOAD_PASSWORD, HttpClient, call, login_or_signup
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def start_server(port: int, workers: int, poll_interval: float, workdir: str) -> subprocess.Popen:
+    """`python main.py --workers N` on a fresh database in `workdir`"""
+    env = dict(os.environ, INVALIDATION_POLL_SECONDS=str(poll_interval))
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(PROJECT_ROOT, "main.py"), "--workers", str(workers), "--port", str(port)],
+        cwd=workdir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    for _ in range(200):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health")
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise SystemExit("Server did not start")
+
+async def connect_to_each_worker(port: int, workers: int, attempts: int = 200) -> Dict[int, HttpClient]:
+    """One keep-alive connection per worker process: a connection stays with the worker that accepted it"""
+    clients: Dict[int, HttpClient] = {}
+    spare = []
+    for _ in range(attempts):
+        client = HttpClient("127.0.0.1", port)
+        _, body = await call(client, "GET", "/health")
+        pid = json.loads(body)["invalidation"]["pid"]
+        if pid in clients:
+            spare.append(client)
+        else:
+            clients[pid] = client
+        if len(clients) == workers:
+            break
+    for client in spare:
+        await client.close()
+    if len(clients) < workers:
+        raise SystemExit(f"Reached {len(clients)} of {workers} workers")
+    return clients
+
+async def converge(clients: List[HttpClient], is_fresh: Callable, timeout: float) -> List[float]:
+    """Seconds until each client's worker returns fresh data, polling every 10 ms"""
+    started = time.perf_counter()
+    delays = [None] * len(clients)
+    while None in delays and time.perf_counter() - started < timeout:
+        for index, client in enumerate(clients):
+            if delays[index] is None and await is_fresh(client):
+                delays[index] = time.perf_counter() - started
+        await asyncio.sleep(0.01)
+    return delays
+
+async def run(args) -> dict:
+    clients = await connect_to_each_worker(args.port, args.workers)
+    writer, *readers = clients.values()
+    admin_token = await login_or_signup(writer, "bus_check_admin", "admin")
+    user_token = await login_or_signup(writer, "bus_check_user", "requestor")
+    state = {"tours": 0}
+
+    async def get_json(client, path, token=None):
+        _, body = await call(client, "GET", path, token)
+        return json.loads(body)
+
+    async def next_location(client):
+        state["tours"] += 1
+        state["location"] = f"Buscheck {int(time.time())} {state['tours']}"
+
+    async def create_tour(client):
+        _, body = await call(client, "POST", "/tour", admin_token, {
+            "title": "Bus Check Tour",
+            "location": state["location"],
+            "duration_days": 2,
+            "max_participants": 10,
+            "price": 10000,
+            "is_active": True
+        })
+        state["tour_id"] = json.loads(body)["id"]
+
+    async def create_request(client):
+        await call(client, "POST", "/request", user_token, {
+            "tour_id": state["tour_id"],
+            "participants_count": 1,
+            "preferred_date": (datetime.now() + timedelta(days=30)).isoformat()
+        })
+
+    async def popularity(client):
+        popular = await get_json(client, "/tour/popular?n=100")
+        return next((item["request_count"] for item in popular if item["tour"]["id"] == state["tour_id"]), 0)
+
+    async def dashboard_requests(client):
+        return len((await get_json(client, "/user/me/dashboard", user_token))["requests"])
+
+    async def record(client):
+        state["popularity"] = await popularity(client)
+        state["dashboard_requests"] = await dashboard_requests(client)
+
+    async def login(client):
+        _, body = await call(client, "POST", "/auth/login", payload={"username": "bus_check_user", "password": LOAD_PASSWORD})
+        state["revoked"] = json.loads(body)["access_token"]
+
+    async def logout(client):
+        await call(client, "POST", "/auth/logout", state["revoked"])
+
+    async def suggests_location(client):
+        suggestions = await get_json(client, f"/tour/locations/suggest?prefix={state['location'].replace(' ', '%20')}")
+        return any(suggestion["location"] == state["location"] for suggestion in suggestions)
+
+    async def facets_include_location(client):
+        catalog = await get_json(client, "/tour?facets=true")
+        return any(bucket["value"] == state["location"] for bucket in catalog["facets"]["location"])
+
+    async def tour_more_popular(client):
+        return await popularity(client) > state["popularity"]
+
+    async def dashboard_grew(client):
+        return await dashboard_requests(client) > state["dashboard_requests"]
+
+    async def token_rejected(client):
+        status_code, _ = await call(client, "GET", "/auth/me", state["revoked"])
+        return status_code == 401
+
+    # (name, setup, write through the first worker, freshness check on the others).
+    # The check runs on every other worker before the write too, so each of them
+    # has the cache loaded and would keep serving it without an invalidation.
+    checks = [
+        ("location index", next_location, create_tour, suggests_location),
+        ("catalog facets", next_location, create_tour, facets_include_location),
+        ("popularity", record, create_request, tour_more_popular),
+        ("dashboard", record, create_request, dashboard_grew),
+        ("revoked tokens", login, logout, token_rejected)
+    ]
+    bound = 2 * args.poll_interval + args.slack
+    results = {}
+    for name, setup, write, is_fresh in checks:
+        await setup(writer)
+        for client in readers:
+            if await is_fresh(client):
+                raise SystemExit(f"{name}: already fresh before the write")
+        await write(writer)
+        delays = await converge(readers, is_fresh, args.timeout)
+        converged = [delay for delay in delays if delay is not None]
+        results[name] = {
+            "converged_workers": len(converged),
+            "max_delay_ms": round(max(converged) * 1000, 1) if converged else None,
+            "within_bound": len(converged) == len(readers) and max(converged) <= bound
+        }
+        logger.info(f"{name}: {results[name]}")
+
+    for client in clients.values():
+        await client.close()
+    summary = {"workers": args.workers, "poll_interval": args.poll_interval, "bound_ms": round(bound * 1000, 1), "checks": results}
+    return summary, state["revoked"]
+
+async def check_after_restart(args, revoked: str) -> dict:
+    """Every freshly started worker must still reject a token revoked before the restart"""
+    clients = await connect_to_each_worker(args.port, args.workers)
+    rejecting = 0
+    for client in clients.values():
+        status_code, _ = await call(client, "GET", "/auth/me", revoked)
+        rejecting += status_code == 401
+        await client.close()
+    return {"rejecting_workers": rejecting, "within_bound": rejecting == len(clients)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that in-process caches converge across real worker processes")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--poll-interval", type=float, default=0.25, help="INVALIDATION_POLL_SECONDS for the server")
+    parser.add_argument("--slack", type=float, default=0.5, help="Seconds allowed over two poll intervals")
+    parser.add_argument("--timeout", type=float, default=10, help="Give up on a worker after this many seconds")
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+    if args.workers < 2:
+        raise SystemExit("Need at least two workers")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server = start_server(args.port, args.workers, args.poll_interval, workdir)
+        try:
+            results, revoked = asyncio.run(run(args))
+        finally:
+            server.terminate()
+            server.wait()
+
+        server = start_server(args.port, args.workers, args.poll_interval, workdir)
+        try:
+            results["checks"]["revoked tokens after restart"] = asyncio.run(check_after_restart(args, revoked))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    failed = [name for name, check in results["checks"].items() if not check["within_bound"]]
+    if failed:
+        logger.error(f"Did not converge within {results['bound_ms']} ms: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
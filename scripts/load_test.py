@@ -0,0 +1,413 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+import urllib.request
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIX = "browse=50,login=5,create_request=20,admin_list=15,stats=10"
+LOAD_PASSWORD = "load_test_password"
+LOAD_LOCATIONS = ["Paris", "Rome", "Kyoto", "Lisbon", "Reykjavik", "Cusco", "Cape Town", "Queenstown"]
+
+class AsgiClient:
+    """Calls the application in this process, with no sockets or server in between"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def start(self) -> None:
+        await self.app.router.startup()
+
+    async def close(self) -> None:
+        await self.app.router.shutdown()
+
+    async def request(self, method: str, path: str, headers: Dict[str, str], body: Optional[bytes]) -> Tuple[int, bytes]:
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+            "client": ("127.0.0.1", 50000),
+            "server": ("127.0.0.1", 80)
+        }
+        request_body = body or b""
+        response_status = 500
+        chunks = []
+
+        async def receive():
+            return {"type": "http.request", "body": request_body, "more_body": False}
+
+        async def send(message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return response_status, b"".join(chunks)
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client; one instance per virtual user"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def request(self, method: str, path: str, headers: Dict[str, str], body: Optional[bytes]) -> Tuple[int, bytes]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body or b'')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + (body or b""))
+        try:
+            await self._writer.drain()
+            return await self._read_response()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            raise
+
+    async def _read_response(self) -> Tuple[int, bytes]:
+        head = (await self._reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        status_code = int(head[0].split(" ", 2)[1])
+        response_headers = {}
+        for line in head[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int((await self._reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                chunk = await self._reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                chunks.append(chunk[:-2])
+            response_body = b"".join(chunks)
+        else:
+            response_body = await self._reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection") == "close":
+            await self.close()
+        return status_code, response_body
+
+class Recorder:
+    """Latencies per endpoint label, counted only after the warm-up"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.recording = False
+
+    def record(self, label: str, seconds: float, ok: bool) -> None:
+        if not self.recording:
+            return
+        self.latencies.setdefault(label, []).append(seconds)
+        if not ok:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+class Scenarios:
+    """The traffic mix; each scenario picks one request: (label, method, path, token, payload)"""
+
+    def __init__(self, rng: random.Random, tour_ids: List[int], admin_token: str, user_tokens: List[str], usernames: List[str]):
+        self.rng = rng
+        self.tour_ids = tour_ids
+        self.admin_token = admin_token
+        self.user_tokens = user_tokens
+        self.usernames = usernames
+
+    def _popular_tour(self) -> int:
+        # A few tours get most of the traffic
+        return self.tour_ids[min(int(self.rng.paretovariate(1.2)) - 1, len(self.tour_ids) - 1)]
+
+    def browse(self):
+        choice = self.rng.random()
+        if choice < 0.4:
+            return "GET /tour", "GET", "/tour", None, None
+        if choice < 0.6:
+            location = self.rng.choice(LOAD_LOCATIONS).replace(" ", "%20")
+            return "GET /tour?location", "GET", f"/tour?location={location}&facets=true", None, None
+        if choice < 0.8:
+            return "GET /tour/{tour_id}", "GET", f"/tour/{self._popular_tour()}", None, None
+        return "GET /tour/popular", "GET", "/tour/popular", None, None
+
+    def login(self):
+        username = self.rng.choice(self.usernames)
+        return "POST /auth/login", "POST", "/auth/login", None, {"username": username, "password": LOAD_PASSWORD}
+
+    def create_request(self):
+        preferred_date = datetime.now() + timedelta(days=self.rng.randint(7, 300))
+        return "POST /request", "POST", "/request", self.rng.choice(self.user_tokens), {
+            "tour_id": self._popular_tour(),
+            "participants_count": self.rng.randint(1, 6),
+            "preferred_date": preferred_date.isoformat()
+        }
+
+    def admin_list(self):
+        if self.rng.random() < 0.7:
+            return "GET /request (admin)", "GET", "/request", self.admin_token, None
+        return "GET /user", "GET", "/user", self.admin_token, None
+
+    def stats(self):
+        if self.rng.random() < 0.7:
+            return "GET /tour/stats", "GET", "/tour/stats", None, None
+        return "GET /tour/stats/detailed", "GET", "/tour/stats/detailed", None, None
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if not hasattr(Scenarios, name.strip()):
+            raise SystemExit(f"Unknown scenario '{name}'")
+        weights[name.strip()] = float(weight)
+    return weights
+
+async def call(client, method: str, path: str, token: Optional[str] = None, payload: Optional[dict] = None) -> Tuple[int, bytes]:
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    body = json.dumps(payload).encode() if payload is not None else None
+    return await client.request(method, path, headers, body)
+
+async def login_or_signup(client, username: str, role: str) -> str:
+    """Token for a load-test user, creating it on first use"""
+    status_code, body = await call(client, "POST", "/auth/login", payload={"username": username, "password": LOAD_PASSWORD})
+    if status_code != 200:
+        status_code, body = await call(client, "POST", "/auth/signup", payload={
+            "username": username,
+            "email": f"{username}@loadtest.example.com",
+            "full_name": "Load Test",
+            "password": LOAD_PASSWORD,
+            "role": role
+        })
+        if status_code != 200:
+            raise SystemExit(f"Could not create load-test user {username}: {status_code} {body[:200]!r}")
+    return json.loads(body)["access_token"]
+
+async def prepare(client, users: int, tours: int) -> Tuple[str, List[str], List[str], List[int]]:
+    """Make sure the load-test users and enough active tours exist"""
+    admin_token = await login_or_signup(client, "loadtest_admin", "admin")
+    usernames = [f"loadtest_user_{index}" for index in range(users)]
+    user_tokens = [await login_or_signup(client, username, "requestor") for username in usernames]
+
+    _, body = await call(client, "GET", "/tour")
+    tour_ids = [tour["id"] for tour in json.loads(body)]
+    rng = random.Random(0)
+    while len(tour_ids) < tours:
+        status_code, body = await call(client, "POST", "/tour", admin_token, {
+            "title": f"Load Test Tour {len(tour_ids)}",
+            "location": rng.choice(LOAD_LOCATIONS),
+            "duration_days": rng.randint(1, 14),
+            "max_participants": rng.randint(5, 50),
+            "price": rng.randint(50, 500) * 100,
+            "is_active": True
+        })
+        if status_code != 200:
+            raise SystemExit(f"Could not create load-test tour: {status_code} {body[:200]!r}")
+        tour_ids.append(json.loads(body)["id"])
+    return admin_token, user_tokens, usernames, tour_ids[:max(tours, 1)]
+
+async def virtual_user(client, scenarios: Scenarios, weights: Dict[str, float], recorder: Recorder, deadline: float) -> None:
+    names = list(weights)
+    scenario_weights = list(weights.values())
+    while time.perf_counter() < deadline:
+        name = scenarios.rng.choices(names, weights=scenario_weights)[0]
+        label, method, path, token, payload = getattr(scenarios, name)()
+        started = time.perf_counter()
+        try:
+            status_code, _ = await call(client, method, path, token, payload)
+            ok = status_code < 400
+        except (ConnectionError, asyncio.IncompleteReadError):
+            ok = False
+        recorder.record(label, time.perf_counter() - started, ok)
+
+async def run(args, make_client) -> dict:
+    setup_client = make_client()
+    await setup_client.start()
+    try:
+        admin_token, user_tokens, usernames, tour_ids = await prepare(setup_client, args.users, args.tours)
+        recorder = Recorder()
+        weights = parse_mix(args.mix)
+        clients = [make_client() for _ in range(args.concurrency)]
+        # One seeded generator per virtual user keeps each one's request sequence reproducible
+        scenarios = [
+            Scenarios(random.Random(args.seed + index), tour_ids, admin_token, user_tokens, usernames)
+            for index in range(args.concurrency)
+        ]
+        deadline = time.perf_counter() + args.warmup + args.duration
+        workers = [
+            asyncio.ensure_future(virtual_user(client, scenario, weights, recorder, deadline))
+            for client, scenario in zip(clients, scenarios)
+        ]
+        await asyncio.sleep(args.warmup)
+        recorder.recording = True
+        measured_from = time.perf_counter()
+        await asyncio.gather(*workers)
+        elapsed = time.perf_counter() - measured_from
+        for client in clients:
+            await client.close()
+    finally:
+        await setup_client.close()
+    return summarize(recorder, elapsed)
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    endpoints = {}
+    for label, latencies in sorted(recorder.latencies.items()):
+        latencies.sort()
+        endpoints[label] = {
+            "requests": len(latencies),
+            "errors": recorder.errors.get(label, 0),
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "max_ms": round(latencies[-1] * 1000, 3)
+        }
+    total = sum(endpoint["requests"] for endpoint in endpoints.values())
+    return {
+        "total": {
+            "requests": total,
+            "errors": sum(recorder.errors.values()),
+            "seconds": round(elapsed, 3),
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0
+        },
+        "endpoints": endpoints
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Endpoints whose p95 grew by more than `tolerance` (a fraction) over the baseline"""
+    regressions = []
+    for label, endpoint in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(label)
+        if not previous or not previous["p95_ms"]:
+            continue
+        change = endpoint["p95_ms"] / previous["p95_ms"] - 1
+        logger.info(f"{label}: p95 {previous['p95_ms']} -> {endpoint['p95_ms']} ms ({change:+.1%})")
+        if change > tolerance:
+            regressions.append(label)
+    return regressions
+
+def start_server(port: int) -> subprocess.Popen:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=project_root
+    )
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health")
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise SystemExit("uvicorn did not start")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a realistic traffic mix and report per-endpoint latency")
+    parser.add_argument("--target", choices=["asgi", "uvicorn", "url"], default="asgi",
+                        help="In-process ASGI calls, a uvicorn started by this script, or an already running --url")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server for --target url")
+    parser.add_argument("--port", type=int, default=8766, help="Port for --target uvicorn")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Comma-separated scenario=weight pairs")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds run before measuring")
+    parser.add_argument("--users", type=int, default=20, help="Load-test requestor accounts")
+    parser.add_argument("--tours", type=int, default=50, help="Minimum active tours")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="Earlier results JSON to compare p95 latencies against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 growth over the baseline")
+    args = parser.parse_args()
+
+    server = None
+    if args.target == "asgi":
+        from main import app
+        make_client = lambda: AsgiClient(app)
+    else:
+        if args.target == "uvicorn":
+            server = start_server(args.port)
+            host, port = "127.0.0.1", args.port
+        else:
+            host, _, port = args.url.split("://", 1)[-1].rstrip("/").partition(":")
+            port = int(port or 80)
+        make_client = lambda: HttpClient(host, port)
+
+    started_at = datetime.utcnow()
+    try:
+        results = asyncio.run(run(args, make_client))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    results["meta"] = {
+        "commit": git_commit(),
+        "started_at": started_at.isoformat(),
+        "target": args.target,
+        "mix": args.mix,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "seed": args.seed,
+        "python": platform.python_version()
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        if regressions:
+            logger.error(f"p95 regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
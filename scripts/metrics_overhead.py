@@ -0,0 +1,93 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import time
+import logging
+
+from sqlalchemy import create_engine, text
+
+from middleware.metrics import MetricsMiddleware
+from services.metrics_service import MetricsRegistry, RequestStats, current_request_stats
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class _Route:
+    path = "/bench/{item_id}"
+
+    @staticmethod
+    async def endpoint():
+        pass
+
+class _App:
+    routes = [_Route]
+
+async def bare_app(scope, receive, send):
+    """Stand-in for the routed application: sets the endpoint, sends an empty 200"""
+    scope["endpoint"] = _Route.endpoint
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+async def _send(message):
+    pass
+
+async def time_requests(app, requests: int) -> float:
+    """Mean seconds per request for `requests` in-process ASGI calls"""
+    started = time.perf_counter()
+    for index in range(requests):
+        scope = {"type": "http", "method": "GET", "path": f"/bench/{index}", "app": _App}
+        await app(scope, _receive, _send)
+    return (time.perf_counter() - started) / requests
+
+def time_statements(engine, statements: int) -> float:
+    """Mean seconds per `SELECT 1` on `engine`, inside a request context"""
+    token = current_request_stats.set(RequestStats({"method": "GET"}))
+    try:
+        with engine.connect() as connection:
+            query = text("SELECT 1")
+            started = time.perf_counter()
+            for _ in range(statements):
+                connection.execute(query)
+            return (time.perf_counter() - started) / statements
+    finally:
+        current_request_stats.reset(token)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the per-request and per-statement cost of metrics")
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--statements", type=int, default=100000)
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    # Warm up, then take the best of three runs to reduce noise
+    instrumented_app = MetricsMiddleware(bare_app)
+    asyncio.run(time_requests(instrumented_app, 1000))
+    bare_request = min(asyncio.run(time_requests(bare_app, args.requests)) for _ in range(3))
+    instrumented_request = min(asyncio.run(time_requests(instrumented_app, args.requests)) for _ in range(3))
+
+    bare_engine = create_engine("sqlite://")
+    instrumented_engine = create_engine("sqlite://")
+    MetricsRegistry().instrument_engine(instrumented_engine)
+    bare_statement = min(time_statements(bare_engine, args.statements) for _ in range(3))
+    instrumented_statement = min(time_statements(instrumented_engine, args.statements) for _ in range(3))
+
+    results = {
+        "middleware_overhead_us_per_request": round((instrumented_request - bare_request) * 1e6, 2),
+        "bare_asgi_call_us": round(bare_request * 1e6, 2),
+        "engine_hook_overhead_us_per_statement": round((instrumented_statement - bare_statement) * 1e6, 2),
+        "bare_statement_us": round(bare_statement * 1e6, 2)
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+import logging
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Base, User, Tour, TourRequest, UserRole, RequestStatus
+from schemas import (
+    TourCreate,
+    TourRequestCreate,
+    SignupRequest,
+    Tour as TourSchema,
+    TourRequest as TourRequestSchema,
+    TourList,
+    TourRequestExpanded
+)
+from services.auth_service import AuthService
+from services.tour_service import TourService
+from services.expand_service import ExpandService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "microbench_thresholds.json")
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+def benchmark(name: str):
+    """Register a benchmark; the decorated function does the setup and returns the timed callable"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+def measure(func: Callable[[], object], rounds: int, min_time: float) -> Dict[str, float]:
+    """Microseconds per call: each round repeats `func` for at least `min_time` seconds"""
+    func()
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        iterations = max(iterations * 2, int(iterations * min_time / max(elapsed, 1e-9)))
+
+    samples = [elapsed / iterations]
+    for _ in range(rounds - 1):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        samples.append((time.perf_counter() - started) / iterations)
+    return {
+        "iterations": iterations,
+        "min_us": round(min(samples) * 1e6, 3),
+        "median_us": round(statistics.median(samples) * 1e6, 3)
+    }
+
+# Fixtures
+
+def _future(days: int) -> str:
+    return (datetime.now() + timedelta(days=days)).isoformat()
+
+def _session(tours: int, requests_per_tour: int):
+    """In-memory database with one user, `tours` tours and their requests"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(insert(User.__table__), [{
+            "id": 1,
+            "username": "bench",
+            "email": "bench@example.com",
+            "full_name": "Bench User",
+            # Any string will do: nothing here verifies the password
+            "hashed_password": "x",
+            "role": UserRole.ADMIN,
+            "is_active": True,
+            "created_at": now
+        }])
+        connection.execute(insert(Tour.__table__), [
+            {
+                "id": tour_id,
+                "title": f"Tour {tour_id}",
+                "location": "Paris",
+                "duration_days": 3,
+                "max_participants": 20,
+                "price": 29900,
+                "is_active": tour_id % 10 != 0,
+                "created_at": now
+            }
+            for tour_id in range(1, tours + 1)
+        ])
+        if requests_per_tour:
+            statuses = list(RequestStatus)
+            connection.execute(insert(TourRequest.__table__), [
+                {
+                    "user_id": 1,
+                    "tour_id": tour_id,
+                    "participants_count": 1 + index % 4,
+                    "preferred_date": now + timedelta(days=30),
+                    "status": statuses[index % len(statuses)],
+                    "created_at": now,
+                    "updated_at": now
+                }
+                for tour_id in range(1, tours + 1)
+                for index in range(requests_per_tour)
+            ])
+    return sessionmaker(bind=engine, expire_on_commit=False)()
+
+TOUR_PAYLOAD = {
+    "title": "  paris city tour ",
+    "description": "Explore the beautiful city of Paris with our expert guides.",
+    "location": "paris, france",
+    "duration_days": 3,
+    "max_participants": 20,
+    "price": 29900,
+    "is_active": True
+}
+
+# Benchmarks
+
+@benchmark("validate_tour_create")
+def _validate_tour_create():
+    return lambda: TourCreate(**TOUR_PAYLOAD)
+
+@benchmark("validate_tour_request_create")
+def _validate_tour_request_create():
+    payload = {"tour_id": 1, "participants_count": 2, "preferred_date": _future(30), "notes": " Anniversary trip "}
+    return lambda: TourRequestCreate(**payload)
+
+@benchmark("validate_signup_request")
+def _validate_signup_request():
+    payload = {
+        "username": "John_Doe",
+        "email": "john@example.com",
+        "full_name": " john doe ",
+        "password": "password123"
+    }
+    return lambda: SignupRequest(**payload)
+
+@benchmark("serialize_tours_100")
+def _serialize_tours():
+    tours = _session(100, 0).query(Tour).all()
+    return lambda: [TourSchema.model_validate(tour).model_dump(mode="json") for tour in tours]
+
+@benchmark("serialize_tour_requests_100")
+def _serialize_tour_requests():
+    requests = _session(25, 4).query(TourRequest).all()
+    return lambda: [TourRequestSchema.model_validate(request).model_dump(mode="json") for request in requests]
+
+@benchmark("serialize_tours_100_json")
+def _serialize_tours_json():
+    # The list endpoints' path: one cached adapter, straight to JSON bytes
+    tours = _session(100, 0).query(Tour).all()
+    return lambda: TourList.dump_json(TourList.validate_python(tours, from_attributes=True))
+
+@benchmark("serialize_tour_requests_100_json")
+def _serialize_tour_requests_json():
+    # Loader options as in GET /request without expand, so nothing lazy-loads
+    requests = _session(25, 4).query(TourRequest).options(*ExpandService.options(TourRequest, frozenset())).all()
+    adapter = TourRequestExpanded.adapter(frozenset(), many=True)
+    return lambda: adapter.dump_json(adapter.validate_python(requests, from_attributes=True))
+
+@benchmark("create_access_token")
+def _create_access_token():
+    return lambda: AuthService.create_access_token({"sub": "bench"})
+
+@benchmark("verify_token")
+def _verify_token():
+    token = AuthService.create_access_token({"sub": "bench"})
+    return lambda: AuthService.verify_token(token)
+
+@benchmark("get_current_user_from_token")
+def _get_current_user_from_token():
+    db = _session(1, 0)
+    token = AuthService.create_access_token({"sub": "bench"})
+    return lambda: AuthService.get_current_user_from_token(db, token)
+
+@benchmark("tour_statistics_small")
+def _tour_statistics_small():
+    db = _session(10, 5)
+    return lambda: TourService.get_tour_statistics(db)
+
+@benchmark("tour_statistics_large")
+def _tour_statistics_large():
+    db = _session(10000, 10)
+    return lambda: TourService.get_tour_statistics(db)
+
+def calibration_loop():
+    """Pure-Python reference work. Each benchmark is reported relative to it,
+    measured right before the benchmark, so thresholds recorded on one machine
+    carry over to another and drift in CPU speed during a run cancels out."""
+    return sum(value * 2 for value in _CALIBRATION_VALUES if value % 3)
+
+_CALIBRATION_VALUES = list(range(1000))
+
+def check(results: Dict[str, dict], thresholds: dict) -> List[str]:
+    """Benchmarks whose calibrated time exceeds the recorded one by more than the tolerance.
+
+    Compares the best round rather than the median: noise only ever adds
+    time, so the minimum is the most repeatable figure on a shared machine.
+    """
+    default_tolerance = thresholds.get("tolerance", 0.3)
+    regressions = []
+    for name, recorded in thresholds.get("benchmarks", {}).items():
+        if name not in results:
+            continue
+        relative = results[name]["relative"]
+        limit = recorded["relative"] * (1 + recorded.get("tolerance", default_tolerance))
+        change = relative / recorded["relative"] - 1
+        logger.info(f"{name}: {results[name]['min_us']} us, {change:+.1%} vs recorded")
+        if relative > limit:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for schemas, auth and services")
+    parser.add_argument("-k", dest="keyword", default=None, help="Only benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.1, help="Minimum seconds per round")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="Regression threshold file")
+    parser.add_argument("--update-thresholds", action="store_true", help="Record this run as the new reference")
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if not args.keyword or args.keyword in name]
+    results = {}
+    for name in names:
+        func = BENCHMARKS[name]()
+        calibration = measure(calibration_loop, args.rounds, args.min_time)
+        results[name] = measure(func, args.rounds, args.min_time)
+        results[name]["calibration_us"] = calibration["min_us"]
+        results[name]["relative"] = round(results[name]["min_us"] / calibration["min_us"], 4)
+        logger.info(f"{name}: median {results[name]['median_us']} us, min {results[name]['min_us']} us")
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump({"python": platform.python_version(), "results": results}, output_file, indent=2)
+
+    thresholds = {}
+    if os.path.exists(args.thresholds):
+        with open(args.thresholds) as thresholds_file:
+            thresholds = json.load(thresholds_file)
+
+    if args.update_thresholds:
+        recorded = thresholds.setdefault("benchmarks", {})
+        thresholds.setdefault("tolerance", 0.3)
+        for name, result in results.items():
+            entry = recorded.setdefault(name, {})
+            entry["relative"] = result["relative"]
+            entry["min_us"] = result["min_us"]
+        with open(args.thresholds, "w") as thresholds_file:
+            json.dump(thresholds, thresholds_file, indent=2)
+            thresholds_file.write("\n")
+        logger.info(f"Recorded thresholds in {args.thresholds}")
+        return
+
+    regressions = check(results, thresholds)
+    if regressions:
+        logger.error(f"Slower than recorded by more than the tolerance: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+import logging
+
+from load_test import AsgiClient, call, login_or_signup
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def run(args) -> dict:
+    from main import app
+    client = AsgiClient(app)
+    await client.start()
+    try:
+        admin_token = await login_or_signup(client, "profiling_check_admin", "admin")
+        _, body = await call(client, "POST", "/tour", admin_token, {
+            "title": "Profiling Check Tour",
+            "location": "Paris, France",
+            "duration_days": 3,
+            "max_participants": 20,
+            "price": 29900,
+            "is_active": True
+        })
+        tour_id = json.loads(body)["id"]
+        for _ in range(20):
+            await call(client, "POST", "/request", admin_token, {
+                "tour_id": tour_id,
+                "participants_count": 2,
+                "preferred_date": (datetime.now() + timedelta(days=30)).isoformat()
+            })
+
+        routes = {
+            "GET /tour/{tour_id}": (f"/tour/{tour_id}", None),
+            "GET /request": ("/request?expand=tour,user", admin_token)
+        }
+        await call(client, "POST", "/admin/profiling", admin_token, {"duration_seconds": 600, "sample_rate": 1.0})
+        for _ in range(args.requests):
+            for path, token in routes.values():
+                await call(client, "GET", path, token)
+        await call(client, "DELETE", "/admin/profiling", admin_token)
+
+        results = {}
+        for route in routes:
+            exports = {}
+            for export_format in ("collapsed", "pstats"):
+                started = time.perf_counter()
+                status_code, body = await call(
+                    client, "GET", f"/admin/profiling/download?route={route.replace(' ', '%20')}&format={export_format}", admin_token
+                )
+                exports[export_format] = {
+                    "status_code": status_code,
+                    "bytes": len(body),
+                    "seconds": round(time.perf_counter() - started, 3)
+                }
+                if export_format == "collapsed":
+                    exports[export_format]["stacks"] = body.count(b"\n")
+            results[route] = exports
+            logger.info(f"{route}: {exports}")
+        return results
+    finally:
+        await client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile real routes and check the size and cost of the profile exports")
+    parser.add_argument("--requests", type=int, default=5, help="Profiled requests per route")
+    parser.add_argument("--max-bytes", type=int, default=512 * 1024, help="Largest acceptable collapsed export")
+    parser.add_argument("--max-seconds", type=float, default=1.0, help="Slowest acceptable export")
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    failures = []
+    for route, exports in results.items():
+        collapsed = exports["collapsed"]
+        if collapsed["status_code"] != 200 or not collapsed["stacks"]:
+            failures.append(f"{route}: no collapsed stacks")
+        elif collapsed["bytes"] > args.max_bytes:
+            failures.append(f"{route}: collapsed export is {collapsed['bytes']} bytes")
+        for export_format, export in exports.items():
+            if export["seconds"] > args.max_seconds:
+                failures.append(f"{route}: {export_format} export took {export['seconds']} s")
+    if failures:
+        logger.error("; ".join(failures))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
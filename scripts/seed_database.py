@@ -2,6 +2,13 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import argparse
+import bisect
+import itertools
+import multiprocessing
+import random
+import time
+from sqlalchemy import delete, insert, text
 from sqlalchemy.orm import Session
 from database import SessionLocal, engine
 from models import Base, User, Tour, TourRequest, Feedback, UserRole, RequestStatus
@@ -221,5 +228,251 @@ def create_sample_data():
     finally:
         db.close()
 
+# Scale mode: weighted choices are drawn by bisecting precomputed cumulative weights
+
+SCALE_LOCATIONS = [
+    ("Paris, France", 100), ("Rome, Italy", 80), ("London, UK", 75), ("New York, USA", 70),
+    ("Tokyo, Japan", 60), ("Barcelona, Spain", 55), ("Lisbon, Portugal", 40), ("Kyoto, Japan", 35),
+    ("Prague, Czechia", 30), ("Reykjavik, Iceland", 20), ("Cusco, Peru", 18), ("Cape Town, South Africa", 15),
+    ("Queenstown, New Zealand", 12), ("Marrakesh, Morocco", 10), ("Hanoi, Vietnam", 8), ("Tbilisi, Georgia", 5)
+]
+SCALE_THEMES = ["City Tour", "Food Walk", "Hiking Adventure", "Historical Tour", "Night Tour", "Day Trip", "Photo Safari", "Wine Tasting"]
+
+# Peak in summer, a bump around the winter holidays
+MONTH_WEIGHTS = [3, 3, 5, 7, 9, 12, 15, 15, 10, 7, 4, 8]
+
+# J-shaped: most reviewers are happy, the unhappy ones are loud
+RATING_WEIGHTS = {1: 10, 2: 5, 3: 10, 4: 30, 5: 45}
+
+SCALE_PASSWORD = "password123"
+SCALE_ADMIN_PASSWORD = "admin123"
+
+def _cumulative(weights):
+    return list(itertools.accumulate(weights))
+
+def _pick(rng, cumulative) -> int:
+    """Index drawn with the weights behind `cumulative`"""
+    return bisect.bisect(cumulative, rng.random() * cumulative[-1])
+
+def _zipf_cumulative(count: int, exponent: float):
+    return _cumulative(1 / rank ** exponent for rank in range(1, count + 1))
+
+def _seasonal_datetime(rng, month_cumulative, year: int) -> datetime:
+    month = _pick(rng, month_cumulative) + 1
+    return datetime(year, month, rng.randint(1, 28), rng.choice((8, 9, 10, 14)))
+
+def _generate_users(first_id: int, count: int, seed: int, hashed_password: str):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    return [
+        {
+            "id": user_id,
+            "username": f"user{user_id}",
+            "email": f"user{user_id}@example.com",
+            "full_name": f"User {user_id}",
+            "hashed_password": hashed_password,
+            "role": UserRole.LEADER if rng.random() < 0.001 else UserRole.REQUESTOR,
+            "is_active": rng.random() > 0.02,
+            "created_at": now - timedelta(days=rng.randint(0, 1500))
+        }
+        for user_id in range(first_id, first_id + count)
+    ]
+
+def _generate_tours(first_id: int, count: int, seed: int):
+    rng = random.Random(seed)
+    location_cumulative = _cumulative(weight for _, weight in SCALE_LOCATIONS)
+    now = datetime.utcnow()
+    rows = []
+    for tour_id in range(first_id, first_id + count):
+        location = SCALE_LOCATIONS[_pick(rng, location_cumulative)][0]
+        duration_days = min(30, int(rng.expovariate(1 / 3)) + 1)
+        rows.append({
+            "id": tour_id,
+            "title": f"{location.split(',')[0]} {rng.choice(SCALE_THEMES)} #{tour_id}",
+            "description": f"A {duration_days}-day tour in {location}.",
+            "location": location,
+            "duration_days": duration_days,
+            "max_participants": rng.choice((8, 10, 12, 15, 20, 25, 30, 40)),
+            # Log-normal around $300, in cents
+            "price": max(1000, int(rng.lognormvariate(5.7, 0.6)) * 100),
+            "is_active": rng.random() > 0.1,
+            "created_at": now - timedelta(days=rng.randint(30, 2000))
+        })
+    return rows
+
+def _generate_requests(first_id: int, count: int, seed: int, users: int, tours: int):
+    rng = random.Random(seed)
+    # Popular tours and power users: both Zipf-distributed over a shuffled id order
+    tour_cumulative = _zipf_cumulative(tours, 1.1)
+    user_cumulative = _zipf_cumulative(users, 0.6)
+    month_cumulative = _cumulative(MONTH_WEIGHTS)
+    tour_order = list(range(1, tours + 1))
+    user_order = list(range(1, users + 1))
+    random.Random(0).shuffle(tour_order)
+    random.Random(1).shuffle(user_order)
+    now = datetime.utcnow()
+    rows = []
+    for request_id in range(first_id, first_id + count):
+        preferred_date = _seasonal_datetime(rng, month_cumulative, now.year + rng.choice((-2, -1, -1, 0, 0, 0, 1)))
+        created_at = min(now, preferred_date - timedelta(days=rng.randint(7, 180), minutes=rng.randint(0, 1440)))
+        if preferred_date > now:
+            status = RequestStatus.PENDING if rng.random() < 0.7 else RequestStatus.APPROVED
+        else:
+            outcome = rng.random()
+            status = (
+                RequestStatus.APPROVED if outcome < 0.75
+                else RequestStatus.REJECTED if outcome < 0.9
+                else RequestStatus.CANCELLED
+            )
+        rows.append({
+            "id": request_id,
+            "user_id": user_order[_pick(rng, user_cumulative)],
+            "tour_id": tour_order[_pick(rng, tour_cumulative)],
+            "participants_count": min(50, int(rng.expovariate(1 / 1.5)) + 1),
+            "preferred_date": preferred_date,
+            "status": status,
+            "notes": "Generated by seed_database.py" if rng.random() < 0.2 else None,
+            "created_at": created_at,
+            "updated_at": created_at
+        })
+    return rows
+
+def _generate_feedbacks(first_id: int, count: int, seed: int, users: int, tours: int):
+    rng = random.Random(seed)
+    tour_cumulative = _zipf_cumulative(tours, 1.1)
+    rating_cumulative = _cumulative(RATING_WEIGHTS.values())
+    ratings = list(RATING_WEIGHTS)
+    tour_order = list(range(1, tours + 1))
+    random.Random(0).shuffle(tour_order)
+    now = datetime.utcnow()
+    rows = []
+    for feedback_id in range(first_id, first_id + count):
+        tour_id = tour_order[_pick(rng, tour_cumulative)]
+        rating = ratings[_pick(rng, rating_cumulative)]
+        # Per-tour quality: some tours are consistently a star better or worse
+        rating = max(1, min(5, rating + (tour_id % 7 == 0) - (tour_id % 11 == 0)))
+        created_at = now - timedelta(days=rng.randint(0, 1000))
+        rows.append({
+            "id": feedback_id,
+            "user_id": rng.randint(1, users),
+            "tour_id": tour_id,
+            "rating": rating,
+            "comment": f"Rated {rating} stars" if rng.random() < 0.6 else None,
+            "is_published": rng.random() < 0.8,
+            "created_at": created_at,
+            "updated_at": created_at
+        })
+    return rows
+
+def _generate_chunk(task):
+    """Pool entry point: (generator name, first id, count, seed, extra args) -> rows"""
+    name, first_id, count, seed, extra = task
+    return globals()[name](first_id, count, seed, *extra)
+
+def _bulk_insert(pool, table, generator: str, total: int, first_id: int, extra: tuple, args) -> None:
+    """Generate `total` rows in parallel chunks and insert them with executemany, in order"""
+    if total <= 0:
+        return
+    tasks = [
+        (generator, first_id + start, min(args.batch_size, total - start), args.seed * 1_000_003 + first_id + start, extra)
+        for start in range(0, total, args.batch_size)
+    ]
+    started = time.perf_counter()
+    inserted = 0
+    connection = engine.connect()
+    if engine.dialect.name == "sqlite":
+        # Generated ids are consistent by construction, and durability is
+        # pointless while loading throwaway data
+        connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        connection.exec_driver_sql("PRAGMA synchronous=OFF")
+        connection.commit()
+    transaction = connection.begin()
+    try:
+        for rows in pool.imap(_generate_chunk, tasks):
+            connection.execute(insert(table), rows)
+            inserted += len(rows)
+            if inserted % args.transaction_rows < args.batch_size:
+                transaction.commit()
+                transaction = connection.begin()
+                logger.info(f"{table.name}: {inserted}/{total} rows, {inserted / (time.perf_counter() - started):.0f} rows/s")
+        transaction.commit()
+    except Exception:
+        transaction.rollback()
+        raise
+    finally:
+        if engine.dialect.name == "sqlite":
+            connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+            connection.exec_driver_sql("PRAGMA synchronous=FULL")
+            connection.commit()
+        connection.close()
+    logger.info(f"{table.name}: {inserted} rows in {time.perf_counter() - started:.1f}s")
+
+def create_scale_data(args):
+    """Bulk-load a large synthetic dataset with skewed, realistic distributions"""
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+
+    with engine.begin() as connection:
+        # Every table, children first: tombstones, cached rows and the like would
+        # otherwise describe data that no longer exists
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(delete(table))
+
+    # bcrypt is deliberately slow: hash once and share the hash
+    admin_hash = User.hash_password(SCALE_ADMIN_PASSWORD)
+    user_hash = User.hash_password(SCALE_PASSWORD)
+
+    with engine.begin() as connection:
+        connection.execute(insert(User.__table__), [{
+            "id": 1,
+            "username": "admin",
+            "email": "admin@example.com",
+            "full_name": "System Administrator",
+            "hashed_password": admin_hash,
+            "role": UserRole.ADMIN,
+            "is_active": True,
+            "created_at": datetime.utcnow()
+        }])
+
+    users = max(args.users, 1)
+    tours = max(args.tours, 1)
+    with multiprocessing.Pool(args.workers) as pool:
+        _bulk_insert(pool, User.__table__, "_generate_users", users - 1, 2, (user_hash,), args)
+        _bulk_insert(pool, Tour.__table__, "_generate_tours", tours, 1, (), args)
+        _bulk_insert(pool, TourRequest.__table__, "_generate_requests", args.requests, 1, (users, tours), args)
+        _bulk_insert(pool, Feedback.__table__, "_generate_feedbacks", args.feedbacks, 1, (users, tours), args)
+
+    # Fresh statistics, so the planner sees the skew
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+
+    logger.info(f"Loaded {users} users, {tours} tours, {args.requests} requests, {args.feedbacks} feedbacks in {time.perf_counter() - started:.1f}s")
+    logger.info(f"Log in as admin/{SCALE_ADMIN_PASSWORD} or user<id>/{SCALE_PASSWORD}")
+
+def _count(value: str) -> int:
+    """Row count accepting scientific notation, e.g. 1e6"""
+    return int(float(value))
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database with sample data, or with a large synthetic dataset")
+    parser.add_argument("--users", type=_count, help="Scale mode: number of users (e.g. 1e6)")
+    parser.add_argument("--tours", type=_count, default=None, help="Scale mode: number of tours")
+    parser.add_argument("--requests", type=_count, default=None, help="Scale mode: number of tour requests")
+    parser.add_argument("--feedbacks", type=_count, default=None, help="Scale mode: number of feedbacks (default requests / 10)")
+    parser.add_argument("--batch-size", type=_count, default=50000, help="Rows per generated chunk and executemany call")
+    parser.add_argument("--transaction-rows", type=_count, default=1000000, help="Rows per committed transaction")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes generating rows")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.users is None and args.tours is None and args.requests is None:
+        create_sample_data()
+        return
+    args.users = args.users if args.users is not None else 1000
+    args.tours = args.tours if args.tours is not None else 100
+    args.requests = args.requests if args.requests is not None else 0
+    args.feedbacks = args.feedbacks if args.feedbacks is not None else args.requests // 10
+    create_scale_data(args)
+
 if __name__ == "__main__":
-    create_sample_data()
+    main()
@@ -0,0 +1,158 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import time
+import urllib.request
+from datetime import datetime, timedelta
+import logging
+
+from database import SessionLocal
+from models import User, UserRole
+from services.auth_service import AuthService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROBE_USERNAME = "sse_probe"
+
+def get_probe_token() -> str:
+    """Create (once) an admin user for the probe and return a token for it"""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == PROBE_USERNAME).first()
+        if not user:
+            user = User(
+                username=PROBE_USERNAME,
+                email="sse_probe@example.com",
+                full_name="SSE Probe",
+                hashed_password=AuthService.hash_password("sse_probe"),
+                role=UserRole.ADMIN
+            )
+            db.add(user)
+            db.commit()
+        return AuthService.create_access_token(
+            data={"sub": PROBE_USERNAME},
+            expires_delta=timedelta(hours=2)
+        )
+    finally:
+        db.close()
+
+def server_rss_kb(pid: int) -> int:
+    """Resident set size of the server process in KiB (Linux only)"""
+    with open(f"/proc/{pid}/status") as status_file:
+        for line in status_file:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+def api_call(port: int, method: str, path: str, token: str, body: dict = None) -> dict:
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}{path}",
+        data=data,
+        method=method,
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+async def open_subscriber(port: int, token: str):
+    """Open one idle SSE connection and wait for the stream to start"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET /request/events HTTP/1.1\r\nHost: localhost\r\n"
+        f"Authorization: Bearer {token}\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    await reader.readuntil(b": connected\n\n")
+    return reader, writer
+
+async def wait_for_event(reader, event: bytes) -> float:
+    await reader.readuntil(b"event: " + event)
+    return time.perf_counter()
+
+async def measure(port: int, pid: int, token: str, levels: list) -> list:
+    loop = asyncio.get_running_loop()
+    tour = await loop.run_in_executor(None, lambda: api_call(port, "POST", "/tour", token, {
+        "title": "Sse Capacity Probe",
+        "location": "Nowhere",
+        "duration_days": 1,
+        "max_participants": 1,
+        "price": 1,
+        "is_active": True
+    }))
+    connections = []
+    results = []
+    baseline_rss = server_rss_kb(pid)
+    try:
+        for level in levels:
+            while len(connections) < level:
+                batch = min(200, level - len(connections))
+                connections += await asyncio.gather(
+                    *(open_subscriber(port, token) for _ in range(batch))
+                )
+            await asyncio.sleep(0.5)
+            rss = server_rss_kb(pid)
+
+            # One create fans out to every (admin) subscriber
+            waiters = [asyncio.ensure_future(wait_for_event(reader, b"created")) for reader, _ in connections]
+            started = time.perf_counter()
+            created = await loop.run_in_executor(None, lambda: api_call(port, "POST", "/request", token, {
+                "tour_id": tour["id"],
+                "participants_count": 1,
+                "preferred_date": (datetime.now() + timedelta(days=30)).isoformat()
+            }))
+            finished = max(await asyncio.gather(*waiters))
+            await loop.run_in_executor(None, lambda: api_call(port, "DELETE", f"/request/{created['id']}", token))
+
+            results.append({
+                "subscribers": level,
+                "server_rss_mb": round(rss / 1024, 1),
+                "kb_per_subscriber": round((rss - baseline_rss) / level, 1),
+                "fanout_ms": round((finished - started) * 1000, 1)
+            })
+            logger.info(json.dumps(results[-1]))
+    finally:
+        for _, writer in connections:
+            writer.close()
+        await loop.run_in_executor(None, lambda: api_call(port, "DELETE", f"/tour/{tour['id']}", token))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how many idle SSE subscribers one worker can hold")
+    parser.add_argument("--levels", default="100,500,1000,2000", help="Comma-separated subscriber counts")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(",")]
+
+    # Each subscriber costs a file descriptor on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    token = get_probe_token()
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=project_root
+    )
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{args.port}/health")
+                break
+            except OSError:
+                time.sleep(0.1)
+        results = asyncio.run(measure(args.port, server.pid, token, levels))
+        print(json.dumps(results, indent=2))
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
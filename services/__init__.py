@@ -1,5 +1,14 @@
 # Services package initialization
 from .auth_service import AuthService
 from .tour_service import TourService
+from .request_service import RequestService
+from .feedback_service import FeedbackService
+from .similarity_service import SimilarityService
+from .catalog_service import CatalogService
+from .deletion_service import DeletionService
+from .write_service import WriteService
+from .expand_service import ExpandService
+from .dashboard_service import DashboardService
+from .job_service import JobRunner, job_runner
 
-__all__ = ["AuthService", "TourService"]
+__all__ = ["AuthService", "TourService", "RequestService", "FeedbackService", "SimilarityService", "CatalogService", "DeletionService", "WriteService", "ExpandService", "DashboardService", "JobRunner", "job_runner"]
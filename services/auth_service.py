@@ -3,11 +3,14 @@ from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 
 from models import User, UserRole
 from schemas import SignupRequest, CurrentUser
 from config import settings
+from services.tracing_service import tracer
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -18,12 +21,14 @@ class AuthService:
     @staticmethod
     def hash_password(password: str) -> str:
         """Hash a password using bcrypt"""
-        return pwd_context.hash(password)
+        with tracer.span("bcrypt.hash"):
+            return pwd_context.hash(password)
     
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash"""
-        return pwd_context.verify(plain_password, hashed_password)
+        with tracer.span("bcrypt.verify"):
+            return pwd_context.verify(plain_password, hashed_password)
     
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -42,7 +47,8 @@ class AuthService:
     def verify_token(token: str) -> dict:
         """Verify and decode a JWT token"""
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            with tracer.span("jwt.verify"):
+                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
             return payload
         except JWTError:
             raise HTTPException(
@@ -63,13 +69,14 @@ class AuthService:
     @staticmethod
     def create_user(db: Session, user_data: SignupRequest) -> User:
         """Create a new user"""
-        # Check if user already exists
-        existing_user = db.query(User).filter(
+        # Check if user already exists; only the username is needed, and it
+        # spares duplicate signups the bcrypt work
+        existing_username = db.scalar(select(User.username).where(
             (User.username == user_data.username) | (User.email == user_data.email)
-        ).first()
+        ))
         
-        if existing_user:
-            if existing_user.username == user_data.username:
+        if existing_username is not None:
+            if existing_username == user_data.username:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Username already registered"
@@ -82,17 +89,22 @@ class AuthService:
         
         # Create new user
         hashed_password = AuthService.hash_password(user_data.password)
-        user = User(
-            username=user_data.username,
-            email=user_data.email,
-            full_name=user_data.full_name,
-            hashed_password=hashed_password,
-            role=user_data.role
-        )
-        
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        try:
+            user = db.scalars(insert(User).values(
+                username=user_data.username,
+                email=user_data.email,
+                full_name=user_data.full_name,
+                hashed_password=hashed_password,
+                role=user_data.role
+            ).returning(User)).one()
+            db.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent signup for the same username or email
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username or email already registered"
+            )
         return user
     
     @staticmethod
@@ -112,7 +124,7 @@ class AuthService:
                 detail="Could not validate credentials"
             )
         
-        user = db.query(User).filter(User.username == username).first()
+        user = db.query(User).filter(User.username == username, User.deleted_at.is_(None)).first()
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
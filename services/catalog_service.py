@@ -0,0 +1,278 @@
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from models import Tour
+from schemas import FacetBucket, TourFacets, TourCatalog, LocationSuggestion
+from services.invalidation_service import invalidation_bus
+
+# Characters that start a new word of a location, for SQL prefix matching
+LOCATION_WORD_SEPARATORS = (" ", ",", "/", "(", ")", "-")
+
+class FacetSnapshot:
+    """The unfiltered active catalog with its facets, cached as response JSON.
+
+    Each build is tagged with the invalidation generation it started in, and
+    kept only if no invalidation happened meanwhile: a build overlapping a
+    tour write is served to its own caller but never cached. Requests without
+    filters then cost neither a query nor serialization until the next write.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._generation = 0
+        self._cached: Optional[Tuple[int, bytes]] = None
+
+    def _current(self) -> Tuple[int, Optional[bytes]]:
+        with self._lock:
+            if self._cached is not None and self._cached[0] == self._generation:
+                return self._generation, self._cached[1]
+            return self._generation, None
+
+    def get(self, db: Session) -> bytes:
+        """Get the catalog JSON, rebuilding it if a write invalidated it"""
+        _, body = self._current()
+        if body is not None:
+            return body
+        with self._build_lock:
+            # Another request may have rebuilt it while this one waited
+            generation, body = self._current()
+            if body is not None:
+                return body
+            tours = CatalogService.search(db)
+            body = TourCatalog(
+                items=tours,
+                total=len(tours),
+                facets=CatalogService.compute_facets(tours)
+            ).model_dump_json().encode()
+            with self._lock:
+                if self._generation == generation:
+                    self._cached = (generation, body)
+        return body
+
+    def invalidate(self) -> None:
+        self._drop()
+        invalidation_bus.publish("catalog_facets")
+
+    def _drop(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cached = None
+
+class LocationIndex:
+    """In-memory prefix index of active tour locations with tour counts.
+
+    Keeps a sorted array of (normalized key, location) pairs, one for the whole
+    location and one per later word, so "fra" finds "Paris, France". A lookup
+    is a binary search, a scan over the keys starting with the prefix and a
+    bounded heap ranking the matches by tour count.
+
+    Memory is bounded without an explicit cap: only distinct locations of
+    active tours are indexed, each at most 200 characters (the column size)
+    with at most MAX_WORD_KEYS word keys, so the index stays within a small
+    constant factor of the location strings the catalog already holds.
+    """
+
+    # Word keys per location; later words of very long locations aren't indexed
+    MAX_WORD_KEYS = 8
+
+    _WORD_SPLIT = re.compile(r"[\s,/()-]+")  # Mirrored by LOCATION_WORD_SEPARATORS
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._counts: Dict[str, int] = {}
+        self._keys: List[Tuple[str, str]] = []
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Case- and accent-insensitive form used for matching"""
+        decomposed = unicodedata.normalize("NFKD", text)
+        return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold().strip()
+
+    @classmethod
+    def _keys_for(cls, location: str) -> List[Tuple[str, str]]:
+        normalized = cls.normalize(location)
+        words = [word for word in cls._WORD_SPLIT.split(normalized) if word]
+        keys = {normalized}
+        for position in range(1, min(len(words), cls.MAX_WORD_KEYS + 1)):
+            keys.add(" ".join(words[position:]))
+        return [(key, location) for key in keys]
+
+    def _add(self, location: str, delta: int) -> None:
+        old = self._counts.get(location, 0)
+        new = max(old + delta, 0)
+        if old == 0 and new > 0:
+            for key in self._keys_for(location):
+                insort(self._keys, key)
+        elif old > 0 and new == 0:
+            for key in self._keys_for(location):
+                index = bisect_left(self._keys, key)
+                if index < len(self._keys) and self._keys[index] == key:
+                    del self._keys[index]
+        if new:
+            self._counts[location] = new
+        else:
+            self._counts.pop(location, None)
+
+    def _load(self, db: Session) -> None:
+        self._counts, self._keys = {}, []
+        for location, count in db.query(Tour.location, func.count(Tour.id)).filter(
+            Tour.is_active == True
+        ).group_by(Tour.location):
+            self._add(location, count)
+        self._loaded = True
+
+    def tour_changed(self, old: Optional[Tuple[str, bool]], new: Optional[Tuple[str, bool]]) -> None:
+        """Apply a tour write given its (location, is_active) before and after"""
+        # Other workers reload instead: their index may already include this write
+        invalidation_bus.publish("locations")
+        with self._lock:
+            if not self._loaded:
+                return
+            if old and old[1]:
+                self._add(old[0], -1)
+            if new and new[1]:
+                self._add(new[0], 1)
+
+    def invalidate(self) -> None:
+        """Force a reload from the database on the next lookup"""
+        self._drop()
+        invalidation_bus.publish("locations")
+
+    def _drop(self) -> None:
+        with self._lock:
+            self._loaded = False
+
+    def suggest(self, db: Session, prefix: str, limit: int) -> List[LocationSuggestion]:
+        """Get the locations with most tours whose name or any of its words starts with `prefix`"""
+        prefix = self.normalize(prefix)
+        with self._lock:
+            if not self._loaded:
+                self._load(db)
+            matches = set()
+            index = bisect_left(self._keys, (prefix,))
+            while index < len(self._keys) and self._keys[index][0].startswith(prefix):
+                matches.add(self._keys[index][1])
+                index += 1
+            # Rank every match before truncating: popular locations may sort late
+            top = heapq.nsmallest(limit, matches, key=lambda location: (-self._counts[location], location))
+            return [LocationSuggestion(location=location, tour_count=self._counts[location]) for location in top]
+
+class CatalogService:
+    """Service for catalog search and facet counts"""
+
+    # Upper bounds (exclusive) of each bucket; the last bucket is open-ended
+    PRICE_BUCKETS: List[Tuple[int, str]] = [
+        (10000, "under_100"),
+        (25000, "100_250"),
+        (50000, "250_500"),
+        (100000, "500_1000")
+    ]
+    PRICE_OVERFLOW = "1000_plus"
+    DURATION_BUCKETS: List[Tuple[int, str]] = [
+        (2, "1_day"),
+        (4, "2_3_days"),
+        (8, "4_7_days"),
+        (15, "8_14_days")
+    ]
+    DURATION_OVERFLOW = "15_plus_days"
+
+    @staticmethod
+    def _bucket(value: int, bounds: List[int], labels: List[str], overflow: str) -> str:
+        position = bisect_right(bounds, value)
+        return labels[position] if position < len(labels) else overflow
+
+    @staticmethod
+    def compute_facets(tours: Iterable[Tour]) -> TourFacets:
+        """Compute location, price and duration histograms in one pass over `tours`"""
+        price_bounds = [bound for bound, _ in CatalogService.PRICE_BUCKETS]
+        price_labels = [label for _, label in CatalogService.PRICE_BUCKETS]
+        duration_bounds = [bound for bound, _ in CatalogService.DURATION_BUCKETS]
+        duration_labels = [label for _, label in CatalogService.DURATION_BUCKETS]
+
+        locations, prices, durations = Counter(), Counter(), Counter()
+        for tour in tours:
+            locations[tour.location] += 1
+            prices[CatalogService._bucket(
+                tour.price, price_bounds, price_labels, CatalogService.PRICE_OVERFLOW
+            )] += 1
+            durations[CatalogService._bucket(
+                tour.duration_days, duration_bounds, duration_labels, CatalogService.DURATION_OVERFLOW
+            )] += 1
+
+        # Buckets keep their natural order; locations are sorted by popularity
+        return TourFacets(
+            location=[
+                FacetBucket(value=value, count=count)
+                for value, count in sorted(locations.items(), key=lambda item: (-item[1], item[0]))
+            ],
+            price=[
+                FacetBucket(value=label, count=prices[label])
+                for label in price_labels + [CatalogService.PRICE_OVERFLOW]
+            ],
+            duration=[
+                FacetBucket(value=label, count=durations[label])
+                for label in duration_labels + [CatalogService.DURATION_OVERFLOW]
+            ]
+        )
+
+    @staticmethod
+    def _location_matches(term: str):
+        """Match the whole location or any word prefix, as the location index does"""
+        term = term.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        patterns = [f"{term}%"] + [f"%{separator}{term}%" for separator in LOCATION_WORD_SEPARATORS]
+        return or_(*[Tour.location.ilike(pattern, escape="\\") for pattern in patterns])
+
+    @staticmethod
+    def search(
+        db: Session,
+        location: Optional[str] = None,
+        price_min: Optional[int] = None,
+        price_max: Optional[int] = None,
+        duration_min: Optional[int] = None,
+        duration_max: Optional[int] = None
+    ) -> List[Tour]:
+        """Get active tours matching the given filters"""
+        query = db.query(Tour).filter(Tour.is_active == True)
+        if location is not None:
+            query = query.filter(CatalogService._location_matches(location))
+        if price_min is not None:
+            query = query.filter(Tour.price >= price_min)
+        if price_max is not None:
+            query = query.filter(Tour.price <= price_max)
+        if duration_min is not None:
+            query = query.filter(Tour.duration_days >= duration_min)
+        if duration_max is not None:
+            query = query.filter(Tour.duration_days <= duration_max)
+        return query.all()
+
+    @staticmethod
+    def search_with_facets(db: Session, **filters) -> bytes:
+        """Get matching tours with facet counts over the same result set, as JSON"""
+        if all(value is None for value in filters.values()):
+            return catalog_facets.get(db)
+        tours = CatalogService.search(db, **filters)
+        return TourCatalog(
+            items=tours,
+            total=len(tours),
+            facets=CatalogService.compute_facets(tours)
+        ).model_dump_json().encode()
+
+# Facets of the unfiltered catalog, invalidated by the tour write paths
+catalog_facets = FacetSnapshot()
+
+# Location typeahead index, kept current by the tour write paths
+location_index = LocationIndex()
+
+# Other workers' tour writes only mark these stale; they rebuild on the next read
+invalidation_bus.subscribe("catalog_facets", lambda keys: catalog_facets._drop())
+invalidation_bus.subscribe("locations", lambda keys: location_index._drop())
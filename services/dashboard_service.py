@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import Tour, TourRequest, Feedback, RequestStatus
+from schemas import UserDashboard
+from config import settings
+from services.invalidation_service import invalidation_bus
+
+class DashboardCache:
+    """Short-lived per-user dashboard cache, invalidated by the owner's writes.
+
+    Entries expire after `ttl` seconds and the cache holds at most `size`
+    users (least recently used are dropped). A per-user generation counter is
+    bumped on every invalidation, so a dashboard computed while a write was
+    committing is never stored over the invalidation. Counters are bounded
+    like the entries: past `size` users they are all forgotten and the epoch
+    is bumped instead, which only turns away the dashboards being computed.
+    """
+
+    def __init__(self, ttl: float, size: int):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[float, UserDashboard]]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0
+        self._ttl = ttl
+        self._size = size
+
+    def generation(self, user_id: int) -> Tuple[int, int]:
+        with self._lock:
+            return self._epoch, self._generations.get(user_id, 0)
+
+    def get(self, user_id: int) -> Optional[UserDashboard]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, dashboard = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return dashboard
+
+    def put(self, user_id: int, generation: Tuple[int, int], dashboard: UserDashboard) -> None:
+        """Store `dashboard` unless the user was invalidated since `generation` was read"""
+        with self._lock:
+            if generation != (self._epoch, self._generations.get(user_id, 0)):
+                return
+            self._entries[user_id] = (time.monotonic() + self._ttl, dashboard)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        """Drop the dashboards of the owners of rows that were just written"""
+        user_ids = set(user_ids)
+        self._drop(user_ids)
+        invalidation_bus.publish("dashboard", user_ids)
+
+    def clear(self) -> None:
+        """Drop every dashboard, e.g. after a tour they may embed changed"""
+        self._drop(None)
+        invalidation_bus.publish("dashboard")
+
+    def _drop(self, user_ids: Optional[Iterable[int]]) -> None:
+        """Invalidate in this process only; None drops every user"""
+        with self._lock:
+            if user_ids is None:
+                self._entries.clear()
+                self._generations.clear()
+                self._epoch += 1
+                return
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            if len(self._generations) > self._size:
+                # Resetting a counter could let a stale build match it again; a new epoch can't
+                self._generations.clear()
+                self._epoch += 1
+
+class DashboardService:
+    """Service for the aggregated per-user dashboard"""
+
+    @staticmethod
+    def build_dashboard(db: Session, user_id: int) -> UserDashboard:
+        """Build a dashboard with three queries: requests, feedback, referenced tours"""
+        requests = db.scalars(
+            select(TourRequest)
+            .where(TourRequest.user_id == user_id)
+            .order_by(TourRequest.created_at.desc(), TourRequest.id.desc())
+        ).all()
+        feedbacks = db.scalars(
+            select(Feedback)
+            .where(Feedback.user_id == user_id)
+            .order_by(Feedback.created_at.desc(), Feedback.id.desc())
+        ).all()
+
+        tour_ids = {request.tour_id for request in requests} | {feedback.tour_id for feedback in feedbacks}
+        tours = db.scalars(
+            select(Tour).where(Tour.id.in_(tour_ids)).order_by(Tour.id)
+        ).all() if tour_ids else []
+
+        counts = Counter(request.status for request in requests)
+        return UserDashboard(
+            status_counts={status: counts.get(status, 0) for status in RequestStatus},
+            requests=requests,
+            feedbacks=feedbacks,
+            tours=tours,
+            generated_at=datetime.utcnow()
+        )
+
+    @staticmethod
+    def get_dashboard(db: Session, user_id: int) -> UserDashboard:
+        """Get the user's dashboard from the cache, building it on a miss"""
+        dashboard = dashboard_cache.get(user_id)
+        if dashboard is None:
+            generation = dashboard_cache.generation(user_id)
+            dashboard = DashboardService.build_dashboard(db, user_id)
+            dashboard_cache.put(user_id, generation, dashboard)
+        return dashboard
+
+# Per-user dashboards, invalidated by the request, feedback and tour write paths
+dashboard_cache = DashboardCache(ttl=settings.DASHBOARD_CACHE_SECONDS, size=settings.DASHBOARD_CACHE_SIZE)
+invalidation_bus.subscribe("dashboard", dashboard_cache._drop)
@@ -0,0 +1,72 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from datetime import datetime, timedelta
+from typing import Dict
+
+from models import Tour, User, TourRequest
+from services.request_service import RequestService
+from services.popularity_service import tour_popularity
+from services.catalog_service import catalog_facets, location_index
+from services.dashboard_service import dashboard_cache
+from config import settings
+
+class DeletionService:
+    """Service for deleting tours and users, soft or hard depending on SOFT_DELETE.
+
+    Hard deletes rely on ON DELETE CASCADE for requests and feedback, so the
+    ORM never loads dependent rows; change feed tombstones for the cascaded
+    requests are recorded with one INSERT ... SELECT beforehand.
+    """
+    
+    @staticmethod
+    def delete_tour(db: Session, tour: Tour) -> None:
+        """Delete a tour, or mark it deleted and inactive in soft delete mode"""
+        tour_id, previous = tour.id, (tour.location, tour.is_active)
+        if settings.SOFT_DELETE:
+            tour.deleted_at = datetime.utcnow()
+            tour.is_active = False
+        else:
+            RequestService.record_tombstones(db, TourRequest.tour_id == tour_id)
+            db.delete(tour)
+        db.commit()
+        
+        tour_popularity.remove_tour(tour_id)
+        catalog_facets.invalidate()
+        location_index.tour_changed(previous, None)
+        dashboard_cache.clear()
+    
+    @staticmethod
+    def delete_user(db: Session, user: User) -> None:
+        """Delete a user, or mark them deleted and inactive in soft delete mode"""
+        if settings.SOFT_DELETE:
+            user.deleted_at = datetime.utcnow()
+            user.is_active = False
+            db.commit()
+            dashboard_cache.invalidate([user.id])
+            return
+        
+        user_id = user.id
+        RequestService.record_tombstones(db, TourRequest.user_id == user_id)
+        db.delete(user)
+        db.commit()
+        dashboard_cache.invalidate([user_id])
+        # The user's requests may have touched any tour's counters
+        tour_popularity.invalidate()
+    
+    @staticmethod
+    def purge_deleted(db: Session, grace_seconds: int) -> Dict[str, int]:
+        """Hard delete tours and users soft deleted more than `grace_seconds` ago"""
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        expired_tours = select(Tour.id).where(Tour.deleted_at < cutoff)
+        expired_users = select(User.id).where(User.deleted_at < cutoff)
+        
+        RequestService.record_tombstones(db, TourRequest.tour_id.in_(expired_tours))
+        tours = db.execute(delete(Tour).where(Tour.id.in_(expired_tours))).rowcount
+        RequestService.record_tombstones(db, TourRequest.user_id.in_(expired_users))
+        users = db.execute(delete(User).where(User.id.in_(expired_users))).rowcount
+        db.commit()
+        
+        if tours or users:
+            tour_popularity.invalidate()
+            dashboard_cache.clear()
+        return {"tours": tours, "users": users}
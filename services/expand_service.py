@@ -0,0 +1,43 @@
+from fastapi import HTTPException, Query, status
+from sqlalchemy.orm import selectinload, joinedload, noload
+from typing import FrozenSet, List, Optional
+
+class ExpandService:
+    """Parsing of the `expand` query parameter and the matching loader options"""
+    
+    RELATIONS: FrozenSet[str] = frozenset({"tour", "user"})
+    
+    @staticmethod
+    def parse(
+        expand: Optional[str] = Query(None, description="Comma-separated relations to embed: tour, user")
+    ) -> FrozenSet[str]:
+        """Dependency turning `expand=tour,user` into a set of relation names"""
+        if not expand:
+            return frozenset()
+        requested = frozenset(name.strip() for name in expand.split(",") if name.strip())
+        unknown = requested - ExpandService.RELATIONS
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown expand value(s): {', '.join(sorted(unknown))}. "
+                       f"Allowed: {', '.join(sorted(ExpandService.RELATIONS))}"
+            )
+        return requested
+    
+    @staticmethod
+    def options(model, expand: FrozenSet[str], many: bool = True) -> List:
+        """Loader options fetching expanded relations up front and never lazy-loading the rest.
+        
+        Lists use selectinload (one extra IN query per relation, each related row
+        fetched once); single rows use joinedload (no extra query at all).
+        """
+        options = []
+        for name in ExpandService.RELATIONS:
+            relation = getattr(model, name)
+            if name not in expand:
+                options.append(noload(relation))
+            elif many:
+                options.append(selectinload(relation))
+            else:
+                options.append(joinedload(relation))
+        return options
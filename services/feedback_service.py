@@ -0,0 +1,116 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update
+from datetime import datetime
+from pydantic import ValidationError
+from typing import Any, Dict, List, Optional
+
+from models import Feedback, Tour, User
+from schemas import (
+    FeedbackImport,
+    FeedbackImportList,
+    FeedbackBulkItemResult,
+    FeedbackBulkResponse,
+    FeedbackModerationPage,
+    FeedbackPublishResponse
+)
+from services.dashboard_service import dashboard_cache
+
+class FeedbackService:
+    """Service for feedback-related business logic"""
+    
+    @staticmethod
+    def _format_errors(error: ValidationError) -> str:
+        return "; ".join(
+            f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+            for item in error.errors()
+        )
+    
+    @staticmethod
+    def bulk_create(db: Session, items: List[Dict[str, Any]]) -> FeedbackBulkResponse:
+        """Import many feedbacks, each with its own author, in one transaction, reporting errors per item.
+
+        Tours and authors of the whole batch are checked with one IN query each
+        and valid rows are inserted with one executemany INSERT ... RETURNING.
+        """
+        results = [FeedbackBulkItemResult(index=index) for index in range(len(items))]
+        try:
+            # Clean batches validate in a single pydantic-core call
+            valid = list(enumerate(FeedbackImportList.validate_python(items)))
+        except ValidationError:
+            valid = []
+            for index, item in enumerate(items):
+                try:
+                    valid.append((index, FeedbackImport.model_validate(item)))
+                except ValidationError as e:
+                    results[index].error = FeedbackService._format_errors(e)
+        
+        tour_ids = {feedback.tour_id for _, feedback in valid}
+        active_tours = set(db.scalars(
+            select(Tour.id).where(Tour.id.in_(tour_ids), Tour.is_active == True)
+        )) if tour_ids else set()
+        user_ids = {feedback.user_id for _, feedback in valid}
+        existing_users = set(db.scalars(
+            select(User.id).where(User.id.in_(user_ids), User.deleted_at.is_(None))
+        )) if user_ids else set()
+        
+        rows = []
+        row_indexes = []
+        for index, feedback in valid:
+            if feedback.tour_id not in active_tours:
+                results[index].error = "Tour not found or inactive"
+                continue
+            if feedback.user_id not in existing_users:
+                results[index].error = "User not found"
+                continue
+            rows.append(feedback.model_dump())
+            row_indexes.append(index)
+        
+        if rows:
+            created_ids = db.scalars(
+                insert(Feedback).returning(Feedback.id, sort_by_parameter_order=True),
+                rows
+            ).all()
+            db.commit()
+            dashboard_cache.invalidate(row["user_id"] for row in rows)
+            for index, feedback_id in zip(row_indexes, created_ids):
+                results[index].id = feedback_id
+        
+        return FeedbackBulkResponse(
+            created=len(rows),
+            failed=len(items) - len(rows),
+            results=results
+        )
+    
+    @staticmethod
+    def get_moderation_queue(db: Session, after: Optional[int] = None, limit: int = 50) -> FeedbackModerationPage:
+        """Get a keyset page of unpublished feedback, oldest first.
+
+        The query matches the partial index on unpublished rows, so its cost
+        depends on the moderation backlog rather than on all feedback.
+        """
+        query = select(Feedback).where(Feedback.is_published == False)
+        if after is not None:
+            query = query.where(Feedback.id > after)
+        items = db.scalars(query.order_by(Feedback.id).limit(limit + 1)).all()
+        
+        next_cursor = items[limit - 1].id if len(items) > limit else None
+        return FeedbackModerationPage(items=items[:limit], next_cursor=next_cursor)
+    
+    @staticmethod
+    def set_published(db: Session, ids: List[int], is_published: bool) -> FeedbackPublishResponse:
+        """Publish or unpublish many feedbacks with a single UPDATE"""
+        ids = list(dict.fromkeys(ids))
+        updated = db.execute(
+            update(Feedback)
+            .where(Feedback.id.in_(ids))
+            .values(is_published=is_published, updated_at=datetime.utcnow())
+            .returning(Feedback.id, Feedback.user_id)
+        ).all()
+        db.commit()
+        dashboard_cache.invalidate(row.user_id for row in updated)
+        updated_ids = {row.id for row in updated}
+        
+        return FeedbackPublishResponse(
+            updated=len(updated_ids),
+            not_found=[feedback_id for feedback_id in ids if feedback_id not in updated_ids]
+        )
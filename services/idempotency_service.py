@@ -0,0 +1,146 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+
+from database import SessionLocal
+from models import IdempotencyKey
+from config import settings
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: Optional[int]  # None while the original request is in flight
+    headers: List[List[str]]
+    body: bytes
+    expires_at: datetime
+
+class IdempotencyStore:
+    """Stored first responses keyed by idempotency key.
+
+    Completed responses live in the `idempotency_keys` table with a TTL and
+    in a bounded in-memory LRU in front of it. A row without a status code
+    is a reservation held by a request still in flight. The worker running
+    it keeps extending it by the lock timeout, so a slow request keeps its
+    key while a crashed worker's reservation lapses within one timeout.
+
+    Every method may query the database; async callers run them in a thread.
+    """
+
+    PURGE_INTERVAL = timedelta(minutes=5)
+
+    def __init__(self, cache_size: int):
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self._cache_size = cache_size
+        self._last_purge = datetime.utcnow()
+
+    def _cache_put(self, key: str, stored: StoredResponse) -> None:
+        with self._lock:
+            self._cache[key] = stored
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        """Get a live stored response or reservation for `key`"""
+        now = datetime.utcnow()
+        with self._lock:
+            stored = self._cache.get(key)
+            if stored is not None:
+                if stored.expires_at > now:
+                    self._cache.move_to_end(key)
+                    return stored
+                del self._cache[key]
+
+        db = SessionLocal()
+        try:
+            row = db.get(IdempotencyKey, key)
+            if row is None or row.expires_at <= now:
+                return None
+            stored = StoredResponse(row.fingerprint, row.status_code, row.headers or [], row.body or b"", row.expires_at)
+        finally:
+            db.close()
+        if stored.status_code is not None:
+            self._cache_put(key, stored)
+        return stored
+
+    def reserve(self, key: str, fingerprint: str) -> bool:
+        """Claim `key` for a request about to run; False if someone else holds it"""
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            # Clear an expired row (finished or abandoned) so the key can be reused
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.expires_at <= now))
+            db.add(IdempotencyKey(
+                key=key,
+                fingerprint=fingerprint,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+            ))
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+    def extend(self, key: str) -> None:
+        """Push back the expiry of a reservation whose request is still running"""
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))
+                .values(expires_at=datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS))
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def complete(self, key: str, status_code: int, headers: List[List[str]], body: bytes) -> None:
+        """Store the response of a reserved request for replay"""
+        expires_at = datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+        db = SessionLocal()
+        try:
+            row = db.get(IdempotencyKey, key)
+            if row is None:
+                return
+            row.status_code = status_code
+            row.headers = headers
+            row.body = body
+            row.expires_at = expires_at
+            db.commit()
+            stored = StoredResponse(row.fingerprint, status_code, headers, body, expires_at)
+        finally:
+            db.close()
+        self._cache_put(key, stored)
+        self._maybe_purge()
+
+    def release(self, key: str) -> None:
+        """Drop a reservation whose request failed, so the client may retry"""
+        db = SessionLocal()
+        try:
+            db.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None)
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def _maybe_purge(self) -> None:
+        now = datetime.utcnow()
+        if now - self._last_purge < self.PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        db = SessionLocal()
+        try:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+            db.commit()
+        finally:
+            db.close()
+
+idempotency_store = IdempotencyStore(cache_size=settings.IDEMPOTENCY_CACHE_SIZE)
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Engine
+
+from models import CacheInvalidation
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Receives the invalidated keys, or None when the whole cache is stale
+InvalidationHandler = Callable[[Optional[List[Any]]], None]
+
+class InvalidationBus:
+    """Cache invalidations shared by the worker processes through a table in the app database.
+
+    Caches keep invalidating themselves locally and also `publish` the
+    invalidation here. Publishing only merges it into a pending set in
+    memory; once per `poll_interval` every worker writes its pending
+    invalidations as one row per topic and reads the rows the other workers
+    wrote since its last poll, calling the handlers subscribed to each topic.
+    A write is therefore applied on every worker within two poll intervals,
+    and a burst of writes costs one insert per topic rather than one per
+    request. Reading by increasing id relies on SQLite running one write
+    transaction at a time, so ids become visible in order.
+
+    The bus stays a no-op until `bind` gives it an engine, which only
+    happens when the app runs with more than one worker.
+    """
+
+    def __init__(self, poll_interval: float, retention: float):
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.published = 0
+        self.applied = 0
+        self._engine: Optional[Engine] = None
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Optional[Set[Any]]] = {}
+        self._handlers: Dict[str, List[InvalidationHandler]] = {}
+        self._last_id = 0
+        self._last_poll = 0.0
+        self._last_prune = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._engine is not None
+
+    def bind(self, engine: Engine) -> None:
+        self._engine = engine
+
+    def subscribe(self, topic: str, handler: InvalidationHandler) -> None:
+        """Call `handler` for invalidations of `topic` published by other workers"""
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def publish(self, topic: str, keys: Optional[Iterable[Any]] = None) -> None:
+        """Queue an invalidation of `keys` (everything when None) for the other workers"""
+        if self._engine is None:
+            return
+        with self._lock:
+            if topic in self._pending and self._pending[topic] is None:
+                return
+            if keys is None:
+                self._pending[topic] = None
+            else:
+                self._pending.setdefault(topic, set()).update(keys)
+
+    def start(self) -> None:
+        if self._engine is None or self._task is not None:
+            return
+        # Nothing is cached yet, so earlier rows need not be applied
+        with self._engine.connect() as connection:
+            self._last_id = connection.scalar(select(func.max(CacheInvalidation.id))) or 0
+        self._last_poll = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # Hand over the last writes of this worker before it exits
+        await asyncio.to_thread(self.flush)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception:
+                logger.exception("Cache invalidation sync failed")
+
+    def sync(self) -> None:
+        """Publish this worker's pending invalidations and apply the other workers' ones"""
+        self.flush()
+        self.poll()
+        if time.monotonic() - self._last_prune > self.retention / 2:
+            self.prune()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        now = datetime.utcnow()
+        rows = [
+            {
+                "origin": self.origin,
+                "topic": topic,
+                "keys": None if keys is None else sorted(keys),
+                "created_at": now
+            }
+            for topic, keys in pending.items()
+        ]
+        try:
+            with self._engine.begin() as connection:
+                connection.execute(insert(CacheInvalidation), rows)
+        except Exception:
+            # Keep them for the next attempt
+            for topic, keys in pending.items():
+                self.publish(topic, keys)
+            raise
+        self.published += len(rows)
+
+    def poll(self) -> None:
+        with self._engine.connect() as connection:
+            rows = connection.execute(
+                select(CacheInvalidation.id, CacheInvalidation.origin, CacheInvalidation.topic, CacheInvalidation.keys)
+                .where(CacheInvalidation.id > self._last_id)
+                .order_by(CacheInvalidation.id)
+            ).all()
+
+        now = time.monotonic()
+        if now - self._last_poll > self.retention:
+            # Rows this worker never read may have been pruned: drop everything
+            logger.warning("Cache invalidation poll fell behind; clearing all caches")
+            merged: Dict[str, Optional[Set[Any]]] = {topic: None for topic in self._handlers}
+        else:
+            merged = {}
+        self._last_poll = now
+
+        for row_id, origin, topic, keys in rows:
+            self._last_id = row_id
+            if origin == self.origin or (topic in merged and merged[topic] is None):
+                continue
+            if keys is None:
+                merged[topic] = None
+            else:
+                merged.setdefault(topic, set()).update(keys)
+
+        for topic, keys in merged.items():
+            for handler in self._handlers.get(topic, []):
+                try:
+                    handler(None if keys is None else list(keys))
+                except Exception:
+                    logger.exception(f"Cache invalidation handler for '{topic}' failed")
+            self.applied += 1
+
+    def prune(self) -> None:
+        """Delete rows every worker has had time to read"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention)
+        with self._engine.begin() as connection:
+            connection.execute(delete(CacheInvalidation).where(CacheInvalidation.created_at < cutoff))
+        self._last_prune = time.monotonic()
+
+    def readings(self) -> Dict[str, Any]:
+        """Bus state of this worker, as reported by /health"""
+        return {
+            "enabled": self.enabled,
+            "pid": os.getpid(),
+            "origin": self.origin,
+            "last_id": self._last_id,
+            "published": self.published,
+            "applied": self.applied
+        }
+
+# Process-wide bus, bound to the engine by main.py when running several workers
+invalidation_bus = InvalidationBus(
+    poll_interval=settings.INVALIDATION_POLL_SECONDS,
+    retention=settings.INVALIDATION_RETENTION_SECONDS
+)
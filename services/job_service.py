@@ -0,0 +1,393 @@
+import asyncio
+import csv
+import enum
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select, update, delete, func, or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Job, JobStatus, Tour, TourRequest, Feedback, User
+from schemas import (
+    DeleteTourJobParams,
+    DeleteUserJobParams,
+    ExportRequestsJobParams,
+    TourStatsJobParams,
+    SimilarToursJobParams,
+    PurgeDeletedJobParams,
+    PruneTombstonesJobParams
+)
+from services.request_service import RequestService
+from services.tour_service import TourService
+from services.similarity_service import SimilarityService
+from services.deletion_service import DeletionService
+from services.popularity_service import tour_popularity
+from services.catalog_service import catalog_facets, location_index
+from services.dashboard_service import dashboard_cache
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# handler(db, params, progress) -> result; progress(done, total) reports completion
+JobHandler = Callable[[Session, BaseModel, Callable[[int, int], None]], Dict[str, Any]]
+
+class JobType:
+    """A registered job type with its handler and concurrency limit"""
+
+    def __init__(self, name: str, handler: JobHandler, params_schema: Type[BaseModel], concurrency: int):
+        self.name = name
+        self.handler = handler
+        self.params_schema = params_schema
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+class JobRunner:
+    """Local background job runner backed by the persistent `jobs` table.
+
+    Jobs are scheduled as asyncio tasks that wait on a per-type semaphore and
+    then run their (blocking) handler on a shared thread pool with their own
+    DB session, so heavy work never runs inside an HTTP request and each job
+    type is throttled independently.
+
+    Several worker processes may each run a runner on the same table. A job
+    runs only after its runner claims it with a conditional UPDATE from
+    queued to running, so scheduling one job in several processes is
+    harmless. The claim carries a lease that the owner keeps extending; a
+    running job whose lease lapsed lost its process and is failed by
+    whichever runner notices first, while jobs of live runners are left alone.
+    """
+
+    def __init__(self, max_workers: int, lease_seconds: int):
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._types: Dict[str, JobType] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._tasks: Set[asyncio.Task] = set()
+        self._scheduled: Set[int] = set()
+        self._lease = timedelta(seconds=lease_seconds)
+
+    def register(self, name: str, params_schema: Type[BaseModel], concurrency: int = 1):
+        """Decorator registering a job handler under `name`"""
+        def decorator(handler: JobHandler) -> JobHandler:
+            self._types[name] = JobType(name, handler, params_schema, concurrency)
+            return handler
+        return decorator
+
+    @property
+    def job_types(self) -> Dict[str, JobType]:
+        return dict(self._types)
+
+    def enqueue(self, db: Session, job_type: str, params: Dict[str, Any], user_id: Optional[int]) -> Job:
+        """Persist a new job and schedule it on the running event loop"""
+        job = self._insert(db, job_type, params, user_id)
+        self._schedule(job.id, self._types[job_type])
+        return job
+
+    def _insert(self, db: Session, job_type: str, params: Dict[str, Any], user_id: Optional[int]) -> Job:
+        definition = self._types.get(job_type)
+        if definition is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown job type '{job_type}'"
+            )
+        try:
+            validated = definition.params_schema(**params)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=e.errors(include_url=False)
+            )
+
+        job = Job(type=job_type, params=validated.model_dump(mode="json"), created_by=user_id)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> Job:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+
+    def resume_pending(self) -> None:
+        """Fail jobs orphaned by a dead process, schedule queued ones and keep this runner's leases alive"""
+        self._schedule_queued(self._recover())
+        task = asyncio.get_running_loop().create_task(self._maintain())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _maintain(self) -> None:
+        while True:
+            await asyncio.sleep(self._lease.total_seconds() / 3)
+            try:
+                await asyncio.to_thread(self._renew_leases)
+                self._schedule_queued(await asyncio.to_thread(self._recover))
+            except Exception:
+                logger.exception("Job lease maintenance failed")
+
+    def _renew_leases(self) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(Job)
+                .where(Job.owner == self.owner, Job.status == JobStatus.RUNNING)
+                .values(lease_expires_at=datetime.utcnow() + self._lease)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _recover(self) -> List[Tuple[int, str]]:
+        """Fail running jobs whose lease lapsed and list the queued ones"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            db.execute(
+                update(Job)
+                .where(
+                    Job.status == JobStatus.RUNNING,
+                    # No lease: claimed by a version that did not take leases
+                    or_(Job.lease_expires_at < now, Job.lease_expires_at.is_(None))
+                )
+                .values(
+                    status=JobStatus.FAILED,
+                    error="Interrupted by server restart",
+                    finished_at=now
+                )
+            )
+            queued = db.execute(
+                select(Job.id, Job.type).where(Job.status == JobStatus.QUEUED).order_by(Job.id)
+            ).all()
+            db.commit()
+        finally:
+            db.close()
+        return queued
+
+    def _schedule_queued(self, queued: List[Tuple[int, str]]) -> None:
+        for job_id, job_type in queued:
+            if job_type in self._types:
+                self._schedule(job_id, self._types[job_type])
+
+    def schedule_periodic(self, job_type: str, interval: float, params: Optional[Dict[str, Any]] = None) -> None:
+        """Enqueue `job_type` now and every `interval` seconds, unless one is still pending"""
+        task = asyncio.get_running_loop().create_task(self._periodic(job_type, interval, params or {}))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _periodic(self, job_type: str, interval: float, params: Dict[str, Any]) -> None:
+        pending_statuses = [JobStatus.QUEUED, JobStatus.RUNNING]
+        while True:
+            db = SessionLocal()
+            try:
+                pending = db.scalar(
+                    select(Job.id)
+                    .where(Job.type == job_type, Job.status.in_(pending_statuses))
+                    .limit(1)
+                )
+                if pending is None:
+                    job = self._insert(db, job_type, params, user_id=None)
+                    # Other workers may have enqueued it at the same moment; the oldest job wins
+                    older = db.scalar(
+                        select(Job.id)
+                        .where(Job.type == job_type, Job.status.in_(pending_statuses), Job.id < job.id)
+                        .limit(1)
+                    )
+                    if older is None:
+                        self._schedule(job.id, self._types[job_type])
+                    else:
+                        db.execute(delete(Job).where(Job.id == job.id, Job.status == JobStatus.QUEUED))
+                        db.commit()
+            finally:
+                db.close()
+            await asyncio.sleep(interval)
+
+    def _schedule(self, job_id: int, definition: JobType) -> None:
+        if job_id in self._scheduled:
+            return
+        self._scheduled.add(job_id)
+        task = asyncio.get_running_loop().create_task(self._run(job_id, definition))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job_id: int, definition: JobType) -> None:
+        try:
+            async with definition.semaphore:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(self._executor, self._execute, job_id, definition)
+        finally:
+            self._scheduled.discard(job_id)
+
+    def _claim(self, job_id: int) -> bool:
+        """Move a queued job to running under this runner; False if another runner got it first"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            claimed = db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+                .values(status=JobStatus.RUNNING, owner=self.owner, started_at=now, lease_expires_at=now + self._lease)
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        return claimed == 1
+
+    def _execute(self, job_id: int, definition: JobType) -> None:
+        """Run a job handler to completion on a worker thread"""
+        if not self._claim(job_id):
+            return
+        last_percent = [0]
+
+        def progress(done: int, total: int) -> None:
+            percent = min(99, done * 100 // total) if total else 0
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                self._update(job_id, progress=percent)
+
+        db = SessionLocal()
+        try:
+            params = db.execute(select(Job.params).where(Job.id == job_id)).scalar_one()
+            result = definition.handler(db, definition.params_schema(**params), progress)
+        except Exception as e:
+            db.rollback()
+            self._update(job_id, status=JobStatus.FAILED, error=str(e), finished_at=datetime.utcnow())
+        else:
+            self._update(
+                job_id,
+                status=JobStatus.SUCCEEDED,
+                progress=100,
+                result=result,
+                finished_at=datetime.utcnow()
+            )
+        finally:
+            db.close()
+
+    @staticmethod
+    def _update(job_id: int, **values) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(update(Job).where(Job.id == job_id).values(**values))
+            db.commit()
+        finally:
+            db.close()
+
+job_runner = JobRunner(max_workers=settings.JOB_WORKERS, lease_seconds=settings.JOB_LEASE_SECONDS)
+
+def _delete_in_batches(db: Session, model, condition, on_batch: Callable[[int], None]) -> int:
+    """Delete rows matching `condition` in fixed-size batches, committing each"""
+    deleted = 0
+    while True:
+        ids = db.scalars(select(model.id).where(condition).limit(settings.JOB_BATCH_SIZE)).all()
+        if not ids:
+            return deleted
+        if model is TourRequest:
+            RequestService.record_tombstones(db, TourRequest.id.in_(ids))
+        db.execute(delete(model).where(model.id.in_(ids)))
+        db.commit()
+        deleted += len(ids)
+        on_batch(len(ids))
+
+def _delete_with_dependents(db: Session, model, owner_id: int, foreign_key: str, progress) -> Dict[str, Any]:
+    """Delete a tour or user after batch-deleting its requests and feedback"""
+    if db.scalar(select(model.id).where(model.id == owner_id)) is None:
+        raise ValueError(f"{model.__name__} {owner_id} not found")
+
+    request_condition = getattr(TourRequest, foreign_key) == owner_id
+    feedback_condition = getattr(Feedback, foreign_key) == owner_id
+    total = (
+        db.scalar(select(func.count(TourRequest.id)).where(request_condition))
+        + db.scalar(select(func.count(Feedback.id)).where(feedback_condition))
+        + 1
+    )
+    done = [0]
+
+    def on_batch(count: int) -> None:
+        done[0] += count
+        progress(done[0], total)
+
+    requests_deleted = _delete_in_batches(db, TourRequest, request_condition, on_batch)
+    feedbacks_deleted = _delete_in_batches(db, Feedback, feedback_condition, on_batch)
+    db.execute(delete(model).where(model.id == owner_id))
+    db.commit()
+    return {"requests_deleted": requests_deleted, "feedbacks_deleted": feedbacks_deleted}
+
+@job_runner.register("delete_tour", DeleteTourJobParams, concurrency=1)
+def delete_tour_job(db: Session, params: DeleteTourJobParams, progress) -> Dict[str, Any]:
+    """Delete a tour together with its requests and feedback"""
+    result = _delete_with_dependents(db, Tour, params.tour_id, "tour_id", progress)
+    tour_popularity.remove_tour(params.tour_id)
+    catalog_facets.invalidate()
+    location_index.invalidate()
+    dashboard_cache.clear()
+    return result
+
+@job_runner.register("delete_user", DeleteUserJobParams, concurrency=1)
+def delete_user_job(db: Session, params: DeleteUserJobParams, progress) -> Dict[str, Any]:
+    """Delete a user together with their requests and feedback"""
+    result = _delete_with_dependents(db, User, params.user_id, "user_id", progress)
+    tour_popularity.invalidate()
+    dashboard_cache.invalidate([params.user_id])
+    return result
+
+@job_runner.register("tour_stats", TourStatsJobParams, concurrency=1)
+def tour_stats_job(db: Session, params: TourStatsJobParams, progress) -> Dict[str, Any]:
+    """Recompute detailed tour statistics"""
+    return TourService.get_detailed_tour_statistics(db)
+
+@job_runner.register("export_requests", ExportRequestsJobParams, concurrency=2)
+def export_requests_job(db: Session, params: ExportRequestsJobParams, progress) -> Dict[str, Any]:
+    """Export tour requests to a CSV file in EXPORT_DIR"""
+    conditions = []
+    if params.status is not None:
+        conditions.append(TourRequest.status == params.status)
+    if params.tour_id is not None:
+        conditions.append(TourRequest.tour_id == params.tour_id)
+
+    total = db.scalar(select(func.count(TourRequest.id)).where(*conditions))
+    columns = [
+        TourRequest.id, TourRequest.user_id, TourRequest.tour_id, TourRequest.participants_count,
+        TourRequest.preferred_date, TourRequest.status, TourRequest.notes,
+        TourRequest.created_at, TourRequest.updated_at
+    ]
+    os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+    path = os.path.join(settings.EXPORT_DIR, f"tour_requests_{datetime.utcnow():%Y%m%d%H%M%S%f}.csv")
+
+    rows = 0
+    with open(path, "w", newline="") as export_file:
+        writer = csv.writer(export_file)
+        writer.writerow([column.key for column in columns])
+        result = db.execute(
+            select(*columns).where(*conditions).order_by(TourRequest.id)
+            .execution_options(yield_per=settings.JOB_BATCH_SIZE)
+        )
+        for partition in result.partitions():
+            for row in partition:
+                writer.writerow([value.value if isinstance(value, enum.Enum) else value for value in row])
+            rows += len(partition)
+            progress(rows, total)
+
+    return {"path": path, "rows": rows}
+
+@job_runner.register("similar_tours", SimilarToursJobParams, concurrency=1)
+def similar_tours_job(db: Session, params: SimilarToursJobParams, progress) -> Dict[str, Any]:
+    """Rebuild the co-request based similar tours table"""
+    return SimilarityService.build(db, params.top_k, progress)
+
+@job_runner.register("purge_deleted", PurgeDeletedJobParams, concurrency=1)
+def purge_deleted_job(db: Session, params: PurgeDeletedJobParams, progress) -> Dict[str, Any]:
+    """Hard delete soft-deleted tours and users past their grace period"""
+    return DeletionService.purge_deleted(db, params.grace_seconds)
+
+@job_runner.register("prune_tombstones", PruneTombstonesJobParams, concurrency=1)
+def prune_tombstones_job(db: Session, params: PruneTombstonesJobParams, progress) -> Dict[str, Any]:
+    """Delete change feed tombstones past their retention"""
+    return {"deleted": RequestService.prune_tombstones(db, params.retention_seconds)}
@@ -0,0 +1,141 @@
+import asyncio
+import math
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from config import settings
+
+class LoadMonitor:
+    """Event-loop lag and DB pool checkout wait, sampled in real time.
+
+    A background task sleeps for `interval` seconds and measures how late it
+    wakes up: that delay is what every coroutine on the loop is suffering.
+    Sessions bound through `instrument_sessions` time each connection checkout
+    when their first query or flush needs one, so requests that never touch
+    the database (cached responses, event streams) hold no connection; the
+    monitor keeps the worst wait of each interval. Both feed exponentially weighted
+    averages, and the server counts as overloaded once either average crosses
+    its threshold, until both drop below half of it again, so shedding does
+    not flap on a single slow tick.
+    """
+
+    SMOOTHING = 0.3
+
+    def __init__(self, interval: float, lag_threshold_ms: float, pool_wait_threshold_ms: float):
+        self.interval = interval
+        self.lag_threshold_ms = lag_threshold_ms
+        self.pool_wait_threshold_ms = pool_wait_threshold_ms
+        self.overloaded = False
+        self.shed_requests = 0
+        self.loop_lag_ms = 0.0
+        self.pool_wait_ms = 0.0
+        self._lag_average = 0.0
+        self._pool_wait_average = 0.0
+        self._max_pool_wait = 0.0
+        self._engine: Optional[Engine] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def bind(self, engine: Engine) -> None:
+        """Report the occupancy of `engine`'s current pool in the readings"""
+        self._engine = engine
+
+    def instrument_sessions(self, session_factory: sessionmaker) -> None:
+        """Time the pool checkout of sessions from `session_factory` as their queries need one"""
+        event.listen(session_factory, "do_orm_execute", lambda state: self._time_checkout(state.session))
+        event.listen(session_factory, "before_flush", lambda session, context, instances: self._time_checkout(session))
+        event.listen(session_factory, "after_transaction_end", self._forget_checkout)
+
+    def _time_checkout(self, session: Session) -> None:
+        if session.info.get("checkout_timed"):
+            return
+        session.info["checkout_timed"] = True
+        started = time.perf_counter()
+        try:
+            session.connection()
+        finally:
+            self.record_pool_wait(time.perf_counter() - started)
+
+    @staticmethod
+    def _forget_checkout(session: Session, transaction) -> None:
+        # The connection goes back to the pool with the outermost transaction
+        if transaction.parent is None:
+            session.info.pop("checkout_timed", None)
+
+    def record_pool_wait(self, seconds: float) -> None:
+        # May run on worker threads; a lost update only loses one sample
+        if seconds > self._max_pool_wait:
+            self._max_pool_wait = seconds
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            pool_wait, self._max_pool_wait = self._max_pool_wait, 0.0
+            self.update(lag * 1000, pool_wait * 1000)
+
+    def update(self, loop_lag_ms: float, pool_wait_ms: float) -> None:
+        """Fold one interval's readings into the averages and the overload state"""
+        self.loop_lag_ms = loop_lag_ms
+        self.pool_wait_ms = pool_wait_ms
+        self._lag_average += self.SMOOTHING * (loop_lag_ms - self._lag_average)
+        self._pool_wait_average += self.SMOOTHING * (pool_wait_ms - self._pool_wait_average)
+        if self.overloaded:
+            self.overloaded = (
+                self._lag_average > self.lag_threshold_ms / 2
+                or self._pool_wait_average > self.pool_wait_threshold_ms / 2
+            )
+        else:
+            self.overloaded = (
+                self._lag_average > self.lag_threshold_ms
+                or self._pool_wait_average > self.pool_wait_threshold_ms
+            )
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait: longer the further past the thresholds we are"""
+        pressure = max(
+            self._lag_average / self.lag_threshold_ms if self.lag_threshold_ms else 0,
+            self._pool_wait_average / self.pool_wait_threshold_ms if self.pool_wait_threshold_ms else 0
+        )
+        return max(1, min(60, math.ceil(settings.SHED_RETRY_AFTER_SECONDS * max(pressure, 1))))
+
+    def readings(self) -> Dict[str, Any]:
+        """Current readings, as reported by /health"""
+        readings = {
+            "overloaded": self.overloaded,
+            "loop_lag_ms": round(self.loop_lag_ms, 3),
+            "loop_lag_avg_ms": round(self._lag_average, 3),
+            "pool_wait_ms": round(self.pool_wait_ms, 3),
+            "pool_wait_avg_ms": round(self._pool_wait_average, 3),
+            "shed_requests": self.shed_requests
+        }
+        pool = self._engine.pool if self._engine is not None else None
+        if isinstance(pool, QueuePool):
+            readings["pool_checked_out"] = pool.checkedout()
+            readings["pool_size"] = pool.size()
+        return readings
+
+# Process-wide monitor, started with the app and read by LoadSheddingMiddleware
+load_monitor = LoadMonitor(
+    interval=settings.LOAD_MONITOR_INTERVAL_SECONDS,
+    lag_threshold_ms=settings.LOOP_LAG_THRESHOLD_MS,
+    pool_wait_threshold_ms=settings.POOL_WAIT_THRESHOLD_MS
+)
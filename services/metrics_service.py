@@ -0,0 +1,177 @@
+import itertools
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+UNMATCHED_ROUTE = "unmatched"
+
+_route_paths: Dict[Callable, str] = {}
+
+def route_path(scope: Dict[str, Any]) -> str:
+    """Route template (`/tour/{tour_id}`) of a routed request, for bounded labels.
+
+    Looked up from the endpoint the router stored in the scope, which costs a
+    dict get instead of a second routing pass.
+    """
+    global _route_paths
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+    path = _route_paths.get(endpoint)
+    if path is None:
+        _route_paths = {
+            route.endpoint: route.path
+            for route in scope["app"].routes
+            if hasattr(route, "endpoint")
+        }
+        path = _route_paths.get(endpoint, UNMATCHED_ROUTE)
+    return path
+
+class Histogram:
+    """Fixed-bucket histogram; `observe` is a bisect and two additions"""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+class RequestStats:
+    """SQL activity of one HTTP request, filled in by the engine hooks"""
+
+    __slots__ = ("scope", "statements", "db_seconds")
+
+    def __init__(self, scope: Dict[str, Any]):
+        self.scope = scope
+        self.statements = 0
+        self.db_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        return f"{self.scope['method']} {route_path(self.scope)}"
+
+# Set by the metrics middleware for the duration of each request
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+class MetricsRegistry:
+    """Per-route HTTP and SQL metrics rendered in Prometheus text format.
+
+    Request metrics are only written by the middleware on the event loop
+    thread (all routes are async), so they need no locks. The engine hooks
+    may fire on worker threads; they only touch the per-request stats object
+    of their own request and an `itertools.count`, whose increments are
+    atomic under the GIL.
+    """
+
+    def __init__(self):
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.statements: Dict[Tuple[str, str], Histogram] = {}
+        self.db_time: Dict[Tuple[str, str], Histogram] = {}
+        self.responses: Dict[Tuple[str, str, int], int] = {}
+        self.in_flight: Dict[str, int] = {}
+        self._all_statements = itertools.count()
+        self._all_statements_read = 0
+
+    def request_started(self, method: str) -> None:
+        self.in_flight[method] = self.in_flight.get(method, 0) + 1
+
+    def request_finished(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        self.in_flight[method] -= 1
+        key = (method, route)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.statements[key] = Histogram(STATEMENT_BUCKETS)
+            self.db_time[key] = Histogram(DB_TIME_BUCKETS)
+        histogram.observe(seconds)
+        self.statements[key].observe(stats.statements)
+        self.db_time[key].observe(stats.db_seconds)
+        response_key = (method, route, status)
+        self.responses[response_key] = self.responses.get(response_key, 0) + 1
+
+    def statements_total(self) -> int:
+        # Reading an itertools.count advances it, so discount our own earlier reads
+        value = next(self._all_statements) - self._all_statements_read
+        self._all_statements_read += 1
+        return value
+
+    def instrument_engine(self, engine: Engine) -> None:
+        """Count statements and DB time per request through engine events"""
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        next(self._all_statements)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += time.perf_counter() - context._metrics_started
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        return ",".join(
+            '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for name, value in labels.items()
+        )
+
+    def _render_histograms(self, lines: List[str], name: str, help_text: str, histograms) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (method, route), histogram in sorted(histograms.items()):
+            labels = self._labels(method=method, route=route)
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += histogram.counts[-1]
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP http_requests_total HTTP responses by route and status code",
+            "# TYPE http_requests_total counter"
+        ]
+        for (method, route, status), count in sorted(self.responses.items()):
+            lines.append(f"http_requests_total{{{self._labels(method=method, route=route, status=status)}}} {count}")
+
+        lines.append("# HELP http_requests_in_flight HTTP requests currently being served")
+        lines.append("# TYPE http_requests_in_flight gauge")
+        for method, count in sorted(self.in_flight.items()):
+            lines.append(f"http_requests_in_flight{{{self._labels(method=method)}}} {count}")
+
+        self._render_histograms(
+            lines, "http_request_duration_seconds", "HTTP request latency", self.latency
+        )
+        self._render_histograms(
+            lines, "http_request_db_statements", "SQL statements executed per HTTP request", self.statements
+        )
+        self._render_histograms(
+            lines, "http_request_db_seconds", "Time spent executing SQL per HTTP request", self.db_time
+        )
+
+        lines.append("# HELP db_statements_total SQL statements executed, including background jobs")
+        lines.append("# TYPE db_statements_total counter")
+        lines.append(f"db_statements_total {self.statements_total()}")
+        return "\n".join(lines) + "\n"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._metrics_started = time.perf_counter()
+
+# Process-wide metrics, fed by MetricsMiddleware and the engine hooks
+metrics = MetricsRegistry()
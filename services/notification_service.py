@@ -0,0 +1,99 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional, Set
+
+from models import UserRole
+from schemas import CurrentUser
+from config import settings
+
+class Subscription:
+    """A single subscriber connection with a bounded event queue"""
+
+    def __init__(self, user_id: int, is_admin: bool, queue_size: int):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, event: str, data: Dict[str, Any]) -> None:
+        """Enqueue an event, dropping the oldest one if the subscriber is lagging"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait((event, data))
+
+class RequestEventBroker:
+    """In-process pub/sub fan-out of tour request changes.
+
+    Requestors receive events for their own requests; admins additionally
+    receive every newly created request. Each subscription has its own bounded
+    queue so a slow client can only lose its own (oldest) events, never block
+    the publisher or grow memory without limit.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._by_user: Dict[int, Set[Subscription]] = {}
+        self._admins: Set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._by_user.values())
+
+    def subscribe(self, user: CurrentUser) -> Subscription:
+        """Register a new subscription for the given user"""
+        subscription = Subscription(user.id, user.role == UserRole.ADMIN, self.queue_size)
+        self._by_user.setdefault(user.id, set()).add(subscription)
+        if subscription.is_admin:
+            self._admins.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription; safe to call more than once"""
+        subs = self._by_user.get(subscription.user_id)
+        if subs is not None:
+            subs.discard(subscription)
+            if not subs:
+                del self._by_user[subscription.user_id]
+        self._admins.discard(subscription)
+
+    def publish(self, event: str, owner_id: int, data: Dict[str, Any], notify_admins: bool = False) -> None:
+        """Deliver an event to the request owner and, optionally, to all admins"""
+        targets = set(self._by_user.get(owner_id, ()))
+        if notify_admins:
+            targets |= self._admins
+        for subscription in targets:
+            subscription.offer(event, data)
+
+    @staticmethod
+    def format_event(event: str, data: Dict[str, Any]) -> str:
+        """Format an event as a server-sent events frame"""
+        return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    async def stream(self, user: CurrentUser, heartbeat: Optional[float] = None):
+        """Yield SSE frames for the user's events until the client disconnects.
+
+        The subscription is registered once the response starts iterating,
+        so a response that is never sent leaves nothing behind.
+        """
+        heartbeat = heartbeat or settings.SSE_HEARTBEAT_SECONDS
+        reported_drops = 0
+        subscription = self.subscribe(user)
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if subscription.dropped != reported_drops:
+                    # Tell the client it missed events and should resync via /request/changes
+                    yield self.format_event("resync", {"dropped": subscription.dropped - reported_drops})
+                    reported_drops = subscription.dropped
+                yield self.format_event(event, data)
+        finally:
+            self.unsubscribe(subscription)
+
+# Process-wide broker fed by the request write paths
+request_events = RequestEventBroker(queue_size=settings.SSE_QUEUE_SIZE)
@@ -0,0 +1,207 @@
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, select, func, true
+from sqlalchemy.orm import Session
+
+from models import TourRequest, TourRequestTombstone, RequestStatus
+from services.invalidation_service import invalidation_bus
+
+class Leaderboard:
+    """Per-tour counters with an always-sorted index, so top-N reads are O(N)"""
+
+    def __init__(self):
+        self._counts: Dict[int, int] = {}
+        self._index: List[Tuple[int, int]] = []  # (-count, tour_id), ascending
+
+    def add(self, tour_id: int, delta: int) -> None:
+        old = self._counts.get(tour_id, 0)
+        new = old + delta
+        if old > 0:
+            del self._index[bisect_left(self._index, (-old, tour_id))]
+        if new > 0:
+            self._counts[tour_id] = new
+            insort(self._index, (-new, tour_id))
+        else:
+            self._counts.pop(tour_id, None)
+
+    def remove(self, tour_id: int) -> None:
+        count = self._counts.get(tour_id, 0)
+        if count:
+            self.add(tour_id, -count)
+
+    def top(self, offset: int, limit: int) -> List[Tuple[int, int]]:
+        """Get (tour_id, count) pairs ranked offset..offset+limit"""
+        return [(tour_id, -negative) for negative, tour_id in self._index[offset:offset + limit]]
+
+class TourPopularity:
+    """Incrementally maintained request counters per tour.
+
+    Counts requests that are still live (pending or approved), all-time and
+    for fixed trailing windows of days by request creation date. Counters are
+    loaded from the database on first use and then kept current by the
+    request write paths, so reads never aggregate the requests table.
+
+    A write committed just before a load may report its delta after the
+    load has already counted it. Each delta therefore carries the position
+    of its write: the request's change_seq after a create or status change,
+    or its tombstone id after a delete. The load reads the highest of both in
+    the same statement as the counts, and only deltas past them are applied.
+    Writes handled by other workers force a reload instead.
+    """
+
+    COUNTED_STATUSES = frozenset({RequestStatus.PENDING, RequestStatus.APPROVED})
+    WINDOWS = (7, 30)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._all = Leaderboard()
+        self._windows: Dict[int, Leaderboard] = {days: Leaderboard() for days in self.WINDOWS}
+        self._days: Dict[date, Counter] = {}
+        self._today: Optional[date] = None
+        self._loaded_seq = 0
+        self._loaded_tombstone = 0
+
+    def _reset(self, today: date) -> None:
+        self._all = Leaderboard()
+        self._windows = {days: Leaderboard() for days in self.WINDOWS}
+        self._days = {}
+        self._today = today
+
+    def _load(self, db: Session) -> None:
+        today = datetime.utcnow().date()
+        self._reset(today)
+        since = datetime.combine(today - timedelta(days=max(self.WINDOWS) - 1), datetime.min.time())
+        # Days only inside the windows; older requests collapse into one row per tour
+        day = case((TourRequest.created_at >= since, func.date(TourRequest.created_at)))
+        counts = (
+            select(TourRequest.tour_id, day.label("day"), func.count(TourRequest.id).label("count"))
+            .where(TourRequest.status.in_(self.COUNTED_STATUSES))
+            .group_by(TourRequest.tour_id, day)
+            .subquery()
+        )
+        positions = select(
+            select(func.max(TourRequest.change_seq)).scalar_subquery().label("change_seq"),
+            select(func.max(TourRequestTombstone.id)).scalar_subquery().label("tombstone_id")
+        ).subquery()
+        # One statement, so the positions and the counts come from the same snapshot
+        rows = db.execute(
+            select(positions.c.change_seq, positions.c.tombstone_id, counts.c.tour_id, counts.c.day, counts.c.count)
+            .select_from(positions.outerjoin(counts, true()))
+        ).all()
+
+        self._loaded_seq = rows[0].change_seq or 0
+        self._loaded_tombstone = rows[0].tombstone_id or 0
+        for row in rows:
+            if row.tour_id is None:
+                continue
+            self._all.add(row.tour_id, row.count)
+            if row.day is not None:
+                self._add_to_windows(row.tour_id, date.fromisoformat(str(row.day)[:10]), row.count)
+        self._loaded = True
+
+    def _advance(self) -> None:
+        """Expire day buckets that slid out of each window since the last call"""
+        today = datetime.utcnow().date()
+        if today == self._today:
+            return
+        for days, leaderboard in self._windows.items():
+            old_start = self._today - timedelta(days=days - 1)
+            new_start = today - timedelta(days=days - 1)
+            for bucket_day, counts in self._days.items():
+                if old_start <= bucket_day < new_start:
+                    for tour_id, count in counts.items():
+                        leaderboard.add(tour_id, -count)
+        oldest = today - timedelta(days=max(self.WINDOWS) - 1)
+        self._days = {bucket_day: counts for bucket_day, counts in self._days.items() if bucket_day >= oldest}
+        self._today = today
+
+    def _add_to_windows(self, tour_id: int, created_on: date, delta: int) -> None:
+        age = (self._today - created_on).days
+        if age < 0 or age >= max(self.WINDOWS):
+            return
+        self._days.setdefault(created_on, Counter())[tour_id] += delta
+        for days, leaderboard in self._windows.items():
+            if age < days:
+                leaderboard.add(tour_id, delta)
+
+    def _record(
+        self,
+        tour_id: int,
+        created_at: Optional[datetime],
+        delta: int,
+        change_seq: Optional[int] = None,
+        tombstone_id: Optional[int] = None
+    ) -> None:
+        invalidation_bus.publish("popularity")
+        with self._lock:
+            if not self._loaded:
+                return
+            # Already counted by the load
+            if change_seq is not None and change_seq <= self._loaded_seq:
+                return
+            if tombstone_id is not None and tombstone_id <= self._loaded_tombstone:
+                return
+            self._advance()
+            self._all.add(tour_id, delta)
+            if created_at is not None:
+                self._add_to_windows(tour_id, created_at.date(), delta)
+
+    def request_created(self, tour_id: int, created_at: datetime, status: RequestStatus, change_seq: int) -> None:
+        if status in self.COUNTED_STATUSES:
+            self._record(tour_id, created_at, 1, change_seq=change_seq)
+
+    def request_deleted(self, tour_id: int, created_at: datetime, status: RequestStatus, tombstone_id: int) -> None:
+        if status in self.COUNTED_STATUSES:
+            self._record(tour_id, created_at, -1, tombstone_id=tombstone_id)
+
+    def status_changed(
+        self,
+        tour_id: int,
+        created_at: datetime,
+        old: RequestStatus,
+        new: RequestStatus,
+        change_seq: int
+    ) -> None:
+        was_counted = old in self.COUNTED_STATUSES
+        is_counted = new in self.COUNTED_STATUSES
+        if was_counted != is_counted:
+            self._record(tour_id, created_at, 1 if is_counted else -1, change_seq=change_seq)
+
+    def remove_tour(self, tour_id: int) -> None:
+        """Drop all counters of a deleted tour"""
+        invalidation_bus.publish("popularity")
+        with self._lock:
+            if not self._loaded:
+                return
+            self._all.remove(tour_id)
+            for leaderboard in self._windows.values():
+                leaderboard.remove(tour_id)
+            for counts in self._days.values():
+                counts.pop(tour_id, None)
+
+    def invalidate(self) -> None:
+        """Force a reload from the database on the next read"""
+        self._drop()
+        invalidation_bus.publish("popularity")
+
+    def _drop(self) -> None:
+        with self._lock:
+            self._loaded = False
+
+    def top(self, db: Session, offset: int, limit: int, days: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Get ranked (tour_id, request_count) pairs, all-time or for a window"""
+        with self._lock:
+            if not self._loaded:
+                self._load(db)
+            self._advance()
+            leaderboard = self._all if days is None else self._windows[days]
+            return leaderboard.top(offset, limit)
+
+# Process-wide counters fed by the request write paths
+tour_popularity = TourPopularity()
+invalidation_bus.subscribe("popularity", lambda keys: tour_popularity._drop())
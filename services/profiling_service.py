@@ -0,0 +1,203 @@
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from schemas import ProfilingStatus, ProfiledRoute, ProfiledFunction
+
+# pstats function key: (filename, line number, function name)
+FunctionKey = Tuple[str, int, str]
+
+# Collapsed stacks kept per route; further distinct stacks are folded into one line
+MAX_STACKS = 5000
+MAX_STACK_DEPTH = 100
+TRUNCATED_STACK = "(other stacks)"
+
+class StackSampler:
+    """Samples the Python stack of one thread at a fixed interval, from a helper thread.
+
+    Time between two samples is charged to the stack seen by the second one,
+    so the totals are wall time spent per whole stack, which cProfile's
+    caller/callee edges cannot reconstruct.
+    """
+
+    INTERVAL = 0.001
+
+    def __init__(self, thread_id: int):
+        self.thread_id = thread_id
+        self.stacks: Dict[str, float] = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._switch_interval = sys.getswitchinterval()
+
+    def start(self) -> None:
+        # The busy loop thread only hands over the GIL every switch interval (5 ms by default)
+        sys.setswitchinterval(self.INTERVAL / 2)
+        self._thread.start()
+
+    def stop(self) -> Dict[str, float]:
+        self._stopped.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+        return self.stacks
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stopped.wait(self.INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                key = self._collapse(frame)
+                self.stacks[key] = self.stacks.get(key, 0.0) + now - last
+            last = now
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            labels.append(_label((code.co_filename, code.co_firstlineno, code.co_name)))
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+def _label(function: FunctionKey) -> str:
+    filename, line, name = function
+    return f"{name} ({filename.rsplit('/', 1)[-1]}:{line})".replace(";", ":")
+
+class RouteProfile:
+    """cProfile results and sampled stacks of all profiled requests of one route, merged"""
+
+    def __init__(self):
+        self.requests = 0
+        self.stats: Optional[pstats.Stats] = None
+        self.stacks: Dict[str, float] = {}
+
+    def add(self, profile: cProfile.Profile, stacks: Dict[str, float]) -> None:
+        self.requests += 1
+        if self.stats is None:
+            self.stats = pstats.Stats(profile)
+        else:
+            self.stats.add(profile)
+        for stack, seconds in stacks.items():
+            if stack not in self.stacks and len(self.stacks) >= MAX_STACKS:
+                stack = TRUNCATED_STACK
+            self.stacks[stack] = self.stacks.get(stack, 0.0) + seconds
+
+class RequestProfiler:
+    """On-demand cProfile of a sampled fraction of live requests.
+
+    Profiling runs only inside a window started by an admin; outside it the
+    middleware pays a single attribute check. cProfile hooks the event loop
+    thread, so at most one request is profiled at a time, and coroutines of
+    other requests interleaving with it show up in its profile; lower sample
+    rates keep that noise down. Sync dependencies that FastAPI runs in its
+    thread pool are not captured. Alongside cProfile, a sampler thread records
+    the loop thread's whole stacks for the collapsed (flamegraph) export.
+    """
+
+    def __init__(self):
+        self.active = False
+        self._busy = False
+        self._sample_rate = 0.0
+        self._started_at: Optional[datetime] = None
+        self._deadline = 0.0
+        self._duration = 0
+        self._routes: Dict[str, RouteProfile] = {}
+        self._sampler: Optional[StackSampler] = None
+
+    def start(self, duration_seconds: int, sample_rate: float) -> None:
+        """Open a new profiling window, discarding results of the previous one"""
+        self._routes = {}
+        self._sample_rate = sample_rate
+        self._started_at = datetime.utcnow()
+        self._duration = duration_seconds
+        self._deadline = time.monotonic() + duration_seconds
+        self.active = True
+
+    def stop(self) -> None:
+        self.active = False
+
+    def should_profile(self) -> bool:
+        """Decide whether to profile the request that is starting now"""
+        if time.monotonic() >= self._deadline:
+            self.active = False
+            return False
+        return not self._busy and random.random() < self._sample_rate
+
+    def begin(self) -> cProfile.Profile:
+        self._busy = True
+        self._sampler = StackSampler(threading.get_ident())
+        self._sampler.start()
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def end(self, profile: cProfile.Profile, route: str) -> None:
+        """Merge a finished (disabled) request profile into its route"""
+        stacks = self._sampler.stop()
+        self._sampler = None
+        self._busy = False
+        self._routes.setdefault(route, RouteProfile()).add(profile, stacks)
+
+    def get_status(self, top: int) -> ProfilingStatus:
+        """Get the window state and the top functions of every profiled route"""
+        if self.active and time.monotonic() >= self._deadline:
+            self.active = False
+        routes = []
+        for route, route_profile in sorted(self._routes.items()):
+            stats = route_profile.stats.stats
+            ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+            routes.append(ProfiledRoute(
+                route=route,
+                requests=route_profile.requests,
+                total_seconds=round(route_profile.stats.total_tt, 6),
+                top_functions=[
+                    ProfiledFunction(
+                        function=pstats.func_std_string(function),
+                        calls=calls,
+                        self_seconds=round(self_time, 6),
+                        cumulative_seconds=round(cumulative_time, 6)
+                    )
+                    for function, (_, calls, self_time, cumulative_time, _) in ranked
+                ]
+            ))
+        return ProfilingStatus(
+            active=self.active,
+            sample_rate=self._sample_rate,
+            started_at=self._started_at,
+            ends_at=self._started_at + timedelta(seconds=self._duration) if self._started_at else None,
+            routes=routes
+        )
+
+    def _route_profile(self, route: str) -> RouteProfile:
+        route_profile = self._routes.get(route)
+        if route_profile is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No profile for route '{route}'"
+            )
+        return route_profile
+
+    def export_pstats(self, route: str) -> bytes:
+        """Profile of `route` in the binary format read by `pstats.Stats(path)`"""
+        return marshal.dumps(self._route_profile(route).stats.stats)
+
+    def export_collapsed(self, route: str) -> bytes:
+        """Sampled stacks of `route` as collapsed stacks (`a;b;c <microseconds>`) for flamegraph tools"""
+        output = io.StringIO()
+        for stack, seconds in sorted(self._route_profile(route).stacks.items()):
+            microseconds = int(seconds * 1e6)
+            if microseconds:
+                output.write(f"{stack} {microseconds}\n")
+        return output.getvalue().encode()
+
+# Process-wide profiler, toggled through the admin endpoints
+request_profiler = RequestProfiler()
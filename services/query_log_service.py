@@ -0,0 +1,132 @@
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from schemas import SlowQuery, SlowQueryLogPage
+from services.metrics_service import route_path
+from config import settings
+
+# ASGI scope of the request being served, set by SlowQueryLogMiddleware
+current_request_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("current_request_scope", default=None)
+
+class SlowQueryLog:
+    """Ring buffer of SQL statements slower than a threshold, with their plans.
+
+    Statements are normalized (literals and IN lists collapsed) so repeats of
+    the same query share one entry in the plan cache; the plan is captured
+    with EXPLAIN (QUERY PLAN on SQLite) the first time a statement is slow,
+    on a raw DBAPI cursor so it neither re-enters these hooks nor counts as
+    application SQL.
+    """
+
+    _WHITESPACE = re.compile(r"\s+")
+    _STRING = re.compile(r"'(?:[^']|'')*'")
+    _NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+    _PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+    def __init__(self, threshold_ms: float, size: int, max_plans: int = 1000):
+        self.threshold_ms = threshold_ms
+        self._entries: deque = deque(maxlen=size)
+        self._plans: Dict[str, List[str]] = {}
+        self._plans_lock = threading.Lock()
+        self._max_plans = max_plans
+
+    @classmethod
+    def normalize(cls, statement: str) -> str:
+        """SQL with literals replaced by `?` and placeholder lists collapsed"""
+        normalized = cls._WHITESPACE.sub(" ", statement).strip()
+        normalized = cls._STRING.sub("?", normalized)
+        normalized = cls._NUMBER.sub("?", normalized)
+        return cls._PLACEHOLDER_LIST.sub("(?, ...)", normalized)
+
+    @staticmethod
+    def _type_names(parameters) -> Any:
+        if isinstance(parameters, dict):
+            return {key: type(value).__name__ for key, value in parameters.items()}
+        return [type(value).__name__ for value in parameters]
+
+    @classmethod
+    def parameter_shape(cls, parameters, executemany: bool) -> Dict[str, Any]:
+        """Parameter count and types, never values"""
+        if executemany:
+            rows = list(parameters)
+            return {"rows": len(rows), "types": cls._type_names(rows[0]) if rows else []}
+        if not parameters:
+            return {"count": 0}
+        return {"count": len(parameters), "types": cls._type_names(parameters)}
+
+    def instrument_engine(self, engine: Engine) -> None:
+        """Time every statement on `engine` and keep the slow ones"""
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        duration_ms = (time.perf_counter() - context._slow_query_started) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        normalized = self.normalize(statement)
+        plan = self._plans.get(normalized)
+        if plan is None and len(self._plans) < self._max_plans:
+            plan = self._explain(conn, statement, parameters, executemany)
+            with self._plans_lock:
+                plan = self._plans.setdefault(normalized, plan)
+
+        scope = current_request_scope.get()
+        self._entries.append(SlowQuery(
+            sql=normalized,
+            parameters=self.parameter_shape(parameters, executemany),
+            duration_ms=round(duration_ms, 3),
+            route=f"{scope['method']} {route_path(scope)}" if scope is not None else None,
+            recorded_at=datetime.utcnow(),
+            plan=plan
+        ))
+
+    @staticmethod
+    def _explain(conn, statement: str, parameters, executemany: bool) -> List[str]:
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        sqlite = conn.dialect.name == "sqlite"
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(("EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN ") + statement, parameters)
+            # SQLite rows are (id, parent, notused, detail); only the detail is readable
+            return [
+                str(row[-1]) if sqlite else " ".join(str(column) for column in row)
+                for row in cursor.fetchall()
+            ]
+        except Exception as e:
+            return [f"plan unavailable: {e}"]
+        finally:
+            cursor.close()
+
+    def get_page(self, limit: int, route: Optional[str] = None) -> SlowQueryLogPage:
+        """Get the most recent slow statements, newest first"""
+        entries = [entry for entry in reversed(self._entries) if route is None or entry.route == route]
+        return SlowQueryLogPage(
+            threshold_ms=self.threshold_ms,
+            capacity=self._entries.maxlen,
+            items=entries[:limit]
+        )
+
+    def clear(self) -> None:
+        """Drop logged statements and cached plans, e.g. after adding an index"""
+        self._entries.clear()
+        with self._plans_lock:
+            self._plans.clear()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._slow_query_started = time.perf_counter()
+
+# Process-wide slow query log for the application engine
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    size=settings.SLOW_QUERY_LOG_SIZE
+)
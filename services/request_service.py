@@ -0,0 +1,270 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, insert, delete, func, literal, tuple_
+from fastapi import HTTPException, status as http_status
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import base64
+import binascii
+import json
+
+from models import TourRequest, TourRequestTombstone, RequestStatus, UserRole
+from schemas import (
+    CurrentUser,
+    TourRequestBulkStatusFilter,
+    TourRequestBulkStatusResult,
+    TourRequestBulkStatusResponse,
+    TourRequestChanges
+)
+from services.notification_service import request_events
+from services.popularity_service import tour_popularity
+from services.dashboard_service import dashboard_cache
+
+class RequestService:
+    """Service for tour request business logic"""
+
+    # Statuses a request may move to from its current status
+    ALLOWED_TRANSITIONS: Dict[RequestStatus, FrozenSet[RequestStatus]] = {
+        RequestStatus.PENDING: frozenset({
+            RequestStatus.APPROVED,
+            RequestStatus.REJECTED,
+            RequestStatus.CANCELLED
+        }),
+        RequestStatus.APPROVED: frozenset({RequestStatus.CANCELLED}),
+        RequestStatus.REJECTED: frozenset(),
+        RequestStatus.CANCELLED: frozenset()
+    }
+
+    # Most requests one filter-mode bulk update may select, matching the ids list limit
+    BULK_FILTER_LIMIT = 10000
+
+    @staticmethod
+    def can_transition(current: RequestStatus, target: RequestStatus) -> bool:
+        """Check whether a request in `current` status may move to `target`"""
+        return target in RequestService.ALLOWED_TRANSITIONS.get(current, frozenset())
+
+    @staticmethod
+    def allowed_sources(target: RequestStatus) -> List[RequestStatus]:
+        """Get all statuses a request may move to `target` from"""
+        return [
+            source for source, targets in RequestService.ALLOWED_TRANSITIONS.items()
+            if target in targets
+        ]
+
+    @staticmethod
+    def _filter_conditions(filters: TourRequestBulkStatusFilter) -> list:
+        """Build WHERE conditions for a bulk selection filter"""
+        conditions = []
+        if filters.status is not None:
+            conditions.append(TourRequest.status == filters.status)
+        if filters.tour_id is not None:
+            conditions.append(TourRequest.tour_id == filters.tour_id)
+        if filters.user_id is not None:
+            conditions.append(TourRequest.user_id == filters.user_id)
+        if filters.created_before is not None:
+            conditions.append(TourRequest.created_at < filters.created_before)
+        return conditions
+
+    @staticmethod
+    def bulk_update_status(
+        db: Session,
+        target: RequestStatus,
+        ids: Optional[List[int]] = None,
+        filters: Optional[TourRequestBulkStatusFilter] = None
+    ) -> TourRequestBulkStatusResponse:
+        """Move many requests to `target` status with set-based UPDATEs in one transaction.
+
+        There is one UPDATE ... RETURNING per status allowed to move to
+        `target` (at most two), so each updated row comes back with its
+        previous status. Outcomes, events and popularity deltas cover exactly
+        the rows the UPDATEs changed. The statuses of the remaining rows are
+        read afterwards in the same write transaction, only to explain why
+        they were left alone.
+        """
+        if ids is not None:
+            ids = list(dict.fromkeys(ids))
+            conditions = [TourRequest.id.in_(ids)]
+        else:
+            conditions = RequestService._filter_conditions(filters)
+            selected_count = db.scalar(select(func.count(TourRequest.id)).where(*conditions))
+            if selected_count > RequestService.BULK_FILTER_LIMIT:
+                raise HTTPException(
+                    status_code=http_status.HTTP_400_BAD_REQUEST,
+                    detail=f"Filter selects {selected_count} requests; narrow it to at most {RequestService.BULK_FILTER_LIMIT}"
+                )
+
+        updated_rows = {}
+        now = datetime.utcnow()
+        for source in RequestService.allowed_sources(target):
+            rows = db.execute(
+                update(TourRequest)
+                .where(*conditions, TourRequest.status == source)
+                .values(status=target, updated_at=now)
+                .returning(
+                    TourRequest.id,
+                    TourRequest.user_id,
+                    TourRequest.tour_id,
+                    TourRequest.created_at,
+                    TourRequest.change_seq
+                )
+                .execution_options(synchronize_session=False)
+            ).all()
+            for row in rows:
+                updated_rows[row.id] = (row, source)
+
+        skipped = {
+            request_id: status
+            for request_id, status in db.execute(select(TourRequest.id, TourRequest.status).where(*conditions))
+            if request_id not in updated_rows
+        }
+        db.commit()
+
+        results = []
+        selected = ids if ids is not None else sorted([*updated_rows, *skipped])
+        for request_id in selected:
+            if request_id in updated_rows:
+                outcome, status = "updated", updated_rows[request_id][1]
+            else:
+                status = skipped.get(request_id)
+                if status is None:
+                    outcome = "not_found"
+                elif status == target:
+                    outcome = "unchanged"
+                else:
+                    outcome = "invalid_transition"
+            results.append(TourRequestBulkStatusResult(
+                id=request_id,
+                outcome=outcome,
+                previous_status=status
+            ))
+
+        dashboard_cache.invalidate(row.user_id for row, _ in updated_rows.values())
+        for request_id, (row, source) in sorted(updated_rows.items()):
+            tour_popularity.status_changed(row.tour_id, row.created_at, source, target, row.change_seq)
+            request_events.publish("status", row.user_id, {
+                "id": request_id,
+                "status": target.value,
+                "previous_status": source.value
+            })
+
+        return TourRequestBulkStatusResponse(status=target, updated=len(updated_rows), results=results)
+
+    @staticmethod
+    def record_tombstones(db: Session, condition) -> List[int]:
+        """Record change feed tombstones for requests matching `condition` about to be deleted.
+
+        Bulk (Core) deletes and ON DELETE CASCADE bypass the ORM after_delete
+        hook, so callers deleting requests set-wise must call this in the same
+        transaction. Returns the new tombstone ids.
+        """
+        return db.scalars(
+            insert(TourRequestTombstone).from_select(
+                ["request_id", "user_id", "deleted_at"],
+                select(
+                    TourRequest.id,
+                    TourRequest.user_id,
+                    literal(datetime.utcnow(), TourRequestTombstone.deleted_at.type)
+                ).where(condition)
+            ).returning(TourRequestTombstone.id)
+        ).all()
+
+    @staticmethod
+    def prune_tombstones(db: Session, retention_seconds: int) -> int:
+        """Delete change feed tombstones older than `retention_seconds`.
+
+        The newest tombstone is always kept: SQLite would otherwise hand its id
+        out again, and cursors already past that id would skip the new one.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=retention_seconds)
+        newest = select(func.max(TourRequestTombstone.id)).scalar_subquery()
+        deleted = db.execute(
+            delete(TourRequestTombstone)
+            .where(TourRequestTombstone.deleted_at < cutoff, TourRequestTombstone.id < newest)
+        ).rowcount
+        db.commit()
+        return deleted
+
+    @staticmethod
+    def _encode_cursor(change_seq: int, request_id: int, tombstone_id: int) -> str:
+        """Encode change feed position as an opaque URL-safe token"""
+        payload = {"s": change_seq, "r": request_id, "t": tombstone_id}
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[int, int, int]:
+        """Decode a change feed cursor produced by `_encode_cursor`"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            return int(payload["s"]), int(payload["r"]), int(payload["t"])
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    @staticmethod
+    def get_changes(
+        db: Session,
+        current_user: CurrentUser,
+        since: Optional[str] = None,
+        limit: int = 100
+    ) -> TourRequestChanges:
+        """Get requests changed and deleted after the `since` cursor.
+
+        Updated rows are walked in (change_seq, id) keyset order and deletions
+        in tombstone id order, both through indexes scoped by user_id, so a poll
+        reads only the delta. Both numbers are assigned inside the write
+        statement and grow in commit order, so a write committing after a poll
+        always lands past its cursor. Without a cursor the feed starts from the
+        beginning. A cursor older than the tombstone retention gets 410: the
+        client has to reload the full list.
+        """
+        change_seq, request_id, tombstone_id = (
+            RequestService._decode_cursor(since) if since else (0, 0, 0)
+        )
+        is_admin = current_user.role == UserRole.ADMIN
+
+        if since:
+            oldest = db.scalar(select(func.min(TourRequestTombstone.id)))
+            if oldest is not None and tombstone_id < oldest - 1:
+                raise HTTPException(
+                    status_code=http_status.HTTP_410_GONE,
+                    detail="Cursor expired; reload the full list"
+                )
+
+        query = select(TourRequest).where(
+            tuple_(TourRequest.change_seq, TourRequest.id) > tuple_(change_seq, request_id)
+        )
+        if not is_admin:
+            query = query.where(TourRequest.user_id == current_user.id)
+        changes = db.scalars(
+            query.order_by(TourRequest.change_seq, TourRequest.id).limit(limit + 1)
+        ).all()
+
+        # Read before the tombstones: every id up to it has committed by then
+        newest_tombstone = db.scalar(select(func.max(TourRequestTombstone.id))) or 0
+        tombstone_query = select(TourRequestTombstone).where(TourRequestTombstone.id > tombstone_id)
+        if not is_admin:
+            tombstone_query = tombstone_query.where(TourRequestTombstone.user_id == current_user.id)
+        deleted = db.scalars(
+            tombstone_query.order_by(TourRequestTombstone.id).limit(limit + 1)
+        ).all()
+
+        has_more = len(changes) > limit or len(deleted) > limit
+        changes, deleted = changes[:limit], deleted[:limit]
+        if changes:
+            change_seq, request_id = changes[-1].change_seq, changes[-1].id
+        if len(deleted) == limit:
+            tombstone_id = deleted[-1].id
+        else:
+            # Skip past other users' tombstones too, so a quiet cursor never
+            # falls behind the retention window
+            tombstone_id = max(tombstone_id, newest_tombstone, *(tombstone.id for tombstone in deleted))
+
+        return TourRequestChanges(
+            changes=changes,
+            deleted=deleted,
+            cursor=RequestService._encode_cursor(change_seq, request_id, tombstone_id),
+            has_more=has_more
+        )
@@ -0,0 +1,84 @@
+import hashlib
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import RevokedToken
+from services.invalidation_service import invalidation_bus
+
+class RevokedTokens:
+    """Logged-out access tokens, remembered until they expire.
+
+    Revocations are stored in the `revoked_tokens` table, so they survive
+    restarts and reach every worker process. Each worker loads the unexpired
+    ones at startup and hears about new ones through the invalidation bus;
+    its in-memory copy then answers every authenticated request without a
+    query. Unlike the caches on the bus, a missed notification is never
+    dropped: the worker reloads the table instead.
+    """
+
+    PURGE_INTERVAL = 60.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._expiry: Dict[str, datetime] = {}
+        self._last_purge = 0.0
+
+    @staticmethod
+    def _hash(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def is_revoked(self, token: str) -> bool:
+        return self._hash(token) in self._expiry
+
+    def revoke(self, db: Session, token: str, expires_at: datetime) -> None:
+        token_hash = self._hash(token)
+        db.merge(RevokedToken(token_hash=token_hash, expires_at=expires_at))
+        db.commit()
+        with self._lock:
+            self._expiry[token_hash] = expires_at
+        invalidation_bus.publish("revoked_tokens", [token_hash])
+        self._purge_expired()
+
+    def load(self) -> None:
+        """Replace the in-memory copy with the table's unexpired revocations"""
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+            db.commit()
+            rows = db.execute(select(RevokedToken.token_hash, RevokedToken.expires_at)).all()
+        with self._lock:
+            self._expiry = dict(rows)
+        self._last_purge = time.monotonic()
+
+    def apply(self, token_hashes: Optional[List[str]]) -> None:
+        """Invalidation bus handler: fetch other workers' revocations, or reload all after a gap"""
+        if token_hashes is None:
+            self.load()
+            return
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(RevokedToken.token_hash, RevokedToken.expires_at)
+                .where(RevokedToken.token_hash.in_(token_hashes))
+            ).all()
+        with self._lock:
+            self._expiry.update(rows)
+        self._purge_expired()
+
+    def _purge_expired(self) -> None:
+        # Expired tokens fail signature checks anyway, so their entries only cost memory
+        if time.monotonic() - self._last_purge < self.PURGE_INTERVAL:
+            return
+        self._last_purge = time.monotonic()
+        now = datetime.utcnow()
+        with self._lock:
+            self._expiry = {token_hash: expires_at for token_hash, expires_at in self._expiry.items() if expires_at > now}
+
+# Process-wide revocation list, loaded at startup and checked on every authenticated request
+revoked_tokens = RevokedTokens()
+invalidation_bus.subscribe("revoked_tokens", revoked_tokens.apply)
@@ -0,0 +1,76 @@
+import heapq
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, insert, delete
+from sqlalchemy.orm import Session
+
+from models import Tour, TourRequest, TourSimilarity
+from schemas import SimilarTour
+from config import settings
+
+class SimilarityService:
+    """Service for co-request based "similar tours" recommendations"""
+    
+    @staticmethod
+    def build(db: Session, top_k: int, progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+        """Rebuild the top-k neighbour table from tour requests.
+
+        Streams distinct (user, tour) pairs ordered by user, accumulating a
+        sparse tour x tour co-occurrence matrix from each user's tour set, then
+        keeps only the top-k neighbours per tour. Replaces the table atomically.
+        """
+        pairs = db.execute(
+            select(TourRequest.user_id, TourRequest.tour_id)
+            .distinct()
+            .order_by(TourRequest.user_id, TourRequest.tour_id)
+            .execution_options(yield_per=settings.JOB_BATCH_SIZE)
+        )
+        matrix: Dict[int, Counter] = defaultdict(Counter)
+        
+        def accumulate(tours: List[int]) -> None:
+            for i, first in enumerate(tours):
+                for second in tours[i + 1:]:
+                    matrix[first][second] += 1
+                    matrix[second][first] += 1
+        
+        current_user, tours = None, []
+        for user_id, tour_id in pairs:
+            if user_id != current_user:
+                accumulate(tours)
+                current_user, tours = user_id, []
+            tours.append(tour_id)
+        accumulate(tours)
+        if progress:
+            progress(1, 2)
+        
+        rows = []
+        for tour_id, neighbours in matrix.items():
+            # Highest co-request count first, lower tour id breaks ties
+            best = heapq.nsmallest(top_k, neighbours.items(), key=lambda item: (-item[1], item[0]))
+            rows.extend(
+                {"tour_id": tour_id, "rank": rank, "similar_tour_id": similar_id, "co_requests": count}
+                for rank, (similar_id, count) in enumerate(best, start=1)
+            )
+        
+        db.execute(delete(TourSimilarity))
+        if rows:
+            db.execute(insert(TourSimilarity), rows)
+        db.commit()
+        return {"tours": len(matrix), "neighbours": len(rows)}
+    
+    @staticmethod
+    def get_similar_tours(db: Session, tour_id: int, limit: int) -> List[SimilarTour]:
+        """Get precomputed similar active tours for a tour"""
+        if db.scalar(select(Tour.id).where(Tour.id == tour_id, Tour.is_active == True)) is None:
+            raise HTTPException(status_code=404, detail="Tour not found")
+        
+        rows = db.execute(
+            select(Tour, TourSimilarity.co_requests)
+            .join(TourSimilarity, TourSimilarity.similar_tour_id == Tour.id)
+            .where(TourSimilarity.tour_id == tour_id, Tour.is_active == True)
+            .order_by(TourSimilarity.rank)
+            .limit(limit)
+        ).all()
+        return [SimilarTour(tour=tour, co_requests=co_requests) for tour, co_requests in rows]
@@ -1,9 +1,11 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import Dict, Any
+from fastapi import HTTPException, status
+from typing import Dict, Any, List, Optional
 
 from models import Tour, TourRequest, RequestStatus
-from schemas import TourStats
+from schemas import TourStats, PopularTour
+from services.popularity_service import tour_popularity
 
 class TourService:
     """Service for tour-related business logic"""
@@ -40,18 +42,11 @@ class TourService:
         active_tours_count = basic_stats.active
         avg_participants = (basic_stats.participants / active_tours_count) if active_tours_count > 0 else 0
         
-        # Find most popular tour (by request count)
-        most_popular_query = db.query(
-            Tour.title,
-            func.count(TourRequest.id).label('request_count')
-        ).join(TourRequest).filter(
-            Tour.is_active == True
-        ).group_by(Tour.id, Tour.title).order_by(
-            func.count(TourRequest.id).desc()
-        ).first()
-        
-        most_popular_tour = most_popular_query.title if most_popular_query else None
-        most_popular_requests = most_popular_query.request_count if most_popular_query else 0
+        # Most popular tour from the same live (pending or approved) request
+        # counters as /tour/popular, so both always name the same tour
+        most_popular = TourService.get_popular_tours(db, 1)
+        most_popular_tour = most_popular[0].tour.title if most_popular else None
+        most_popular_requests = most_popular[0].request_count if most_popular else 0
         
         return {
             "total": basic_stats.total,
@@ -62,3 +57,31 @@ class TourService:
             "most_popular_tour": most_popular_tour,
             "most_popular_tour_requests": most_popular_requests
         }
+
+    @staticmethod
+    def get_popular_tours(db: Session, n: int, days: Optional[int] = None) -> List[PopularTour]:
+        """Get the top `n` active tours by live request count from in-memory counters"""
+        if days is not None and days not in tour_popularity.WINDOWS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Window must be one of {', '.join(map(str, tour_popularity.WINDOWS))} days"
+            )
+        
+        popular = []
+        offset = 0
+        while len(popular) < n:
+            # Over-fetch a little so inactive tours rarely need a second round
+            ranked = tour_popularity.top(db, offset, n * 2, days=days)
+            if not ranked:
+                break
+            offset += len(ranked)
+            tours = {
+                tour.id: tour for tour in db.query(Tour).filter(
+                    Tour.id.in_([tour_id for tour_id, _ in ranked]),
+                    Tour.is_active == True
+                )
+            }
+            for tour_id, count in ranked:
+                if tour_id in tours and len(popular) < n:
+                    popular.append(PopularTour(tour=tours[tour_id], request_count=count))
+        return popular
@@ -0,0 +1,241 @@
+import random
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from schemas import Trace, TracePage, TraceSpan, TraceSummary
+from config import settings
+
+# W3C trace context: version-trace_id-parent_id-flags
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_NULL_TRACE_ID = "0" * 32
+_NULL_SPAN_ID = "0" * 16
+
+# Statements of an N+1 loop should not grow one trace without bound
+MAX_SPANS_PER_TRACE = 1000
+MAX_STATEMENT_LENGTH = 200
+
+class RequestTrace:
+    """Spans of one traced HTTP request; converted to schemas only when read"""
+
+    __slots__ = ("trace_id", "remote_parent_id", "started", "recorded_at", "spans", "dropped", "route", "status_code", "duration")
+
+    def __init__(self, trace_id: str, remote_parent_id: Optional[str]):
+        self.trace_id = trace_id
+        self.remote_parent_id = remote_parent_id
+        self.started = time.perf_counter()
+        self.recorded_at = datetime.utcnow()
+        self.spans: List["Span"] = []
+        self.dropped = 0
+        self.route = ""
+        self.status_code = 0
+        self.duration = 0.0
+
+    def summary(self) -> TraceSummary:
+        return TraceSummary(
+            trace_id=self.trace_id,
+            route=self.route,
+            status_code=self.status_code,
+            duration_ms=round(self.duration * 1000, 3),
+            span_count=len(self.spans),
+            recorded_at=self.recorded_at
+        )
+
+    def to_schema(self) -> Trace:
+        return Trace(
+            **self.summary().model_dump(),
+            spans=[span.to_schema(self.started) for span in sorted(self.spans, key=lambda span: span.started)]
+        )
+
+class Span:
+    """A timed stage of a request; entering it makes it the parent of nested spans"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "started", "ended", "attributes", "_token")
+
+    def __init__(self, trace: RequestTrace, parent_id: Optional[str], name: str, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.started = time.perf_counter()
+        self.ended = self.started
+        self.attributes = attributes
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.started = time.perf_counter()
+        self._token = current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.ended = time.perf_counter()
+        current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _add_span(self.trace, self)
+
+    def to_schema(self, trace_started: float) -> TraceSpan:
+        return TraceSpan(
+            span_id=self.span_id,
+            parent_id=self.parent_id,
+            name=self.name,
+            start_ms=round((self.started - trace_started) * 1000, 3),
+            duration_ms=round((self.ended - self.started) * 1000, 3),
+            attributes=self.attributes
+        )
+
+class _NoopSpan:
+    """Stand-in returned outside traced requests, so call sites need no checks"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+# Innermost open span of the current request, None when it is not traced
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+def _add_span(trace: RequestTrace, span: Span) -> None:
+    if len(trace.spans) < MAX_SPANS_PER_TRACE:
+        trace.spans.append(span)
+    else:
+        trace.dropped += 1
+
+class Tracer:
+    """Nested per-request spans kept in a ring buffer and optionally appended to a JSONL file.
+
+    The middleware opens a root span per sampled request, continuing the
+    caller's trace when a valid `traceparent` header is present and honouring
+    its sampled flag, and times the handler and response stages itself.
+    Nested spans come from `tracer.span(...)` at call sites, including the
+    shared dependencies, and from engine hooks for each SQL statement. Spans
+    are plain objects until an admin reads them; outside a sampled request
+    `span()` is a context var lookup returning a no-op. Exported traces are
+    serialized and written on a dedicated thread, off the event loop.
+    """
+
+    def __init__(self, size: int, sample_rate: float, export_path: str = ""):
+        self.sample_rate = sample_rate
+        self._traces: deque = deque(maxlen=size)
+        self._export_path = export_path
+        # One thread, so lines are appended in order without a lock
+        self._exporter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export") if export_path else None
+
+    def span(self, name: str, **attributes) -> Any:
+        """Child span of the current one, or a no-op when the request is not traced"""
+        parent = current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(parent.trace, parent.span_id, name, attributes)
+
+    def start_trace(self, name: str, traceparent: Optional[str]) -> Optional[Span]:
+        """Root span for a new request, or None when it is not sampled"""
+        match = _TRACEPARENT.match(traceparent) if traceparent else None
+        if match and match.group(1) != _NULL_TRACE_ID and match.group(2) != _NULL_SPAN_ID:
+            if not int(match.group(3), 16) & 1:
+                return None
+            trace = RequestTrace(match.group(1), match.group(2))
+        elif random.random() < self.sample_rate:
+            trace = RequestTrace(_new_id(128), None)
+        else:
+            return None
+        return Span(trace, trace.remote_parent_id, name, {})
+
+    @staticmethod
+    def record_span(root: Span, name: str, started: float, ended: float) -> None:
+        """Add an already timed stage under `root` without making it the parent of other spans"""
+        span = Span(root.trace, root.span_id, name, {})
+        span.started = started
+        span.ended = ended
+        _add_span(root.trace, span)
+
+    def finish_trace(self, root: Span, route: str, status_code: int) -> None:
+        trace = root.trace
+        trace.route = route
+        trace.status_code = status_code
+        trace.duration = root.ended - trace.started
+        if trace.dropped:
+            root.attributes["dropped_spans"] = trace.dropped
+        self._traces.append(trace)
+        if self._exporter is not None:
+            self._exporter.submit(self._export, trace)
+
+    def _export(self, trace: RequestTrace) -> None:
+        line = trace.to_schema().model_dump_json() + "\n"
+        with open(self._export_path, "a") as export_file:
+            export_file.write(line)
+
+    @staticmethod
+    def traceparent(root: Span) -> str:
+        """`traceparent` header value that makes `root` the caller's parent span"""
+        return f"00-{root.trace.trace_id}-{root.span_id}-01"
+
+    def instrument_engine(self, engine: Engine) -> None:
+        """Record each SQL statement as a span of the request that issued it"""
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    def get_page(self, limit: int, route: Optional[str] = None, min_duration_ms: float = 0) -> TracePage:
+        """Get the most recent traces, newest first"""
+        items = []
+        for trace in reversed(self._traces):
+            if len(items) >= limit:
+                break
+            if (route is None or trace.route == route) and trace.duration * 1000 >= min_duration_ms:
+                items.append(trace.summary())
+        return TracePage(capacity=self._traces.maxlen, items=items)
+
+    def get_trace(self, trace_id: str) -> Trace:
+        for trace in reversed(self._traces):
+            if trace.trace_id == trace_id:
+                return trace.to_schema()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trace not found"
+        )
+
+    def clear(self) -> None:
+        self._traces.clear()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._trace_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    parent = current_span.get()
+    if parent is None:
+        return
+    span = Span(parent.trace, parent.span_id, "db.query", {"statement": statement[:MAX_STATEMENT_LENGTH]})
+    span.started = context._trace_started
+    span.ended = time.perf_counter()
+    if executemany:
+        span.attributes["executemany"] = True
+    _add_span(parent.trace, span)
+
+# Process-wide tracer, fed by TracingMiddleware and the instrumented stages
+tracer = Tracer(
+    size=settings.TRACE_BUFFER_SIZE,
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+    export_path=settings.TRACE_EXPORT_PATH
+)
@@ -0,0 +1,68 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update, literal
+from sqlalchemy.sql.elements import ClauseElement
+from fastapi import HTTPException
+from typing import Any, Dict, Optional
+
+class WriteService:
+    """Single-roundtrip write helpers built on INSERT/UPDATE ... RETURNING.
+
+    Requires a database with RETURNING support (SQLite >= 3.35, PostgreSQL).
+    Existence and ownership checks are folded into the statement itself, so
+    the common path is one statement instead of SELECT, write and refresh.
+    """
+    
+    @staticmethod
+    def _with_defaults(model, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in column defaults, which INSERT ... SELECT doesn't apply"""
+        values = dict(values)
+        for column in model.__table__.columns:
+            if column.name in values or column.primary_key or column.default is None:
+                continue
+            default = column.default
+            values[column.name] = default.arg(None) if default.is_callable else default.arg
+        return values
+    
+    @staticmethod
+    def _as_column(value: Any, column):
+        """Bind a Python value; SQL expression defaults are evaluated by the statement itself"""
+        if isinstance(value, ClauseElement):
+            return value
+        return literal(value, column.type)
+    
+    @staticmethod
+    def insert_returning(db: Session, model, values: Dict[str, Any]):
+        """INSERT a row and return it as an ORM object"""
+        return db.scalars(insert(model).values(**values).returning(model)).one()
+    
+    @staticmethod
+    def insert_if(db: Session, model, values: Dict[str, Any], condition) -> Optional[Any]:
+        """INSERT ... SELECT ... WHERE `condition` RETURNING the row; None if the condition failed"""
+        values = WriteService._with_defaults(model, values)
+        columns = model.__table__.columns
+        row = select(*[
+            WriteService._as_column(value, columns[name]) for name, value in values.items()
+        ]).where(condition)
+        return db.scalars(
+            insert(model).from_select(list(values), row).returning(model)
+        ).one_or_none()
+    
+    @staticmethod
+    def update_returning(db: Session, model, values: Dict[str, Any], *conditions) -> Optional[Any]:
+        """UPDATE rows matching `conditions` and return the updated row; None if nothing matched"""
+        if not values:
+            return db.scalars(select(model).where(*conditions)).one_or_none()
+        return db.scalars(
+            update(model)
+            .where(*conditions)
+            .values(**values)
+            .returning(model)
+            .execution_options(synchronize_session=False)
+        ).one_or_none()
+    
+    @staticmethod
+    def raise_not_found_or_forbidden(db: Session, model, row_id: int, not_found_detail: str) -> None:
+        """Explain a conditional write that matched nothing: missing row (404) or not yours (403)"""
+        if db.scalar(select(model.id).where(model.id == row_id)) is None:
+            raise HTTPException(status_code=404, detail=not_found_detail)
+        raise HTTPException(status_code=403, detail="Access denied")